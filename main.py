@@ -1,6 +1,5 @@
-from softcable.gui import SoftCableGUI
-import tkinter as tk
+from softcable.main import main
 
-root = tk.Tk()
-app = SoftCableGUI(root)
-root.mainloop()
+# Guarded so processes that import this script (test workers) never open the GUI
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,493 @@
+import argparse
+import asyncio
+import collections
+import contextlib
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from softcable import aio, metrics, payload, recording
+from softcable.executor import cleanup_orphans
+from softcable.hotplug import get_monitor
+from softcable.lanes.usb_speed import get_usb_index
+from softcable.mount_index import get_mount_index
+from softcable.power_test import find_power_supply
+
+DEFAULT_WORKERS = 8
+POWER_INTERVAL = 1.0
+PAYLOAD_SIZES_MB = (50, 20)  # one data test run, one stability run
+WATCH_BACKLOG = 16           # samples queued for a slow watcher before new ones are dropped
+CONNECT_TIMEOUT = 0.5        # seconds call_or_run waits for the socket before running in-process
+
+# Request/response methods: one {"id", "result"} per request
+CALLS = {
+    "detect_usb_c": aio.detect_usb_c,
+    "get_cable_info": aio.get_cable_info,
+    "get_pd_info": aio.get_pd_info,
+    "get_usb4_info": aio.get_usb4_info,
+    "get_raw_data": aio.get_raw_data,
+    "get_lane_summary": aio.get_lane_summary,
+    "get_all_lane_summaries": aio.get_all_lane_summaries,
+    "read_power_values": aio.read_power_values,
+    "get_power_limits": aio.get_power_limits,
+    "run_raw_read_test": aio.run_raw_read_test,
+    "generate_report": aio.generate_report,
+}
+
+# Streaming methods: {"id", "event"} messages, then {"id", "result"}
+STREAMS = {
+    "run_speed_test": aio.iter_speed_test,
+    "run_stability_test": aio.iter_stability_test,
+    "run_sweep": aio.iter_sweep,
+}
+
+
+def default_socket_path():
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, "softcable.sock")
+    return os.path.expanduser("~/.cache/softcable/agent.sock")
+
+
+def _jsonable(obj):
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if hasattr(obj, "__dict__"):
+        return vars(obj)
+    return str(obj)
+
+
+def encode(message):
+    """One protocol message: a JSON object on its own line."""
+    return (json.dumps(message, default=_jsonable) + "\n").encode()
+
+
+class PowerStream:
+    """
+    One poller on the supply's voltage_now/current_now, with the files kept
+    open, fanned out to every watcher. Runs only while someone is watching.
+    """
+
+    def __init__(self, interval=POWER_INTERVAL):
+        self.interval = interval
+        self.watchers = set()
+        self.fds = None
+        self.task = None
+        self.latest = None
+
+    def close(self):
+        for fd in self.fds or ():
+            os.close(fd)
+        self.fds = None
+
+    def _read(self):
+        if self.fds is None:
+            supply = find_power_supply()
+            if supply is None:
+                return None
+            try:
+                self.fds = [os.open(os.path.join(supply, name), os.O_RDONLY)
+                            for name in ("voltage_now", "current_now")]
+            except OSError:
+                return None
+
+        try:
+            volts, amps = (int(os.pread(fd, 64, 0)) / 1_000_000 for fd in self.fds)
+        except (OSError, ValueError):
+            # Supply went away; it is looked up again on the next sample
+            self.close()
+            return None
+
+        metrics.record_power(volts, amps)
+        recording.record("power", [volts, amps])
+        return {"voltage": round(volts, 3), "current": round(amps, 3), "wattage": round(volts * amps, 2)}
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self.watchers:
+            self.latest = await loop.run_in_executor(None, self._read)
+            for queue in self.watchers:
+                if not queue.full():
+                    queue.put_nowait(self.latest)
+            await asyncio.sleep(self.interval)
+        self.task = None
+
+    async def watch(self):
+        queue = asyncio.Queue(WATCH_BACKLOG)
+        self.watchers.add(queue)
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.watchers.discard(queue)
+
+
+class Agent:
+    """
+    Long-running SoftCable process serving the backends over a Unix socket.
+
+    Keeps what every fresh invocation would rebuild: the hotplug monitor and
+    topology/mount indexes, prefilled test payloads, a thread pool and a
+    shared power poller.
+
+    Protocol: newline-delimited JSON. A client sends {"id", "method",
+    "params"} and may send more requests before the first one is answered;
+    each runs concurrently and replies carry the request id. Tests stream
+    {"id", "event"} progress before their {"id", "result"}; failures answer
+    {"id", "error"}. {"method": "cancel", "params": {"id": n}} stops request n.
+    """
+
+    def __init__(self, socket_path=None, workers=DEFAULT_WORKERS, power_interval=POWER_INTERVAL):
+        self.socket_path = socket_path or default_socket_path()
+        self.workers = workers
+        self.power = PowerStream(power_interval)
+        self.server = None
+        self.started = None
+        self.requests = 0
+        self.clients = 0
+
+    def _warm(self):
+        cleanup_orphans()
+        get_monitor()
+        get_usb_index()
+        get_mount_index()
+        payload.enable_pool(PAYLOAD_SIZES_MB)
+
+    def _claim_socket(self):
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            # Left behind by an agent that did not shut down cleanly
+            os.unlink(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"An agent is already listening on {self.socket_path}")
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(self.workers, thread_name_prefix="softcable-agent"))
+        await loop.run_in_executor(None, self._warm)
+
+        self._claim_socket()
+        self.server = await asyncio.start_unix_server(self._client, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self.started = time.time()
+        return self
+
+    async def serve_forever(self):
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.power.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def status(self):
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "clients": self.clients,
+            "workers": self.workers,
+            "power_watchers": len(self.power.watchers),
+            "hotplug": get_monitor().running,
+        }
+
+    async def _handle(self, rid, method, params, writer):
+        self.requests += 1
+
+        async def send(message):
+            writer.write(encode(message))
+            await writer.drain()
+
+        try:
+            if method == "status":
+                await send({"id": rid, "result": self.status()})
+
+            elif method == "watch_power":
+                async with contextlib.aclosing(self.power.watch()) as samples:
+                    async for sample in samples:
+                        await send({"id": rid, "event": sample})
+
+            elif method in STREAMS:
+                async with contextlib.aclosing(STREAMS[method](**params)) as events:
+                    async for event in events:
+                        if event["type"] == "result":
+                            await send({"id": rid, "result": event["result"]})
+                        else:
+                            await send({"id": rid, "event": event})
+
+            elif method in CALLS:
+                await send({"id": rid, "result": await CALLS[method](**params)})
+
+            else:
+                await send({"id": rid, "error": f"Unknown method: {method}"})
+
+        except asyncio.CancelledError:
+            with contextlib.suppress(ConnectionError):
+                writer.write(encode({"id": rid, "error": "Cancelled"}))
+            raise
+        except ConnectionError:
+            pass
+        except Exception as e:
+            with contextlib.suppress(ConnectionError):
+                await send({"id": rid, "error": str(e)})
+
+    async def _client(self, reader, writer):
+        self.clients += 1
+        tasks = {}
+
+        def forget(rid, task):
+            if tasks.get(rid) is task:
+                del tasks[rid]
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    rid = request.get("id")
+                    method = request["method"]
+                    params = request.get("params") or {}
+                except (ValueError, KeyError, AttributeError):
+                    writer.write(encode({"id": None, "error": "Malformed request"}))
+                    continue
+
+                if method == "cancel":
+                    task = tasks.get(params.get("id"))
+                    if task is not None:
+                        task.cancel()
+                    writer.write(encode({"id": rid, "result": task is not None}))
+                    continue
+
+                task = asyncio.create_task(self._handle(rid, method, params, writer))
+                tasks[rid] = task
+                task.add_done_callback(lambda t, rid=rid: forget(rid, t))
+        except ConnectionError:
+            pass
+        finally:
+            # A client that goes away cancels what it left running
+            for task in list(tasks.values()):
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            self.clients -= 1
+            writer.close()
+
+
+# ---------------- clients ----------------
+
+class AgentClient:
+    """
+    Blocking client for the GUI and CLI. Requests can be pipelined:
+    send() several, then wait() for each; replies that arrive for other
+    requests are kept until asked for.
+    """
+
+    def __init__(self, socket_path=None, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path or default_socket_path())
+        self.file = self.sock.makefile("rb")
+        self.next_id = 0
+        self.pending = collections.defaultdict(collections.deque)
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def send(self, method, **params):
+        self.next_id += 1
+        self.sock.sendall(encode({"id": self.next_id, "method": method, "params": params}))
+        return self.next_id
+
+    def cancel(self, rid):
+        self.sock.sendall(encode({"id": None, "method": "cancel", "params": {"id": rid}}))
+
+    def _next(self, rid):
+        if self.pending[rid]:
+            return self.pending[rid].popleft()
+        while True:
+            line = self.file.readline()
+            if not line:
+                raise ConnectionError("Agent closed the connection")
+            message = json.loads(line)
+            if message.get("id") == rid:
+                return message
+            self.pending[message.get("id")].append(message)
+
+    def events(self, rid):
+        """Progress events of request `rid`, ending with {"type": "result", "result": ...}."""
+        while True:
+            message = self._next(rid)
+            if "event" in message:
+                yield message["event"]
+                continue
+            self.pending.pop(rid, None)
+            result = message["result"] if "error" not in message else {"error": message["error"]}
+            yield {"type": "result", "result": result}
+            return
+
+    def wait(self, rid):
+        """Final result of request `rid`; agent-side failures come back as {"error": ...}."""
+        for event in self.events(rid):
+            pass
+        return event["result"]
+
+    def call(self, method, **params):
+        return self.wait(self.send(method, **params))
+
+    def stream(self, method, **params):
+        return self.events(self.send(method, **params))
+
+
+def call_or_run(method, fallback, **params):
+    """
+    Run `method` on the agent when its socket is up, else fallback(**params)
+    in this process; the result has the same shape either way.
+    """
+    try:
+        client = AgentClient(timeout=CONNECT_TIMEOUT)
+    except OSError:
+        return fallback(**params)
+    with client:
+        client.sock.settimeout(None)  # a test runs for as long as it runs
+        return client.call(method, **params)
+
+
+class AsyncAgentClient:
+    """asyncio client: concurrent calls share one connection and are pipelined."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.queues = {}
+        self.task = asyncio.create_task(self._dispatch())
+
+    @classmethod
+    async def connect(cls, socket_path=None):
+        reader, writer = await asyncio.open_unix_connection(socket_path or default_socket_path())
+        return cls(reader, writer)
+
+    async def close(self):
+        self.task.cancel()
+        self.writer.close()
+        with contextlib.suppress(asyncio.CancelledError, ConnectionError):
+            await self.task
+
+    async def _dispatch(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            queue = self.queues.get(message.get("id"))
+            if queue is not None:
+                queue.put_nowait(message)
+        for queue in self.queues.values():
+            queue.put_nowait({"error": "Agent closed the connection"})
+
+    async def stream(self, method, **params):
+        """Progress events, ending with {"type": "result", "result": ...}."""
+        self.next_id += 1
+        rid = self.next_id
+        queue = self.queues[rid] = asyncio.Queue()
+        self.writer.write(encode({"id": rid, "method": method, "params": params}))
+        finished = False
+        try:
+            while True:
+                message = await queue.get()
+                if "event" in message:
+                    yield message["event"]
+                    continue
+                finished = True
+                result = message["result"] if "error" not in message else {"error": message["error"]}
+                yield {"type": "result", "result": result}
+                return
+        finally:
+            del self.queues[rid]
+            if not finished:
+                self.writer.write(encode({"id": None, "method": "cancel", "params": {"id": rid}}))
+
+    async def call(self, method, **params):
+        async with contextlib.aclosing(self.stream(method, **params)) as events:
+            async for event in events:
+                if event.get("type") == "result":
+                    return event["result"]
+
+
+# ---------------- command line ----------------
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="softcable.agent", description="SoftCable station agent.")
+    parser.add_argument("--socket", metavar="PATH", help=f"socket path (default {default_socket_path()})")
+    commands = parser.add_subparsers(dest="command")
+
+    serve = commands.add_parser("serve", help="run the agent (the default)")
+    serve.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    serve.add_argument("--metrics-port", type=int, metavar="PORT",
+                       help="also serve OpenMetrics telemetry on this port")
+
+    call = commands.add_parser("call", help="call a method on a running agent and print the result")
+    call.add_argument("method")
+    call.add_argument("params", nargs="*", metavar="KEY=VALUE")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "call":
+        params = dict(p.split("=", 1) for p in args.params)
+        with AgentClient(args.socket) as client:
+            for event in client.stream(args.method, **{k: _parse_value(v) for k, v in params.items()}):
+                print(json.dumps(event, default=_jsonable), flush=True)
+        return 0
+
+    workers = getattr(args, "workers", DEFAULT_WORKERS)
+    if getattr(args, "metrics_port", None):
+        metrics.start_exporter(args.metrics_port)
+
+    async def run():
+        # SIGTERM shuts down like Ctrl+C, so the socket file is removed
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        agent = await Agent(args.socket, workers).start()
+        print(f"SoftCable agent listening on {agent.socket_path}", file=sys.stderr)
+        await agent.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
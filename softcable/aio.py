@@ -0,0 +1,163 @@
+import asyncio
+import contextlib
+import functools
+import threading
+
+from softcable import (
+    cable_identity, executor, export_txt, pd_caps, power_test, raw_data,
+    raw_device, thunderbolt, usb_reader,
+)
+from softcable import lanes
+
+DEFAULT_CONCURRENCY = 4
+POWER_INTERVAL = 1.0
+
+
+def _async(func):
+    """Coroutine version of a blocking backend."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return wrapper
+
+
+detect_usb_c = _async(usb_reader.detect_usb_c)
+get_cable_info = _async(cable_identity.get_cable_info)
+get_pd_info = _async(pd_caps.get_pd_info)
+get_usb4_info = _async(thunderbolt.get_usb4_info)
+get_raw_data = _async(raw_data.get_raw_data)
+get_lane_summary = _async(lanes.get_lane_summary)
+get_all_lane_summaries = _async(lanes.get_all_lane_summaries)
+read_power_values = _async(power_test.read_power_values)
+get_power_limits = _async(power_test.get_power_limits)
+run_raw_read_test = _async(raw_device.run_raw_read_test)
+generate_report = _async(export_txt.generate_report)
+
+
+async def _stream(func, *args, **kwargs):
+    """
+    Run a backend that takes progress= and cancel= in a worker thread and
+    yield its progress events, then {"type": "result", "result": ...}.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    cancel = threading.Event()
+
+    def progress(event):
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def run():
+        try:
+            result = func(*args, progress=progress, cancel=cancel, **kwargs)
+        except Exception as e:
+            result = {"error": str(e)}
+        progress({"type": "result", "result": result})
+
+    worker = loop.run_in_executor(None, run)
+    try:
+        while True:
+            event = await queue.get()
+            yield event
+            if event["type"] == "result":
+                return
+    finally:
+        # Cancelled or closed early: stop before the next run and wait for
+        # the current one, so its temp file is gone when control returns
+        cancel.set()
+        await asyncio.shield(worker)
+
+
+async def _result(stream):
+    async with contextlib.aclosing(stream) as events:
+        async for event in events:
+            if event["type"] == "result":
+                return event["result"]
+
+
+def iter_speed_test(target_path, runs=4, verify=False, power=False, cpus=None):
+    """
+    Data test as an async iterator: a "run" event per run, then "result".
+
+        async for event in iter_speed_test("/media/usb"):
+            if event["type"] == "run":
+                show(event["index"], event["result"]["write"])
+
+    Cancelling the consuming task (or closing the iterator) stops the test
+    before its next run and waits for the current one to remove its temp file.
+    """
+    return _stream(executor.run_speed_test, target_path, runs=runs, verify=verify, power=power, cpus=cpus)
+
+
+def iter_stability_test(path, runs=10, verify=False, power=False, cpus=None):
+    """Stability test as an async iterator: a "run" event per run, then "result"."""
+    return _stream(executor.run_stability_test, path, runs=runs, verify=verify, power=power, cpus=cpus)
+
+
+def iter_sweep(target_path, size_mb=256, mode="read"):
+    """Saturation sweep as an async iterator: a "cell" event per cell, then "result"."""
+    return _stream(executor.run_sweep, target_path, size_mb=size_mb, mode=mode)
+
+
+async def run_speed_test(target_path, runs=4, verify=False, power=False, cpus=None):
+    return await _result(iter_speed_test(target_path, runs, verify, power, cpus))
+
+
+async def run_stability_test(path, runs=10, verify=False, power=False, cpus=None):
+    return await _result(iter_stability_test(path, runs, verify, power, cpus))
+
+
+async def run_sweep(target_path, size_mb=256, mode="read"):
+    return await _result(iter_sweep(target_path, size_mb, mode))
+
+
+async def watch_power(interval=POWER_INTERVAL):
+    """Yield a read_power_values() sample every `interval` seconds until closed."""
+    loop = asyncio.get_running_loop()
+    next_at = loop.time()
+    while True:
+        yield await read_power_values()
+        next_at += interval
+        await asyncio.sleep(max(0, next_at - loop.time()))
+
+
+async def iter_ports(paths, stream=iter_speed_test, limit=DEFAULT_CONCURRENCY, **kwargs):
+    """
+    Run one of the iter_* tests on every path, at most `limit` at a time,
+    and yield (path, event) pairs as they arrive from any of them.
+    Closing the iterator cancels every test that is still running.
+    """
+    semaphore = asyncio.Semaphore(limit)
+    queue = asyncio.Queue()
+
+    async def pump(path):
+        try:
+            async with semaphore:
+                async with contextlib.aclosing(stream(path, **kwargs)) as events:
+                    async for event in events:
+                        queue.put_nowait((path, event))
+        finally:
+            queue.put_nowait((path, None))
+
+    tasks = [asyncio.create_task(pump(path)) for path in paths]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            path, event = await queue.get()
+            if event is None:
+                remaining -= 1
+                continue
+            yield path, event
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def run_ports(paths, stream=iter_speed_test, limit=DEFAULT_CONCURRENCY, **kwargs):
+    """Final result of a test on every path, as {path: result}."""
+    results = {}
+    async with contextlib.aclosing(iter_ports(paths, stream, limit, **kwargs)) as events:
+        async for path, event in events:
+            if event["type"] == "result":
+                results[path] = event["result"]
+    return results
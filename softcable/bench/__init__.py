@@ -0,0 +1,6 @@
+"""
+Synthetic sysfs trees and a benchmark suite for the sysfs backends.
+
+    python -m softcable.bench                 # 10 / 1k / 50k entries
+    python -m softcable.bench --scales 10,1000 --results bench.json
+"""
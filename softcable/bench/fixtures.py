@@ -0,0 +1,240 @@
+import os
+import random
+
+# ID header VDOs: passive (product type 3) and active (4) cables, vendor 0x05ac
+PASSIVE_ID_HEADER = 0x184005AC
+ACTIVE_ID_HEADER = 0x204005AC
+# Cable VDO: HW 1, plug to Type-C, latency 1 m, 5 A, USB 3.2 Gen 2
+PASSIVE_CABLE_VDO = 0x10082042
+ACTIVE_CABLE_VDO2 = 0x46320E20
+
+USB_SPEEDS = ("480", "5000", "10000", "20000")
+PIN_ASSIGNMENTS = ("C [D] E", "[C] D E", "C D [E]")
+
+
+def _write(path, value):
+    with open(path, "w") as f:
+        f.write(f"{value}\n")
+
+
+def _files(folder, values):
+    os.makedirs(folder, exist_ok=True)
+    for name, value in values.items():
+        _write(os.path.join(folder, name), value)
+
+
+def _link(target, link):
+    os.symlink(os.path.relpath(target, os.path.dirname(link)), link)
+
+
+def _pd_device(root, index, source):
+    """A usb_power_delivery device pdN with source/sink PDOs; returns its path."""
+    pd = os.path.join(root, "class", "usb_power_delivery", f"pd{index}")
+    _files(pd, {"revision": "3.1", "version": "1.2"})
+
+    voltages = (5000, 9000, 15000, 20000) if source else (5000, 9000)
+    for caps in ("source-capabilities", "sink-capabilities"):
+        for i, mv in enumerate(voltages, start=1):
+            _files(os.path.join(pd, caps, f"{i}:fixed_supply"), {
+                "voltage": f"{mv}mV",
+                "maximum_current" if caps.startswith("source") else "operational_current": "3000mA",
+                "dual_role_power": "1" if i == 1 else "0",
+            })
+        _files(os.path.join(pd, caps, f"{len(voltages) + 1}:programmable_supply"), {
+            "minimum_voltage": "3300mV",
+            "maximum_voltage": "21000mV",
+            "maximum_current": "3000mA",
+        })
+    return pd
+
+
+def _typec_port(root, index, rng, pd_index):
+    typec = os.path.join(root, "class", "typec")
+    port = os.path.join(typec, f"port{index}")
+    _files(port, {
+        "data_role": "[host] device",
+        "power_role": "source [sink]",
+        "orientation": rng.choice(("normal", "reverse")),
+        "preferred_role": "sink",
+        "usb_typec_revision": "2.0",
+        "usb_power_delivery_revision": "3.1",
+    })
+    _link(_pd_device(root, pd_index, source=False), os.path.join(port, "usb_power_delivery"))
+
+    # Partner with a DisplayPort alt mode and its own PD capabilities
+    partner = os.path.join(typec, f"port{index}-partner")
+    _files(partner, {
+        "usb_mode": rng.choice(("usb2 [usb3] usb4", "usb2 usb3 [usb4]")),
+        "accessory_mode": "none",
+        "supports_usb_power_delivery": "yes",
+    })
+    _link(_pd_device(root, pd_index + 1, source=True), os.path.join(partner, "usb_power_delivery"))
+    altmode = os.path.join(partner, f"port{index}-partner.0")
+    _files(altmode, {"svid": "ff01", "active": rng.choice(("yes", "no")), "vdo": "0x001c0045", "mode": "1"})
+    _files(os.path.join(altmode, "displayport"), {"pin_assignment": rng.choice(PIN_ASSIGNMENTS)})
+
+    # Cable with two plugs exposing identity VDOs
+    active = index % 3 == 0
+    for plug in range(2):
+        folder = os.path.join(port, "cable", f"plug{plug}")
+        _files(folder, {
+            "active": "1" if active else "0",
+            "plug_type": "type-c",
+            "type": "active" if active else "passive",
+            "speed": "usb32_gen2",
+            "current_capability": "5000",
+        })
+        _files(os.path.join(folder, "identity"), {
+            "id_header": f"0x{ACTIVE_ID_HEADER if active else PASSIVE_ID_HEADER:08x}",
+            "cert_stat": f"0x{rng.getrandbits(32):08x}",
+            "product": f"0x{rng.getrandbits(32):08x}",
+            "product_type_vdo1": f"0x{PASSIVE_CABLE_VDO:08x}",
+            "product_type_vdo2": f"0x{ACTIVE_CABLE_VDO2 if active else 0:08x}",
+            "product_type_vdo3": "0x00000000",
+        })
+
+    # UCSI power supply reporting the contract: ucsi-source-psy-USBC000:<index + 1>
+    _files(os.path.join(root, "class", "power_supply", f"ucsi-source-psy-USBC000:{index + 1:03d}"), {
+        "type": "USB",
+        "usb_type": "C PD [PD_PPS]",
+        "online": "1",
+        "voltage_now": rng.choice((5000000, 9000000, 20000000)),
+        "voltage_max": 20000000,
+        "current_now": rng.randrange(100000, 3000000),
+        "current_max": 3000000,
+        "scope": "System",
+    })
+
+    # DRM DisplayPort connector linked to the port
+    drm = os.path.join(root, "class", "drm", f"card0-DP-{index + 1}")
+    _files(drm, {
+        "status": rng.choice(("connected", "disconnected")),
+        "enabled": "enabled",
+        "max_link_lanes": rng.choice((2, 4)),
+        "dpms": "On",
+    })
+    _link(port, os.path.join(drm, "typec_connector"))
+
+
+def _usb_device(devices, name, rng, busnum):
+    folder = os.path.join(devices, name)
+    _files(folder, {
+        "busnum": busnum,
+        "devnum": rng.randrange(2, 128),
+        "speed": rng.choice(USB_SPEEDS),
+        "version": rng.choice((" 2.10", " 3.20")),
+        "rx_lanes": rng.choice((1, 2)),
+        "tx_lanes": rng.choice((1, 2)),
+        "idVendor": f"{rng.getrandbits(16):04x}",
+        "idProduct": f"{rng.getrandbits(16):04x}",
+        "product": f"Device {name}",
+        "manufacturer": "SoftCable Fixtures",
+        "bDeviceClass": "00",
+        "bMaxPower": "896mA",
+    })
+    # One interface per device, as the kernel lists them next to devices
+    _files(os.path.join(devices, f"{name}:1.0"), {
+        "bInterfaceClass": "08",
+        "bInterfaceNumber": "00",
+        "bNumEndpoints": "02",
+    })
+    return folder
+
+
+def _usb_tree(root, count, ports, rng):
+    """
+    Root hubs plus `count` devices. Each bus gets a few root ports wired to
+    Type-C connectors; the rest hang off hubs up to five tiers deep.
+    """
+    devices = os.path.join(root, "bus", "usb", "devices")
+    os.makedirs(devices, exist_ok=True)
+    typec = os.path.join(root, "class", "typec")
+
+    buses = max(1, min(ports, 16))
+    for bus in range(1, buses + 1):
+        _files(os.path.join(devices, f"usb{bus}"), {
+            "busnum": bus, "speed": "10000", "version": " 3.20", "product": "xHCI Host Controller",
+        })
+
+    # Breadth-first so parents exist before children
+    frontier = []
+    created = 0
+    connector = 0
+    for bus in range(1, buses + 1):
+        for port in range(1, 5):
+            if created >= count:
+                break
+            name = f"{bus}-{port}"
+            folder = _usb_device(devices, name, rng, bus)
+            if connector < ports:
+                os.makedirs(os.path.join(folder, "port"))
+                _link(os.path.join(typec, f"port{connector}"), os.path.join(folder, "port", "connector"))
+                connector += 1
+            frontier.append(name)
+            created += 1
+
+    while created < count and frontier:
+        parent = frontier.pop(0)
+        if parent.count(".") >= 4:
+            continue
+        for port in range(1, 8):
+            if created >= count:
+                break
+            name = f"{parent}.{port}"
+            _usb_device(devices, name, rng, int(parent.split("-")[0]))
+            frontier.append(name)
+            created += 1
+    return created
+
+
+def _thunderbolt(root, ports):
+    """One USB4 domain with a host router and a device router on the first ports."""
+    devices = os.path.join(root, "bus", "thunderbolt", "devices")
+    _files(os.path.join(devices, "domain0"), {"security": "user"})
+    host = os.path.join(devices, "0-0")
+    _files(host, {"generation": 4, "vendor_name": "Intel", "device_name": "Host"})
+    typec = os.path.join(root, "class", "typec")
+
+    for port in range(min(ports, 4)):
+        usb4 = os.path.join(host, f"usb4_port{port + 1}")
+        os.makedirs(usb4)
+        _link(os.path.join(typec, f"port{port}"), os.path.join(usb4, "connector"))
+        _files(os.path.join(devices, f"0-{port + 1}"), {
+            "generation": 4, "vendor_name": "Fixtures", "device_name": f"Dock {port}",
+            "authorized": "1", "rx_speed": "20.0 Gb/s", "tx_speed": "20.0 Gb/s",
+            "rx_lanes": 2, "tx_lanes": 2,
+        })
+
+
+def build_tree(root, ports=2, usb_devices=10, seed=0):
+    """
+    Build a fake sysfs tree under `root` shaped like the kernel's: Type-C
+    ports with partners, alt modes, PD capabilities and e-marked cables,
+    UCSI power supplies, DRM DP connectors, a USB4 domain and a USB device
+    tree whose root ports link back to the Type-C connectors.
+    """
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(root, "class", "typec"), exist_ok=True)
+    os.makedirs(os.path.join(root, "class", "drm"), exist_ok=True)
+    _files(os.path.join(root, "class", "drm", "card0-eDP-1"), {"status": "connected", "enabled": "enabled"})
+
+    for index in range(ports):
+        _typec_port(root, index, rng, pd_index=index * 2)
+    _usb_tree(root, usb_devices, ports, rng)
+    _thunderbolt(root, ports)
+    return root
+
+
+def scale_params(entries):
+    """Ports and USB devices for a tree of `entries` entries (10, 1k, 50k ...)."""
+    return {"ports": max(2, min(entries // 100, 128)), "usb_devices": entries}
+
+
+def build_scaled_tree(root, entries, seed=0):
+    """Build (or reuse, if already built) the tree for one scale."""
+    marker = os.path.join(root, ".softcable-fixture")
+    if os.path.exists(marker):
+        return root
+    build_tree(root, seed=seed, **scale_params(entries))
+    _write(marker, entries)
+    return root
@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from softcable.bench.fixtures import build_scaled_tree
+
+SCALES = (10, 1000, 50000)
+RESULTS_PATH = os.path.expanduser("~/.cache/softcable/bench.json")
+RESULTS_LIMIT = 50
+REGRESSION_RATIO = 1.25  # warm time 25% above the previous run ...
+REGRESSION_FLOOR_MS = 0.5  # ... and by more than this is a regression
+
+
+def run_scale(tree):
+    """Time every target against one tree in a fresh interpreter."""
+    env = dict(os.environ)
+    env["SOFTCABLE_SYSFS_ROOT"] = tree
+    # Keep the cable cache the report writes away from the real one
+    env["HOME"] = tempfile.mkdtemp(prefix="softcable-bench-home-")
+    try:
+        out = subprocess.run(
+            [sys.executable, "-m", "softcable.bench.worker"],
+            env=env, capture_output=True, text=True, check=True,
+        )
+    finally:
+        shutil.rmtree(env["HOME"], ignore_errors=True)
+    return json.loads(out.stdout)
+
+
+def load_results(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"runs": []}
+
+
+def save_results(data, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def latest_by_scale(runs):
+    """{scale: targets} from the most recent stored run that covered each scale."""
+    latest = {}
+    for run in runs:
+        latest.update(run["results"])
+    return latest
+
+
+def find_regressions(current, previous):
+    """[(scale, target, previous ms, current ms)] for warm times that got worse."""
+    regressions = []
+    for scale, targets in current.items():
+        for name, timing in targets.items():
+            before = previous.get(scale, {}).get(name)
+            if not before:
+                continue
+            if (timing["warm_ms"] > before["warm_ms"] * REGRESSION_RATIO
+                    and timing["warm_ms"] - before["warm_ms"] > REGRESSION_FLOOR_MS):
+                regressions.append((scale, name, before["warm_ms"], timing["warm_ms"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m softcable.bench",
+                                     description="Benchmark the sysfs backends on synthetic trees.")
+    parser.add_argument("--scales", default=",".join(str(s) for s in SCALES),
+                        help="comma-separated entry counts (default: 10,1000,50000)")
+    parser.add_argument("--fixtures", help="keep generated trees here and reuse them across runs")
+    parser.add_argument("--results", default=RESULTS_PATH, help="JSON file the results are appended to")
+    parser.add_argument("--no-save", action="store_true", help="compare only, do not store this run")
+    args = parser.parse_args(argv)
+
+    scales = [int(s) for s in args.scales.split(",") if s]
+    fixtures = args.fixtures or tempfile.mkdtemp(prefix="softcable-fixtures-")
+
+    current = {}
+    try:
+        for scale in scales:
+            start = time.perf_counter()
+            tree = build_scaled_tree(os.path.join(fixtures, str(scale)), scale)
+            print(f"[{scale} entries] tree ready in {time.perf_counter() - start:.1f} s")
+
+            current[str(scale)] = run_scale(tree)
+            for name, timing in current[str(scale)].items():
+                print(f"  {name:<18} cold {timing['cold_ms']:>10.3f} ms   warm {timing['warm_ms']:>10.3f} ms")
+    finally:
+        if not args.fixtures:
+            shutil.rmtree(fixtures, ignore_errors=True)
+
+    data = load_results(args.results)
+    previous = latest_by_scale(data["runs"])
+    regressions = find_regressions(current, previous)
+
+    if not args.no_save:
+        data["runs"].append({
+            "time": time.time(),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "results": current,
+        })
+        del data["runs"][:-RESULTS_LIMIT]
+        save_results(data, args.results)
+
+    for scale, name, before, after in regressions:
+        print(f"REGRESSION [{scale}] {name}: {before} ms -> {after} ms")
+    return 1 if regressions else 0
@@ -0,0 +1,57 @@
+"""
+Times the backends against the tree in SOFTCABLE_SYSFS_ROOT and prints the
+timings as JSON. Run by softcable.bench.run in a fresh interpreter per
+scale, so module-level caches start cold and the root is read at import.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+REPEATS = 5
+TIME_BUDGET = 10.0  # seconds of warm repeats per target at most
+
+
+def _targets():
+    from softcable.raw_data import get_raw_data
+    from softcable.cable_identity import get_cable_info
+    from softcable.usb_reader import detect_usb_c
+    from softcable.lanes import get_lane_summary
+    from softcable.export_txt import generate_report
+
+    report = os.path.join(tempfile.mkdtemp(prefix="softcable-bench-"), "report.txt")
+    return {
+        "get_raw_data": get_raw_data,
+        "get_cable_info": get_cable_info,
+        "detect_usb_c": detect_usb_c,
+        "get_lane_summary": get_lane_summary,
+        "generate_report": lambda: generate_report(report),
+    }
+
+
+def time_target(func, repeats=REPEATS, budget=TIME_BUDGET):
+    """First (cold) call, then the best of up to `repeats` warm calls, in ms."""
+    start = time.perf_counter()
+    func()
+    cold = time.perf_counter() - start
+
+    warm = []
+    spent = 0.0
+    while len(warm) < repeats and spent < budget:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        warm.append(elapsed)
+        spent += elapsed
+
+    return {"cold_ms": round(cold * 1000, 3), "warm_ms": round(min(warm) * 1000, 3), "repeats": len(warm)}
+
+
+def main():
+    results = {name: time_target(func) for name, func in _targets().items()}
+    json.dump(results, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
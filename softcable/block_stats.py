@@ -0,0 +1,229 @@
+import os
+import threading
+import time
+
+from softcable.sysfs import sys_path
+
+SECTOR_SIZE = 512  # /sys/block/*/stat always counts 512-byte sectors
+SAMPLE_INTERVAL = 0.002
+
+# Field order of /sys/block/<dev>/stat (Documentation/block/stat.rst)
+STAT_FIELDS = (
+    "read_ios", "read_merges", "read_sectors", "read_ticks",
+    "write_ios", "write_merges", "write_sectors", "write_ticks",
+    "in_flight", "io_ticks", "time_in_queue",
+)
+
+QUEUE_LIMITS = (
+    "logical_block_size", "physical_block_size", "max_sectors_kb",
+    "max_hw_sectors_kb", "nr_requests", "read_ahead_kb", "rotational", "scheduler",
+)
+
+
+def read_file(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def resolve_block_device(path):
+    """
+    Find the block device holding `path`.
+
+    Returns {"name": "sdb1", "disk": "sdb", "sysfs": "/sys/dev/block/8:17"}
+    or None when the path is not on a block device (tmpfs, network, ...).
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    major, minor = os.major(st.st_dev), os.minor(st.st_dev)
+    sysfs = sys_path("dev", "block", f"{major}:{minor}")
+    if not os.path.exists(os.path.join(sysfs, "stat")):
+        return None
+
+    real = os.path.realpath(sysfs)
+    name = os.path.basename(real)
+    # Partitions live inside their disk's folder and carry a "partition" file
+    if os.path.exists(os.path.join(real, "partition")):
+        disk = os.path.basename(os.path.dirname(real))
+    else:
+        disk = name
+
+    return {"name": name, "disk": disk, "sysfs": sysfs}
+
+
+def read_queue_limits(disk):
+    """Read /sys/block/<disk>/queue/* limits that shape I/O to the device."""
+    base = sys_path("block", disk, "queue")
+    limits = {}
+    for item in QUEUE_LIMITS:
+        value = read_file(os.path.join(base, item))
+        if value is not None:
+            limits[item] = int(value) if value.isdigit() else value
+    return limits
+
+
+def parse_stat(raw):
+    values = [int(v) for v in raw.split()]
+    return dict(zip(STAT_FIELDS, values))
+
+
+class BlockSampler:
+    """
+    Polls a block device's stat file in a background thread while an I/O
+    run is in progress. The file is opened once and re-read with pread,
+    so each sample is a single syscall.
+
+    with BlockSampler(device) as sampler:
+        ... do I/O ...
+    sampler.summary()
+    """
+
+    def __init__(self, device, interval=SAMPLE_INTERVAL):
+        self.device = device
+        self.interval = interval
+        self.fd = None
+        self.thread = None
+        self.running = False
+        self.start_stat = None
+        self.end_stat = None
+        self.start_time = None
+        self.end_time = None
+        self.samples = 0
+        self.in_flight_sum = 0
+        self.in_flight_max = 0
+
+    def _read(self):
+        return parse_stat(os.pread(self.fd, 4096, 0).decode())
+
+    def _loop(self):
+        while self.running:
+            try:
+                in_flight = self._read()["in_flight"]
+            except (OSError, ValueError, KeyError):
+                break
+            self.samples += 1
+            self.in_flight_sum += in_flight
+            self.in_flight_max = max(self.in_flight_max, in_flight)
+            time.sleep(self.interval)
+
+    def start(self):
+        if self.device is None:
+            return self
+        try:
+            self.fd = os.open(os.path.join(self.device["sysfs"], "stat"), os.O_RDONLY)
+            self.start_stat = self._read()
+        except (OSError, ValueError):
+            self.fd = None
+            return self
+
+        self.start_time = time.perf_counter()
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.fd is None:
+            return self
+        self.running = False
+        self.thread.join()
+        self.end_time = time.perf_counter()
+        try:
+            self.end_stat = self._read()
+        except (OSError, ValueError):
+            self.end_stat = None
+        os.close(self.fd)
+        self.fd = None
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def summary(self):
+        """
+        Device-side figures for the sampled window, or None if unavailable:
+        MB moved and MB/s per direction, average/peak in-flight requests,
+        merges, average service time per request (ms) and utilisation (%).
+        """
+        if not self.start_stat or not self.end_stat:
+            return None
+
+        delta = {k: self.end_stat[k] - self.start_stat[k]
+                 for k in STAT_FIELDS if k != "in_flight"}
+        elapsed = max(self.end_time - self.start_time, 1e-9)
+
+        def mb(sectors):
+            return sectors * SECTOR_SIZE / (1024 * 1024)
+
+        read_mb = mb(delta["read_sectors"])
+        write_mb = mb(delta["write_sectors"])
+        ios = delta["read_ios"] + delta["write_ios"]
+        ticks = delta["read_ticks"] + delta["write_ticks"]
+
+        return {
+            "read_mb": round(read_mb, 2),
+            "write_mb": round(write_mb, 2),
+            "read_mb_s": round(read_mb / elapsed, 2),
+            "write_mb_s": round(write_mb / elapsed, 2),
+            "read_ios": delta["read_ios"],
+            "write_ios": delta["write_ios"],
+            "merges": delta["read_merges"] + delta["write_merges"],
+            "service_ms": round(ticks / ios, 3) if ios else None,
+            "avg_in_flight": round(self.in_flight_sum / self.samples, 2) if self.samples else None,
+            "max_in_flight": self.in_flight_max,
+            "util": round(min(100.0, delta["io_ticks"] / (elapsed * 1000) * 100), 1),
+            "samples": self.samples,
+        }
+
+
+def format_device_summary(summary):
+    """One-line description of a sampler summary for reports and the GUI."""
+    if not summary:
+        return "no block-device counters"
+    return (
+        f"device W {summary['write_mb_s']} MB/s ({summary['write_mb']} MB) | "
+        f"R {summary['read_mb_s']} MB/s ({summary['read_mb']} MB) | "
+        f"QD avg {summary['avg_in_flight']} max {summary['max_in_flight']} | "
+        f"merges {summary['merges']} | svc {summary['service_ms']} ms | util {summary['util']}%"
+    )
+
+
+def average_device_speed(runs, phase, key):
+    """Average a device-side figure (e.g. phase "device_read", key "read_mb_s") over runs."""
+    values = [run[phase][key] for run in runs if run.get(phase)]
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def device_run_lines(run):
+    """Per-run device-side lines to print under a run's Python-side figures."""
+    lines = []
+    if run.get("device_write"):
+        lines.append(f"Write phase: {format_device_summary(run['device_write'])}")
+    if run.get("device_read"):
+        lines.append(f"Read phase: {format_device_summary(run['device_read'])}")
+    return lines
+
+
+def device_result_lines(result):
+    """Device-side averages and queue limits for a whole data/stability test."""
+    if not result.get("device"):
+        return ["Device-side counters: not available (path is not on a block device)."]
+
+    lines = [
+        f"Block Device: {result['device']}",
+        f"Device-side Average Write: {result['avg_device_write']} MB/s",
+        f"Device-side Average Read: {result['avg_device_read']} MB/s",
+    ]
+    queue = result.get("queue")
+    if queue:
+        lines.append("Queue: " + ", ".join(f"{k}={v}" for k, v in queue.items()))
+    return lines
@@ -0,0 +1,219 @@
+import copy
+import json
+import os
+import time
+
+from softcable.cable_identity import get_cable_info
+
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "softcable", "cables.json")
+
+MAX_ENTRIES = 256                  # LRU limit on remembered cables
+MAX_AGE = 90 * 24 * 3600           # forget cables not seen for 90 days
+HISTORY_LIMIT = 20                 # results kept per cable and test kind
+RECENT_RESULT_AGE = 24 * 3600      # a result this fresh lets us shorten a retest
+
+
+def load_cache(path=CACHE_PATH):
+    """Load the cable cache, returning an empty cache if missing or corrupt."""
+    try:
+        with open(path, "r") as f:
+            cache = json.load(f)
+        if isinstance(cache.get("cables"), dict):
+            return cache
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"version": 1, "cables": {}, "attached": []}
+
+
+def evict(cache, now=None):
+    """Drop entries older than MAX_AGE, then the least recently seen beyond MAX_ENTRIES."""
+    now = now if now is not None else time.time()
+    cables = cache["cables"]
+
+    for fp in [fp for fp, entry in cables.items()
+               if now - entry.get("last_seen", 0) > MAX_AGE]:
+        del cables[fp]
+
+    if len(cables) > MAX_ENTRIES:
+        by_age = sorted(cables, key=lambda fp: cables[fp].get("last_seen", 0))
+        for fp in by_age[:len(cables) - MAX_ENTRIES]:
+            del cables[fp]
+
+    return cache
+
+
+def save_cache(cache, path=CACHE_PATH):
+    """Evict stale entries and write the cache atomically."""
+    evict(cache)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+        return True
+    except OSError:
+        return False
+
+
+def _touch(cache, fingerprint, port_key, capabilities, now, inserted=True):
+    entry = cache["cables"].setdefault(fingerprint, {
+        "port": port_key,
+        "first_seen": now,
+        "seen_count": 0,
+        "results": {},
+    })
+    if inserted:
+        entry["seen_count"] = entry.get("seen_count", 0) + 1
+    entry["port"] = port_key
+    entry["last_seen"] = now
+    entry["capabilities"] = capabilities
+    return entry
+
+
+def remember_cable(fingerprint, port_key, capabilities, path=CACHE_PATH):
+    """
+    Record that a cable was seen and store its decoded capabilities.
+    Returns the cache entry (including prior history).
+    """
+    cache = load_cache(path)
+    entry = _touch(cache, fingerprint, port_key, capabilities, time.time())
+    save_cache(cache, path)
+    return entry
+
+
+def sync_attached(cable_info=None, path=CACHE_PATH):
+    """
+    Remember every attached identified cable in one cache pass.
+
+    Returns {port/plug key: {"fingerprint": fp, "history": entry or None}}
+    where "history" is the cache entry as it was *before* this insertion,
+    so a reinserted cable shows its previous results straight away.
+
+    A cable counts as seen again only when it was not attached at the
+    previous sync, however often the caller refreshes.
+    """
+    if cable_info is None:
+        cable_info = get_cable_info()
+
+    cache = load_cache(path)
+    now = time.time()
+    previous = set(cache.get("attached", []))
+    result = {}
+
+    for key, info in (cable_info or {}).items():
+        fp = info.get("fingerprint")
+        if not fp:
+            continue
+        prior = cache["cables"].get(fp)
+        result[key] = {
+            "fingerprint": fp,
+            "history": copy.deepcopy(prior),
+        }
+        capabilities = {k: v for k, v in info.items() if k != "fingerprint"}
+        _touch(cache, fp, key, capabilities, now, inserted=fp not in previous)
+
+    attached = sorted({known["fingerprint"] for known in result.values()})
+    if result or attached != sorted(previous):
+        cache["attached"] = attached
+        save_cache(cache, path)
+    return result
+
+
+def record_result(fingerprint, kind, result, path=CACHE_PATH):
+    """Append a test result ("data", "stability", ...) to a cable's history."""
+    if not fingerprint or not result or result.get("error"):
+        return False
+
+    cache = load_cache(path)
+    entry = cache["cables"].get(fingerprint)
+    if entry is None:
+        return False
+
+    # Runs are bulky; the history only needs the summary figures
+    summary = {k: v for k, v in result.items() if k not in ("runs", "error")}
+    summary["time"] = time.time()
+
+    history = entry.setdefault("results", {}).setdefault(kind, [])
+    history.append(summary)
+    del history[:-HISTORY_LIMIT]
+    entry["last_seen"] = summary["time"]
+
+    return save_cache(cache, path)
+
+
+def get_history(fingerprint, path=CACHE_PATH):
+    """Return the cached entry for a fingerprint, or None if unknown."""
+    if not fingerprint:
+        return None
+    return load_cache(path)["cables"].get(fingerprint)
+
+
+def recent_result(entry, kind, max_age=RECENT_RESULT_AGE):
+    """Return the newest result of a kind if it is younger than max_age."""
+    if not entry:
+        return None
+    history = entry.get("results", {}).get(kind) or []
+    if history and time.time() - history[-1].get("time", 0) <= max_age:
+        return history[-1]
+    return None
+
+
+def suggested_runs(entry, kind, full_runs):
+    """Halve the run count when the cable already has a fresh result of this kind."""
+    if recent_result(entry, kind):
+        return min(full_runs, max(2, full_runs // 2))
+    return full_runs
+
+
+def single_attached_cable(cable_info=None):
+    """
+    Remember the attached cables and return the fingerprint of the cable
+    under test when exactly one identified cable is attached, else None
+    (results would be ambiguous).
+    """
+    fingerprints = {k["fingerprint"] for k in sync_attached(cable_info).values()}
+    if len(fingerprints) == 1:
+        return fingerprints.pop()
+    return None
+
+
+def cable_for_port(port, cable_info=None):
+    """
+    Remember the attached cables and return the fingerprint of the cable
+    plugged into a Type-C port ("port1" or a path), or None.
+    """
+    port = os.path.basename(port)
+    for key, known in sync_attached(cable_info).items():
+        if key.split("/")[0] == port:
+            return known["fingerprint"]
+    return None
+
+
+def format_history(entry):
+    """Return report/GUI lines describing a cable's cached history."""
+    if not entry:
+        return ["New cable (no previous results)."]
+
+    lines = [
+        f"Known cable, seen {entry.get('seen_count', 1)} time(s), "
+        f"first on {time.strftime('%Y-%m-%d %H:%M', time.localtime(entry.get('first_seen', 0)))}"
+    ]
+
+    results = entry.get("results", {})
+    for res in results.get("data", [])[-3:]:
+        when = time.strftime('%Y-%m-%d %H:%M', time.localtime(res.get("time", 0)))
+        lines.append(
+            f"Data test {when}: Write {res.get('avg_write')} MB/s | Read {res.get('avg_read')} MB/s"
+        )
+    for res in results.get("stability", [])[-3:]:
+        when = time.strftime('%Y-%m-%d %H:%M', time.localtime(res.get("time", 0)))
+        lines.append(f"Stability test {when}: Score {res.get('score')}/100")
+    for res in results.get("sweep", [])[-3:]:
+        when = time.strftime('%Y-%m-%d %H:%M', time.localtime(res.get("time", 0)))
+        lines.append(f"Sweep {when}: saturates at {res.get('saturation_mb_s')} MB/s ({res.get('mode')})")
+    for res in results.get("raw", [])[-3:]:
+        when = time.strftime('%Y-%m-%d %H:%M', time.localtime(res.get("time", 0)))
+        lines.append(f"Raw read test {when}: {res.get('avg_read')} MB/s on {res.get('device')}")
+
+    return lines
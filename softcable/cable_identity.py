@@ -1,6 +1,45 @@
+import hashlib
 import os
 
-TYPEC_PATH = "/sys/class/typec/"
+from softcable.vdo_decoder import decode_identity_vdos
+from softcable.sysfs import sys_path
+from softcable.tracing import traced
+
+TYPEC_PATH = sys_path("class", "typec") + "/"
+
+# Identity files that describe the cable itself (not its current state)
+FINGERPRINT_FIELDS = (
+    "id_header",
+    "cert_stat",
+    "product",
+    "product_type_vdo1",
+    "product_type_vdo2",
+    "product_type_vdo3",
+)
+
+
+def cable_fingerprint(port_key, identity):
+    """
+    Compute a stable fingerprint for a cable from its identity block
+    and the port path it is plugged into.
+
+    Returns None when the cable exposes no identity.
+    """
+    if not identity:
+        return None
+
+    parts = [port_key]
+    for field in FINGERPRINT_FIELDS:
+        parts.append(f"{field}={identity.get(field) or ''}")
+
+    # Any extra identity files still count, in a stable order
+    for field in sorted(identity):
+        if field not in FINGERPRINT_FIELDS:
+            parts.append(f"{field}={identity[field] or ''}")
+
+    digest = hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+    return digest[:16]
+
 
 def read_file(path):
     try:
@@ -40,12 +79,14 @@ def decode_cable(folder):
     identity = decode_identity(folder)
     if identity:
         data["identity"] = identity
+        data["decoded"] = decode_identity_vdos(identity)
     else:
         data["identity"] = None  # Explicitly mark as missing
 
     return data
 
 
+@traced()
 def get_cable_info():
     """
     Scan all Type‑C ports and return cable info.
@@ -86,6 +127,9 @@ def get_cable_info():
             info = decode_cable(plug_path)
 
             key = f"{port}/{plug}"
+            fingerprint = cable_fingerprint(key, info["identity"])
+            if fingerprint:
+                info["fingerprint"] = fingerprint
             result[key] = info
 
     return result if result else None
@@ -0,0 +1,184 @@
+import contextlib
+import os
+import resource
+import time
+
+CPU_BOUND_SHARE = 0.9  # a thread busy this share of the wall time has saturated its core
+DEVICE_SHARE = 0.8     # a phase that moved this share of its data on the device reached it
+
+
+def parse_cpu_list(text):
+    """'2,3' or '2-3,6' -> {2, 3, 6}; empty or None -> None."""
+    if not text or not text.strip():
+        return None
+    cpus = set()
+    for part in text.split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.update(range(int(first), int(last) + 1))
+        elif part:
+            cpus.add(int(part))
+    return cpus
+
+
+def check_cpus(cpus):
+    """Error message if `cpus` are not cores this process may run on, else None."""
+    if not cpus:
+        return None
+    available = os.sched_getaffinity(0)
+    missing = set(cpus) - available
+    if missing:
+        return (f"Cannot pin to cores {', '.join(map(str, sorted(missing)))}: "
+                f"available cores are {', '.join(map(str, sorted(available)))}")
+    return None
+
+
+class CpuMeter:
+    """
+    CPU time spent during one I/O phase, next to its wall time.
+
+    Process user/system time covers everything the test costs the host
+    (verify threads, samplers, the kernel copying data); the calling
+    thread's own time shows whether the thread doing the I/O kept its
+    core saturated. Buffered writes and page-cache reads are a kernel
+    memcpy that saturates it too, so a saturated phase only counts as
+    CPU-bound when the block counters show the data reached the device;
+    otherwise it is cache-bound, and the figures are memory speed.
+    With `pin`, the calling thread runs only on those cores for the phase.
+
+    with BlockSampler(device) as sampler, CpuMeter(pin={2, 3}) as cpu:
+        ... do I/O ...
+    cpu.summary(sampler.summary(), "write", size_mb)
+    """
+
+    def __init__(self, pin=None):
+        self.pin = pin
+        self.previous = None
+
+    def __enter__(self):
+        if self.pin:
+            self.previous = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, self.pin)
+        self.start_self = resource.getrusage(resource.RUSAGE_SELF)
+        self.start_thread = resource.getrusage(resource.RUSAGE_THREAD)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.end = time.perf_counter()
+        self.end_self = resource.getrusage(resource.RUSAGE_SELF)
+        self.end_thread = resource.getrusage(resource.RUSAGE_THREAD)
+        if self.previous is not None:
+            os.sched_setaffinity(0, self.previous)
+        return False
+
+    def summary(self, device=None, direction=None, size_mb=None):
+        """
+        CPU figures of the phase. `device` is the BlockSampler summary of the
+        same phase, `direction` "read" or "write" and `size_mb` the data the
+        test moved; without them the phase is neither CPU- nor cache-bound.
+        """
+        wall = self.end - self.start
+        user = self.end_self.ru_utime - self.start_self.ru_utime
+        system = self.end_self.ru_stime - self.start_self.ru_stime
+        thread = (self.end_thread.ru_utime - self.start_thread.ru_utime
+                  + self.end_thread.ru_stime - self.start_thread.ru_stime)
+        saturated = bool(wall) and thread / wall >= CPU_BOUND_SHARE
+        known = bool(device and direction and size_mb)
+        reached = known and device[f"{direction}_mb"] >= size_mb * DEVICE_SHARE
+        return {
+            "wall_s": round(wall, 4),
+            "user_s": round(user, 4),
+            "sys_s": round(system, 4),
+            "cpu_pct": round((user + system) / wall * 100, 1) if wall else None,
+            "thread_pct": round(thread / wall * 100, 1) if wall else None,
+            "cpu_bound": saturated and reached,
+            "cache_bound": saturated and known and not reached,
+            "pinned": sorted(self.pin) if self.pin else None,
+        }
+
+
+@contextlib.contextmanager
+def reserve_cpus(cpus):
+    """
+    Keep the calling thread, and every thread it starts (block and power
+    samplers), off `cpus` while a test runs, so CpuMeter(pin=cpus) gives
+    the I/O those cores to itself.
+    """
+    if not cpus:
+        yield
+        return
+
+    previous = os.sched_getaffinity(0)
+    others = previous - set(cpus)
+    if others:
+        os.sched_setaffinity(0, others)
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, previous)
+
+
+def summarize_cpu(runs):
+    """CPU figures of a whole test from its runs' cpu_write/cpu_read summaries."""
+    phases = [(phase, run[f"cpu_{phase}"]) for run in runs
+              for phase in ("write", "read") if run.get(f"cpu_{phase}")]
+    if not phases:
+        return None
+
+    def average(phase, key):
+        values = [s[key] for p, s in phases if p == phase and s[key] is not None]
+        return round(sum(values) / len(values), 1) if values else None
+
+    bound = [p for p, s in phases if s["cpu_bound"]]
+    cached = [p for p, s in phases if s.get("cache_bound")]
+    return {
+        "write_cpu_pct": average("write", "cpu_pct"),
+        "read_cpu_pct": average("read", "cpu_pct"),
+        "user_s": round(sum(s["user_s"] for _, s in phases), 3),
+        "sys_s": round(sum(s["sys_s"] for _, s in phases), 3),
+        "cpu_bound_phases": len(bound),
+        "phases": len(phases),
+        "cpu_bound": bool(bound),
+        "cache_bound_phases": len(cached),
+        "cores": len(os.sched_getaffinity(0)),
+        "pinned": phases[0][1]["pinned"],
+    }
+
+
+def cpu_run_lines(run):
+    """Per-run CPU lines to print under a run's throughput figures."""
+    lines = []
+    for phase in ("write", "read"):
+        summary = run.get(f"cpu_{phase}")
+        if summary:
+            line = (f"{phase.capitalize()} CPU: {summary['cpu_pct']}% "
+                    f"(user {summary['user_s']} s, sys {summary['sys_s']} s)")
+            if summary["cpu_bound"]:
+                line += " - CPU-bound"
+            elif summary.get("cache_bound"):
+                line += " - page cache, not the device"
+            lines.append(line)
+    return lines
+
+
+def cpu_result_lines(cpu):
+    """CPU summary for a whole data/stability test."""
+    if not cpu:
+        return []
+    lines = [f"CPU: write {cpu['write_cpu_pct']}% | read {cpu['read_cpu_pct']}% "
+             f"(user {cpu['user_s']} s, sys {cpu['sys_s']} s, {cpu['cores']} cores)"]
+    if cpu["pinned"]:
+        lines.append(f"I/O pinned to cores {', '.join(map(str, cpu['pinned']))}")
+    if cpu["cpu_bound"]:
+        lines.append(
+            f"CPU-bound in {cpu['cpu_bound_phases']} of {cpu['phases']} phases: "
+            "this host limited the figures, not the cable"
+        )
+    if cpu.get("cache_bound_phases"):
+        lines.append(
+            f"Served from the page cache in {cpu['cache_bound_phases']} of {cpu['phases']} phases: "
+            "those figures are memory speed, not the cable's"
+        )
+    return lines
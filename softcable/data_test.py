@@ -1,58 +1,138 @@
 import os
 import time
 
-def single_test(target_path, size_mb=50):
-    """Runs one write/read test and returns speeds."""
-    result = {"write": None, "read": None, "error": None}
+from softcable.block_stats import (
+    BlockSampler, resolve_block_device, read_queue_limits, average_device_speed
+)
+from softcable.cpu_stats import CpuMeter, check_cpus, reserve_cpus, summarize_cpu
+from softcable.integrity import chunk_checksums, verify_file, summarize_integrity
+from softcable.payload import random_payload
+from softcable.power_test import PowerSampler, find_power_supply, measure_idle, summarize_power
+from softcable.recording import timed_read, timed_write
+from softcable.tracing import traced
+from softcable import metrics
+
+TEMP_NAME = "softcable_test.bin"
+
+
+@traced()
+def single_test(target_path, size_mb=50, device=None, verify=False, supply=None, cpus=None):
+    """
+    Runs one write/read test and returns speeds. With `verify`, the read
+    phase re-reads the file with O_DIRECT and checks every chunk against
+    what was written (see softcable.integrity).
+    """
+    result = {"write": None, "read": None, "error": None,
+              "device_write": None, "device_read": None, "integrity": None,
+              "power_write": None, "power_read": None, "cpu_write": None, "cpu_read": None}
+
+    temp_file = os.path.join(target_path, TEMP_NAME)
 
     try:
-        data = os.urandom(size_mb * 1024 * 1024)
-        temp_file = os.path.join(target_path, "softcable_test.bin")
+        data = random_payload(size_mb * 1024 * 1024)
+
+        # Checksums are taken before the timed write so they cost nothing there
+        if verify:
+            view = memoryview(data)
+            checksums = chunk_checksums(view)
 
         # WRITE TEST
-        start = time.time()
-        with open(temp_file, "wb") as f:
-            f.write(data)
-        end = time.time()
+        with BlockSampler(device) as sampler, PowerSampler(supply) as power, CpuMeter(cpus) as cpu:
+            start = time.perf_counter()
+            with open(temp_file, "wb") as f:
+                timed_write(f, data, TEMP_NAME)
+            end = time.perf_counter()
         result["write"] = round(size_mb / (end - start), 2)
+        result["device_write"] = sampler.summary()
+        result["power_write"] = power.summary(start, end, size_mb)
+        result["cpu_write"] = cpu.summary(result["device_write"], "write", size_mb)
 
-        # READ TEST
-        start = time.time()
-        with open(temp_file, "rb") as f:
-            f.read()
-        end = time.time()
-        result["read"] = round(size_mb / (end - start), 2)
+        if verify:
+            # Verified reads bypass the page cache, so the data must be on the device
+            with open(temp_file, "rb+") as f:
+                os.fsync(f.fileno())
 
-        os.remove(temp_file)
+        # READ TEST
+        with BlockSampler(device) as sampler, PowerSampler(supply) as power, CpuMeter(cpus) as cpu:
+            start = time.perf_counter()
+            if verify:
+                elapsed, result["integrity"] = verify_file(temp_file, view, checksums)
+            else:
+                with open(temp_file, "rb") as f:
+                    timed_read(f, TEMP_NAME)
+                elapsed = time.perf_counter() - start
+            end = time.perf_counter()
+        result["read"] = round(size_mb / elapsed, 2)
+        result["device_read"] = sampler.summary()
+        result["power_read"] = power.summary(start, end, size_mb)
+        result["cpu_read"] = cpu.summary(result["device_read"], "read", size_mb)
 
     except Exception as e:
         result["error"] = str(e)
 
+    finally:
+        # Also on errors, so a failed run leaves nothing behind on the drive
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
     return result
 
 
-def run_speed_test(target_path):
-    """Runs 4 tests and returns individual + average results."""
+def summarize_speed(results):
+    """Averages over a data test's runs; also re-scores recorded runs (see softcable.recording)."""
+    return {
+        "avg_write": round(sum(run["write"] for run in results) / len(results), 2),
+        "avg_read": round(sum(run["read"] for run in results) / len(results), 2),
+        "avg_device_write": average_device_speed(results, "device_write", "write_mb_s"),
+        "avg_device_read": average_device_speed(results, "device_read", "read_mb_s"),
+        "integrity": summarize_integrity(results),
+        "cpu": summarize_cpu(results),
+    }
+
+
+@traced()
+def run_speed_test(target_path, runs=4, verify=False, power=False, cpus=None, progress=None, cancel=None):
+    """
+    Runs 4 tests (or `runs`) and returns individual + average results.
+    `progress` is called with {"type": "run", ...} after each run; setting
+    the `cancel` event stops the test before the next run. With `cpus`,
+    the I/O runs pinned to those cores and everything else stays off them.
+    """
+    error = check_cpus(cpus)
+    if error:
+        return {"error": error}
+
     results = []
-    write_speeds = []
-    read_speeds = []
 
-    for i in range(4):
-        test = single_test(target_path)
-        results.append(test)
+    # Device-side counters run next to the Python timings when the path
+    # sits on a block device
+    device = resolve_block_device(target_path)
 
-        if test["error"]:
-            return {"error": test["error"]}
+    # Power under load: the idle baseline is taken before any I/O starts
+    supply = find_power_supply() if power else None
+    idle = measure_idle(supply) if supply else None
 
-        write_speeds.append(test["write"])
-        read_speeds.append(test["read"])
+    # Samplers started from this thread inherit the cores it is kept to
+    with reserve_cpus(cpus):
+        for i in range(runs):
+            if cancel is not None and cancel.is_set():
+                return {"error": "Cancelled"}
 
-    avg_write = round(sum(write_speeds) / 4, 2)
-    avg_read = round(sum(read_speeds) / 4, 2)
+            test = single_test(target_path, device=device, verify=verify, supply=supply, cpus=cpus)
+            results.append(test)
+            if progress:
+                progress({"type": "run", "index": i + 1, "runs": runs, "result": test})
 
-    return {
+            if test["error"]:
+                return {"error": test["error"]}
+
+    result = {
         "error": None,
         "runs": results,
-        "avg_write": avg_write,
-        "avg_read": avg_read
+        **summarize_speed(results),
+        "device": device["name"] if device else None,
+        "queue": read_queue_limits(device["disk"]) if device else None,
+        "power": summarize_power(results, idle) if power else None,
     }
+    metrics.record_test(target_path, "data", result)
+    return result
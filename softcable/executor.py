@@ -0,0 +1,356 @@
+import fcntl
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+
+from softcable import data_test, metrics, payload, recording, stability_test, sweep, tracing
+from softcable.mount_index import get_mount_index
+
+RUN_DEADLINE = 120        # seconds without a finished run before the device counts as hung
+HEARTBEAT_INTERVAL = 1.0
+HEARTBEAT_TIMEOUT = 10.0  # worker silent this long (not even beats) is killed too
+KILL_GRACE = 2.0          # wait after SIGKILL; a worker stuck in the kernel is left to the reaper
+
+INFLIGHT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "softcable", "inflight.json")
+
+# kind -> (module, function, temp file name)
+TESTS = {
+    "data": ("softcable.data_test", "run_speed_test", data_test.TEMP_NAME),
+    "stability": ("softcable.stability_test", "run_stability_test", stability_test.TEMP_NAME),
+    "sweep": ("softcable.sweep", "run_sweep", sweep.TEMP_NAME),
+}
+
+_context = None
+_abandoned = []
+_start_lock = threading.Lock()
+# Stands in for __main__ while a worker starts: no __file__ or __spec__, nothing to re-run
+_NO_MAIN = types.ModuleType("__main__")
+
+
+def _get_context():
+    # Workers fork from a clean server process, never from the GUI with its threads
+    global _context
+    if _context is None:
+        _context = multiprocessing.get_context("forkserver")
+        _context.set_forkserver_preload([module for module, _, _ in TESTS.values()])
+    return _context
+
+
+def _start(process):
+    """
+    Start a worker without re-running the caller's __main__ in it.
+
+    multiprocessing normally re-imports the main script in every child so
+    that functions defined there can be unpickled; an unguarded script (a
+    GUI launcher calling mainloop() at top level) would then run again in
+    the worker and never reach the test. Workers only run softcable code,
+    so the main module is hidden while the process is set up.
+    """
+    with _start_lock:
+        main = sys.modules["__main__"]
+        sys.modules["__main__"] = _NO_MAIN
+        try:
+            process.start()
+        finally:
+            sys.modules["__main__"] = main
+
+
+# ---------------- in-flight test files ----------------
+
+def _update_inflight(change, path=INFLIGHT_PATH):
+    """Apply `change(entries)` to the in-flight registry under a file lock."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                entries = json.loads(f.read() or "{}")
+            except ValueError:
+                entries = {}
+            change(entries)
+            f.seek(0)
+            f.truncate()
+            json.dump(entries, f, indent=1, sort_keys=True)
+    except OSError:
+        pass
+
+
+def _register(temp_file, pid):
+    _update_inflight(lambda entries: entries.__setitem__(temp_file, pid))
+
+
+def _unregister(temp_file):
+    _update_inflight(lambda entries: entries.pop(temp_file, None))
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def cleanup_orphans():
+    """
+    Remove test files left behind by workers that were killed or crashed.
+    Entries on drives that are not mounted right now are kept for later.
+    Returns the files removed.
+    """
+    removed = []
+
+    def sweep_entries(entries):
+        for temp_file, pid in list(entries.items()):
+            if _alive(pid):
+                continue
+            if os.path.exists(temp_file):
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    continue
+                removed.append(temp_file)
+                del entries[temp_file]
+            elif os.path.isdir(os.path.dirname(temp_file)):
+                del entries[temp_file]
+
+    _update_inflight(sweep_entries)
+    return removed
+
+
+def _remove_later(temp_file):
+    # Unlinking on a hung device can block as well, so it never runs on the caller's thread
+    def remove():
+        try:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            _unregister(temp_file)
+        except OSError:
+            pass
+    threading.Thread(target=remove, daemon=True).start()
+
+
+# ---------------- worker side ----------------
+
+def _collecting():
+    """
+    What this process collects that a worker has to send back instead of
+    keeping, and the payload sizes it keeps ready (the worker prefills its own).
+    """
+    return {
+        "record": recording.ENABLED,
+        "trace": tracing.ENABLED,
+        "profile": tracing.profiler_running(),
+        "metrics": metrics.ENABLED,
+        "payload": payload.pool_sizes_mb(),
+    }
+
+
+def _worker(conn, module, function, path, kwargs, collect):
+    import importlib
+
+    lock = threading.Lock()
+    cancel = threading.Event()
+    done = threading.Event()
+
+    def send(message):
+        with lock:
+            conn.send(message)
+
+    def beat():
+        # Keeps beating while a run is blocked in I/O; only finished runs move the deadline
+        while not done.wait(HEARTBEAT_INTERVAL):
+            send(("beat", None))
+
+    def listen():
+        try:
+            if conn.recv() == ("cancel", None):
+                cancel.set()
+        except (EOFError, OSError):
+            cancel.set()
+
+    def flush():
+        # Spans and profile samples stay in the supervisor, which is where they are exported
+        if collect["trace"]:
+            origin, events = tracing.take_events()
+            if events:
+                send(("spans", (origin, events)))
+        if collect["profile"]:
+            counts = tracing.take_profile()
+            if counts:
+                send(("profile", counts))
+
+    def progress(event):
+        flush()
+        send(("event", event))
+
+    threading.Thread(target=beat, daemon=True).start()
+    threading.Thread(target=listen, daemon=True).start()
+    # Power samples, chunk timings, spans: whatever the supervisor collects is sent there
+    if collect["record"]:
+        recording.forward(lambda item: send(("record", item)))
+    if collect["metrics"]:
+        metrics.forward(lambda reading: send(("power", reading)))
+    if collect["trace"]:
+        tracing.enable()
+    if collect["profile"]:
+        tracing.start_profiler()
+    if collect["payload"]:
+        # Buffers cannot be inherited (every test would write the same bytes), so the
+        # worker fills its own while the test sets up and refills between runs
+        payload.enable_pool(collect["payload"])
+
+    func = getattr(importlib.import_module(module), function)
+    try:
+        result = func(path, progress=progress, cancel=cancel, **kwargs)
+    except Exception as e:
+        result = {"error": str(e)}
+    done.set()
+    if collect["profile"]:
+        tracing.stop_profiler()
+    flush()
+    send(("result", result))
+
+
+# ---------------- supervisor side ----------------
+
+def _kill(process):
+    process.kill()
+    process.join(KILL_GRACE)
+    if process.is_alive():
+        # In uninterruptible I/O the kill only lands once the kernel gives up;
+        # reap it in the background instead of waiting here
+        _abandoned.append(process)
+        threading.Thread(target=_reap, args=(process,), daemon=True).start()
+
+
+def _reap(process):
+    process.join()
+    _abandoned.remove(process)
+
+
+def run_supervised(kind, path, deadline=RUN_DEADLINE, progress=None, cancel=None, **kwargs):
+    """
+    Run a test ("data", "stability" or "sweep") in a worker process.
+
+    The worker reports each finished run (or sweep cell) and a heartbeat
+    over a pipe. If no run finishes within `deadline` seconds, or the
+    worker goes silent, it is killed and an error is returned, so a device
+    that hangs mid-write costs at most one deadline. The test's temp file
+    is registered while the worker runs; if the worker dies before removing
+    it, it is deleted in the background or by cleanup_orphans() on a later start.
+    Spans, profiler samples and power metrics the worker collects are sent
+    back and kept here, where --trace, --profile and /metrics read them.
+    With the payload pool on here (the agent), the worker keeps its own.
+    While a session is recorded, the worker's records and the test's runs
+    and result go into the recording (see softcable.recording). Workers
+    do not re-run the caller's __main__ script (see _start).
+    """
+    module, function, temp_name = TESTS[kind]
+    temp_file = os.path.abspath(os.path.join(path, temp_name))
+
+    ctx = _get_context()
+    conn, child = ctx.Pipe()
+    process = ctx.Process(target=_worker,
+                          args=(child, module, function, path, kwargs, _collecting()),
+                          name=f"softcable-{kind}", daemon=True)
+    _start(process)
+    child.close()
+    _register(temp_file, process.pid)
+    if recording.ENABLED:
+        # Replays run on other hosts, whose mounts say nothing about this drive
+        drive = get_mount_index().entry_for_path(path)
+        recording.checkpoint("test", {"kind": kind, "path": path, "args": kwargs, "drive": drive})
+
+    now = time.monotonic()
+    deadline_at = now + deadline
+    last_beat = now
+    cancel_sent = False
+    finished = False
+    result = None
+
+    try:
+        while result is None:
+            if cancel is not None and cancel.is_set() and not cancel_sent:
+                cancel_sent = True
+                try:
+                    conn.send(("cancel", None))
+                except OSError:
+                    # The worker is already gone; the poll below sees EOF and reports it
+                    pass
+
+            if conn.poll(HEARTBEAT_INTERVAL):
+                try:
+                    message, payload = conn.recv()
+                except EOFError:
+                    process.join(KILL_GRACE)
+                    result = {"error": f"Test worker exited unexpectedly (code {process.exitcode})"}
+                    break
+                last_beat = time.monotonic()
+                if message == "event":
+                    deadline_at = last_beat + deadline
+                    recording.record("event", {"kind": kind, "path": path, "event": payload})
+                    if progress:
+                        progress(payload)
+                elif message == "record":
+                    t, record_kind, data = payload
+                    recording.record(record_kind, data, t)
+                elif message == "power":
+                    metrics.record_power(*payload)
+                elif message == "spans":
+                    tracing.merge_events(*payload)
+                elif message == "profile":
+                    tracing.merge_profile(payload)
+                elif message == "result":
+                    result = payload
+                    finished = True
+
+            now = time.monotonic()
+            if result is None and now > deadline_at:
+                result = {"error": f"No run finished within {deadline} s: the device stopped responding"}
+            elif result is None and now - last_beat > HEARTBEAT_TIMEOUT:
+                result = {"error": "Test worker stopped responding"}
+    finally:
+        conn.close()
+        if finished:
+            process.join(KILL_GRACE)
+        if process.is_alive():
+            _kill(process)
+        if finished and not result.get("error"):
+            # The test removed its own file
+            _unregister(temp_file)
+        else:
+            _remove_later(temp_file)
+
+    if kind in ("data", "stability"):
+        # The worker's own registry is not the one being scraped
+        metrics.record_test(path, kind, result)
+    recording.checkpoint("result", {"kind": kind, "path": path, "result": result})
+    return result
+
+
+def run_speed_test(target_path, runs=4, verify=False, power=False, cpus=None,
+                   deadline=RUN_DEADLINE, progress=None, cancel=None):
+    """data_test.run_speed_test in a supervised worker process."""
+    return run_supervised("data", target_path, deadline, progress, cancel,
+                          runs=runs, verify=verify, power=power, cpus=cpus)
+
+
+def run_stability_test(path, runs=10, verify=False, power=False, cpus=None,
+                       deadline=RUN_DEADLINE, progress=None, cancel=None):
+    """stability_test.run_stability_test in a supervised worker process."""
+    return run_supervised("stability", path, deadline, progress, cancel,
+                          runs=runs, verify=verify, power=power, cpus=cpus)
+
+
+def run_sweep(target_path, size_mb=256, mode="read",
+              deadline=RUN_DEADLINE, progress=None, cancel=None):
+    """sweep.run_sweep in a supervised worker process."""
+    return run_supervised("sweep", target_path, deadline, progress, cancel,
+                          size_mb=size_mb, mode=mode)
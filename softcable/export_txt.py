@@ -2,138 +2,315 @@ import os
 import time
 
 from softcable.usb_reader import detect_usb_c
-from softcable.data_test import run_speed_test
-from softcable.stability_test import run_stability_test
-from softcable.power_test import read_power_values
-from softcable.raw_data import get_raw_data
+from softcable.executor import run_speed_test, run_stability_test, run_sweep
+from softcable.power_test import (
+    read_power_values, get_power_limits, power_run_lines, power_result_lines
+)
+from softcable.pd_caps import get_pd_info, format_pdo, check_power_limits
+from softcable.raw_data import get_raw_snapshot
 from softcable.cable_identity import get_cable_info
+from softcable.block_stats import device_run_lines, device_result_lines
+from softcable.thunderbolt import get_usb4_info, single_active_link, describe_link, compare_to_link
+from softcable.cable_cache import sync_attached, record_result, format_history, cable_for_port
+from softcable.mount_index import get_mount_index, describe_drive
+from softcable.integrity import format_integrity
+from softcable.cpu_stats import cpu_run_lines, cpu_result_lines
+from softcable.sweep import format_cell, sweep_result_lines
+from softcable.raw_device import run_raw_read_test, raw_result_lines
+from softcable.recording import NOT_RECORDED
+from softcable.tracing import traced, SectionSpans
 
 
-def generate_report(export_path, data_test_path=None, stability_path=None):
+@traced()
+def generate_report(export_path, data_test_path=None, stability_path=None, verify=False, power=False,
+                    sweep=False, raw=False, cpus=None, replay=None):
     """
     Generate a full SoftCable report as a .txt file.
 
     export_path: full path to the .txt file to write
     data_test_path: optional path for a quick 4‑run data test
     stability_path: optional path for a 10‑run stability test
+    verify: check the data read back in both tests (see softcable.integrity)
+    power: sample power during both tests (energy per GB, voltage sag)
+    sweep: also run a block size / queue depth sweep on data_test_path
+    raw: also run the read-only raw device test on the disk behind data_test_path
+    cpus: pin the test I/O to these cores (see softcable.cpu_stats)
+    replay: {"data"/"stability"/"sweep": result} from a recording; those results
+            are reported instead of running the tests (see softcable.recording),
+            with "drive" the mount entry recorded for data_test_path
     """
     lines = []
+    with SectionSpans("report") as sections:
+        # Header
+        sections.mark("Header")
+        lines.append("SoftCable USB‑C Diagnostic Report")
+        lines.append(f"Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+        if replay is not None:
+            lines.append("Replayed from a recorded session: tests were not run")
+        lines.append("=" * 60)
+        lines.append("")
+
+        cdata = get_cable_info()
+        known = sync_attached(cdata)
+        fingerprints = {k["fingerprint"] for k in known.values()}
+        fingerprint = fingerprints.pop() if len(fingerprints) == 1 else None
 
-    # Header
-    lines.append("SoftCable USB‑C Diagnostic Report")
-    lines.append(f"Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-    lines.append("=" * 60)
-    lines.append("")
-
-    # Overview
-    lines.append("[Overview]")
-    info = detect_usb_c()
-    if info is None:
-        lines.append("  No USB‑C device detected.")
-    else:
-        lines.append(f"  USB‑C Port: {info.port}")
-        lines.append(f"  Partner Device: {info.partner}")
-        lines.append(f"  Power Delivery Supported: {info.pd_supported}")
-        lines.append(f"  PD Profiles: {info.pd_profiles}")
-        lines.append(f"  Voltage: {info.voltage} V")
-        lines.append(f"  Current: {info.current} A")
-        lines.append(f"  Wattage: {info.wattage} W")
-    lines.append("")
-
-    # Data Test (optional quick run)
-    lines.append("[Data Speed Test]")
-    if data_test_path:
-        result = run_speed_test(data_test_path)
-        if result["error"]:
-            lines.append(f"  Error: {result['error']}")
+        # Overview
+        sections.mark("Overview")
+        lines.append("[Overview]")
+        info = detect_usb_c()
+        if info is None:
+            lines.append("  No USB‑C device detected.")
         else:
-            for i, run in enumerate(result["runs"], start=1):
+            lines.append(f"  USB‑C Port: {info.port}")
+            lines.append(f"  Partner Device: {info.partner}")
+            lines.append(f"  Power Delivery Supported: {info.pd_supported}")
+            lines.append(f"  PD Profiles: {info.pd_profiles}")
+            if info.contract:
                 lines.append(
-                    f"  Run {i}: Write {run['write']} MB/s | Read {run['read']} MB/s"
+                    f"  PD Contract: {info.contract['voltage']} V @ {info.contract['current']} A "
+                    f"({info.contract['wattage']} W)"
                 )
-            lines.append("")
-            lines.append(f"  Average Write: {result['avg_write']} MB/s")
-            lines.append(f"  Average Read: {result['avg_read']} MB/s")
-    else:
-        lines.append("  No data test path provided.")
-    lines.append("")
-
-    # Stability Test (optional)
-    lines.append("[Stability Test]")
-    if stability_path:
-        result = run_stability_test(stability_path)
-        if result["error"]:
-            lines.append(f"  Error: {result['error']}")
+            lines.append(f"  Voltage: {info.voltage} V")
+            lines.append(f"  Current: {info.current} A")
+            lines.append(f"  Wattage: {info.wattage} W")
+        lines.append("")
+
+        # Power Delivery capabilities
+        sections.mark("Power Delivery")
+        lines.append("[Power Delivery]")
+        pd_info = get_pd_info()
+        if not pd_info:
+            lines.append("  No Type‑C ports found.")
         else:
-            for i, run in enumerate(result["runs"], start=1):
-                lines.append(
-                    f"  Run {i}: Write {run['write']} MB/s | Read {run['read']} MB/s"
-                )
+            for port, pd in pd_info.items():
+                lines.append(f"  === {port} ===")
+                for side in ("port", "partner"):
+                    caps = pd[side]
+                    if caps is None:
+                        lines.append(f"    {side.capitalize()}: no PD data")
+                        continue
+                    lines.append(f"    {side.capitalize()} (PD {caps['revision']}):")
+                    for direction in ("source", "sink"):
+                        for pdo in caps[direction]:
+                            lines.append(f"      {direction}: {format_pdo(pdo)}")
+                contract = pd["contract"]
+                if contract:
+                    lines.append(
+                        f"    Contract: {contract['voltage']} V @ {contract['current']} A "
+                        f"({contract['wattage']} W) via {contract['supply']}"
+                    )
+                    if contract["pdo"]:
+                        lines.append(f"    Contract PDO: {format_pdo(contract['pdo'])}")
+        lines.append("")
+
+        # USB4 / Thunderbolt links
+        sections.mark("USB4")
+        lines.append("[USB4 / Thunderbolt]")
+        tb_info = get_usb4_info()
+        if not tb_info or not tb_info["domains"]:
+            lines.append("  No Thunderbolt/USB4 domains found.")
+        else:
+            port_of = {r["name"]: port for port, r in tb_info["ports"].items()}
+            for domain, dinfo in tb_info["domains"].items():
+                lines.append(f"  === {domain} (security: {dinfo['security']}) ===")
+                for router in dinfo["routers"]:
+                    name = f"{router['vendor'] or ''} {router['device'] or ''}".strip() or "unknown"
+                    lines.append(f"    {router['name']}: {name}")
+                    if router["route"]:
+                        lines.append(f"      Link: {describe_link(router) or 'not trained'}")
+                    if router["name"] in port_of:
+                        lines.append(f"      Type‑C Port: {port_of[router['name']]}")
+        lines.append("")
+
+        # Data Test (optional quick run)
+        sections.mark("Data Test")
+        lines.append("[Data Speed Test]")
+        if data_test_path:
+            if replay is not None:
+                drive = replay.get("drive")
+            else:
+                drive = get_mount_index().entry_for_path(data_test_path)
+            if drive:
+                lines.append(f"  Drive: {describe_drive(drive)}")
+            data_fingerprint = fingerprint
+            if drive and drive["typec_port"]:
+                data_fingerprint = cable_for_port(drive["typec_port"], cdata)
+            if replay is not None:
+                result = replay.get("data", NOT_RECORDED)
+            else:
+                result = run_speed_test(data_test_path, verify=verify, power=power, cpus=cpus)
+            if result["error"]:
+                lines.append(f"  Error: {result['error']}")
+            else:
+                record_result(data_fingerprint, "data", result)
+                for i, run in enumerate(result["runs"], start=1):
+                    lines.append(
+                        f"  Run {i}: Write {run['write']} MB/s | Read {run['read']} MB/s"
+                    )
+                    for line in device_run_lines(run) + power_run_lines(run) + cpu_run_lines(run):
+                        lines.append(f"    {line}")
+                    if run["integrity"] and not run["integrity"]["ok"]:
+                        lines.append(f"    Integrity: {format_integrity(run['integrity'])}")
+                lines.append("")
+                lines.append(f"  Average Write: {result['avg_write']} MB/s")
+                lines.append(f"  Average Read: {result['avg_read']} MB/s")
+                for line in device_result_lines(result):
+                    lines.append(f"  {line}")
+                if result["integrity"]:
+                    lines.append(f"  Integrity: {format_integrity(result['integrity'])}")
+                for line in cpu_result_lines(result["cpu"]):
+                    lines.append(f"  {line}")
+                if power:
+                    for line in power_result_lines(result["power"]):
+                        lines.append(f"  {line}")
+                link = single_active_link()
+                if link:
+                    lines.append(f"  USB4 Link: {describe_link(link)}")
+                    lines.append(f"  {compare_to_link(result, link)}")
+        else:
+            lines.append("  No data test path provided.")
+        lines.append("")
+
+        # Saturation sweep (optional)
+        sections.mark("Sweep")
+        if data_test_path and sweep:
+            lines.append("[Saturation Sweep]")
+            result = replay.get("sweep", NOT_RECORDED) if replay is not None else run_sweep(data_test_path)
+            if result["error"]:
+                lines.append(f"  Error: {result['error']}")
+            else:
+                record_result(data_fingerprint, "sweep", result)
+                for cell in result["runs"]:
+                    lines.append(f"  {format_cell(cell)}")
+                lines.append("")
+                for line in sweep_result_lines(result):
+                    lines.append(f"  {line}")
             lines.append("")
-            lines.append(f"  Write Variance: {result['write_var']} MB/s")
-            lines.append(f"  Read Variance: {result['read_var']} MB/s")
-            lines.append(f"  Stability Score: {result['score']}/100")
-    else:
-        lines.append("  No stability test path provided.")
-    lines.append("")
-
-    # One snapshot of power
-    lines.append("[Power Snapshot]")
-    pdata = read_power_values()
-    if pdata is None:
-        lines.append("  No power data available.")
-    elif "error" in pdata:
-        lines.append(f"  Error: {pdata['error']}")
-    else:
-        lines.append(f"  Voltage: {pdata['voltage']} V")
-        lines.append(f"  Current: {pdata['current']} A")
-        lines.append(f"  Wattage: {pdata['wattage']} W")
-    lines.append("")
-
-    # Cable Identity
-    lines.append("[Cable Identity / E‑Marker]")
-    cdata = get_cable_info()
-    if not cdata:
-        lines.append("  No cable identity data found.")
-    else:
-        for cable, info in cdata.items():
-            lines.append(f"  === {cable} ===")
-            if "note" in info:
-                lines.append(f"    {info['note']}")
-                continue
-            identity = info.get("identity", None)
-            for key, val in info.items():
-                if key == "identity":
-                    continue
-                lines.append(f"    {key}: {val}")
-            if identity:
-                lines.append("    [Identity Block]")
-                for id_key, id_val in identity.items():
-                    lines.append(f"      {id_key}: {id_val}")
+
+        # Raw device test (optional, never writes)
+        sections.mark("Raw Device")
+        if data_test_path and raw and replay is None:
+            lines.append("[Raw Device Read Test]")
+            result = run_raw_read_test(data_test_path)
+            if result["error"]:
+                lines.append(f"  Error: {result['error']}")
             else:
-                lines.append("    No identity block exposed.")
+                record_result(data_fingerprint, "raw", result)
+                for line in raw_result_lines(result):
+                    lines.append(f"  {line}")
+            lines.append("")
+
+        # Stability Test (optional)
+        sections.mark("Stability Test")
+        lines.append("[Stability Test]")
+        if stability_path:
+            if replay is not None:
+                result = replay.get("stability", NOT_RECORDED)
+            else:
+                result = run_stability_test(stability_path, verify=verify, power=power, cpus=cpus)
+            if result["error"]:
+                lines.append(f"  Error: {result['error']}")
+            else:
+                record_result(fingerprint, "stability", result)
+                for i, run in enumerate(result["runs"], start=1):
+                    lines.append(
+                        f"  Run {i}: Write {run['write']} MB/s | Read {run['read']} MB/s"
+                    )
+                    for line in device_run_lines(run) + power_run_lines(run) + cpu_run_lines(run):
+                        lines.append(f"    {line}")
+                    if run["integrity"] and not run["integrity"]["ok"]:
+                        lines.append(f"    Integrity: {format_integrity(run['integrity'])}")
+                lines.append("")
+                lines.append(f"  Write Variance: {result['write_var']} MB/s")
+                lines.append(f"  Read Variance: {result['read_var']} MB/s")
+                lines.append(f"  Stability Score: {result['score']}/100")
+                for line in device_result_lines(result):
+                    lines.append(f"  {line}")
+                if result["integrity"]:
+                    lines.append(f"  Integrity: {format_integrity(result['integrity'])}")
+                for line in cpu_result_lines(result["cpu"]):
+                    lines.append(f"  {line}")
+                if power:
+                    for line in power_result_lines(result["power"]):
+                        lines.append(f"  {line}")
+        else:
+            lines.append("  No stability test path provided.")
+        lines.append("")
+
+        # One snapshot of power
+        sections.mark("Power Snapshot")
+        lines.append("[Power Snapshot]")
+        pdata = read_power_values()
+        if pdata is None:
+            lines.append("  No power data available.")
+        elif "error" in pdata:
+            lines.append(f"  Error: {pdata['error']}")
+        else:
+            lines.append(f"  Voltage: {pdata['voltage']} V")
+            lines.append(f"  Current: {pdata['current']} A")
+            lines.append(f"  Wattage: {pdata['wattage']} W")
+            limits = get_power_limits()
+            for warning in check_power_limits(pdata, limits["contract"], limits["cable"]):
+                lines.append(f"  Warning: {warning}")
+        lines.append("")
+
+        # Cable Identity
+        sections.mark("Cable Identity")
+        lines.append("[Cable Identity / E‑Marker]")
+        if not cdata:
+            lines.append("  No cable identity data found.")
+        else:
+            for cable, info in cdata.items():
+                lines.append(f"  === {cable} ===")
+                if "note" in info:
+                    lines.append(f"    {info['note']}")
+                    continue
+                identity = info.get("identity", None)
+                for key, val in info.items():
+                    if key in ("identity", "decoded"):
+                        continue
+                    lines.append(f"    {key}: {val}")
+                if identity:
+                    lines.append("    [Identity Block]")
+                    for id_key, id_val in identity.items():
+                        lines.append(f"      {id_key}: {id_val}")
+                else:
+                    lines.append("    No identity block exposed.")
+                decoded = info.get("decoded")
+                if decoded:
+                    lines.append("    [Decoded VDOs]")
+                    for dec_key, dec_val in decoded.items():
+                        lines.append(f"      {dec_key}: {dec_val}")
+                if cable in known:
+                    lines.append("    [History]")
+                    for line in format_history(known[cable]["history"]):
+                        lines.append(f"      {line}")
+                lines.append("")
+        lines.append("")
+
+        # Raw Data (summary dump)
+        sections.mark("Raw Data")
+        lines.append("[Raw USB/PD System Data]")
+        # Records rather than dicts: the largest part of the report, at a third of the memory
+        rdata = get_raw_snapshot().to_sections()
+        for section, content in rdata.items():
+            lines.append(f"  === {section.upper()} ===")
+            if content is None:
+                lines.append("    No data available.")
+                continue
+            for item, values in content.items():
+                lines.append(f"    [{item}]")
+                if values:
+                    for key, val in values.items():
+                        lines.append(f"      {key}: {val}")
             lines.append("")
-    lines.append("")
-
-    # Raw Data (summary dump)
-    lines.append("[Raw USB/PD System Data]")
-    rdata = get_raw_data()
-    for section, content in (rdata or {}).items():
-        lines.append(f"  === {section.upper()} ===")
-        if content is None:
-            lines.append("    No data available.")
-            continue
-        for item, values in content.items():
-            lines.append(f"    [{item}]")
-            if values:
-                for key, val in values.items():
-                    lines.append(f"      {key}: {val}")
         lines.append("")
-    lines.append("")
 
-    # Write file
-    os.makedirs(os.path.dirname(export_path), exist_ok=True)
-    with open(export_path, "w") as f:
-        f.write("\n".join(lines))
+        # Write file
+        sections.mark("Write File")
+        os.makedirs(os.path.dirname(export_path), exist_ok=True)
+        with open(export_path, "w") as f:
+            f.write("\n".join(lines))
 
     return export_path
@@ -4,15 +4,30 @@ import os
 import threading
 import time
 
-# === Backend imports (unchanged) ===
+# === Backend imports (tests go through the station agent when it is up, see run_test) ===
 from softcable.usb_reader import detect_usb_c
-from softcable.data_test import run_speed_test
-from softcable.power_test import read_power_values
-from softcable.stability_test import run_stability_test
-from softcable.raw_data import get_raw_data
+from softcable.executor import run_speed_test, run_stability_test, run_sweep, cleanup_orphans
+from softcable.power_test import (
+    get_power_limits, read_power_checked, power_run_lines, power_result_lines
+)
+from softcable.raw_data import get_raw_snapshot
 from softcable.cable_identity import get_cable_info
 from softcable.export_txt import generate_report
-from softcable.lanes import get_lane_summary
+from softcable.lanes import get_lane_summary, get_all_lane_summaries
+from softcable.mount_index import get_mount_index, describe_drive
+from softcable.block_stats import device_run_lines, device_result_lines
+from softcable.integrity import format_integrity
+from softcable.cpu_stats import parse_cpu_list, cpu_run_lines, cpu_result_lines
+from softcable.sweep import format_cell, sweep_result_lines
+from softcable.raw_device import run_raw_read_test, raw_result_lines
+from softcable import recording, tracing
+from softcable.agent import call_or_run
+from softcable.recording import Recording, record_line, recording_lines, replay_report
+from softcable.thunderbolt import single_active_link, describe_link, compare_to_link
+from softcable.cable_cache import (
+    sync_attached, get_history, single_attached_cable, cable_for_port,
+    suggested_runs, record_result, format_history
+)
 
 
 class SoftCableGUI:
@@ -26,6 +41,7 @@ class SoftCableGUI:
 
         self.base_mount_dir = "/run/media/"
         self.power_running = False
+        self.test_running = False
 
         # === Top bar with theme toggle ===
         topbar = ctk.CTkFrame(self.root, height=50)
@@ -41,6 +57,21 @@ class SoftCableGUI:
         self.theme_switch.set("Dark")
         self.theme_switch.pack(side="right", padx=20)
 
+        # Diagnostics: span tracing and the sampling profiler, saved when switched off;
+        # session recording writes as it goes
+        self.record_switch = ctk.CTkSwitch(topbar, text="Record", command=self.toggle_recording)
+        self.record_switch.pack(side="right", padx=10)
+        self.profile_switch = ctk.CTkSwitch(topbar, text="Profile", command=self.toggle_profiler)
+        self.profile_switch.pack(side="right", padx=10)
+        self.trace_switch = ctk.CTkSwitch(topbar, text="Trace", command=self.toggle_tracing)
+        self.trace_switch.pack(side="right", padx=10)
+        if tracing.ENABLED:
+            self.trace_switch.select()
+        if tracing.profiler_running():
+            self.profile_switch.select()
+        if recording.ENABLED:
+            self.record_switch.select()
+
         # === Tab system ===
         self.tabs = ctk.CTkTabview(self.root)
         self.tabs.pack(fill="both", expand=True, padx=10, pady=10)
@@ -54,6 +85,7 @@ class SoftCableGUI:
         self.create_raw_tab()
         self.create_identity_tab()
         self.create_export_tab()
+        self.create_replay_tab()
 
     # ============================================================
     #  THEME SWITCH
@@ -61,6 +93,99 @@ class SoftCableGUI:
     def change_theme(self, mode):
         ctk.set_appearance_mode(mode.lower())
 
+    # ============================================================
+    #  TRACING / PROFILING
+    # ============================================================
+    def toggle_tracing(self):
+        if self.trace_switch.get():
+            tracing.clear()
+            tracing.enable()
+            return
+
+        tracing.disable()
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Chrome trace", "*.json")],
+            title="Save Trace"
+        )
+        if path:
+            tracing.export_chrome_trace(path)
+
+    def toggle_profiler(self):
+        if self.profile_switch.get():
+            tracing.start_profiler()
+            return
+
+        path = filedialog.asksaveasfilename(
+            defaultextension=".folded",
+            filetypes=[("Folded stacks", "*.folded")],
+            title="Save Profile"
+        )
+        tracing.stop_profiler(path or None)
+
+    def toggle_recording(self):
+        if not self.record_switch.get():
+            recording.stop_recording()
+            return
+
+        path = filedialog.asksaveasfilename(
+            defaultextension=".screc",
+            filetypes=[("SoftCable recording", "*.screc")],
+            title="Record Session To"
+        )
+        if path:
+            recording.start_recording(path)
+        else:
+            self.record_switch.deselect()
+
+    # ============================================================
+    #  BACKGROUND TESTS
+    # ============================================================
+    def test_busy(self, box):
+        """True (and a note in `box`) while another test is still running."""
+        if not self.test_running:
+            return False
+        box.configure(state="normal")
+        box.insert("end", "Another test is still running.\n")
+        box.configure(state="disabled")
+        return True
+
+    def run_in_background(self, box, func, done, *args, **kwargs):
+        """
+        Run func(*args, **kwargs) off the Tk thread and hand its result to
+        `done` back on the Tk thread, so a drive that stops responding never
+        freezes the window. Exceptions arrive as {"error": ...}.
+        """
+        self.test_running = True
+        box.insert("end", "Running…\n")
+        box.configure(state="disabled")
+
+        def finish(result):
+            self.test_running = False
+            box.configure(state="normal")
+            done(result)
+            box.configure(state="disabled")
+
+        def work():
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                result = {"error": str(e)}
+            self.root.after(0, finish, result)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def run_test(self, box, method, fallback, done, **params):
+        """
+        run_in_background through the station agent when one is running, so
+        tests get its warm payloads and pool; in this process otherwise, and
+        while recording or tracing, so the session log and trace get the runs.
+        """
+        if recording.ENABLED or tracing.ENABLED or tracing.profiler_running():
+            self.run_in_background(box, fallback, done, **params)
+        else:
+            self.run_in_background(box, call_or_run, done, method, fallback, **params)
+
     # ============================================================
     #  TAB: OVERVIEW
     # ============================================================
@@ -75,6 +200,7 @@ class SoftCableGUI:
 
         ctk.CTkButton(tab, text="Refresh", command=self.refresh_overview).pack(pady=5)
 
+    @tracing.traced()
     def refresh_overview(self):
         info = detect_usb_c()
 
@@ -87,11 +213,23 @@ class SoftCableGUI:
             self.overview_box.insert("end", f"USB‑C Port: {info.port}\n")
             self.overview_box.insert("end", f"Partner Device: {info.partner}\n")
             self.overview_box.insert("end", f"Power Delivery Supported: {info.pd_supported}\n")
-            self.overview_box.insert("end", f"PD Profiles: {info.pd_profiles}\n\n")
+            self.overview_box.insert("end", f"PD Profiles: {info.pd_profiles}\n")
+            if info.contract:
+                self.overview_box.insert(
+                    "end",
+                    f"PD Contract: {info.contract['voltage']} V @ {info.contract['current']} A "
+                    f"({info.contract['wattage']} W)\n"
+                )
+            self.overview_box.insert("end", "\n")
             self.overview_box.insert("end", f"Voltage: {info.voltage} V\n")
             self.overview_box.insert("end", f"Current: {info.current} A\n")
             self.overview_box.insert("end", f"Wattage: {info.wattage} W\n")
 
+        for cable, known in sync_attached().items():
+            self.overview_box.insert("end", f"\nCable {cable} ({known['fingerprint']}):\n")
+            for line in format_history(known["history"]):
+                self.overview_box.insert("end", f"  {line}\n")
+
         self.overview_box.configure(state="disabled")
 
     # ============================================================
@@ -108,20 +246,45 @@ class SoftCableGUI:
 
         ctk.CTkButton(tab, text="Refresh Lanes", command=self.refresh_lanes).pack(pady=5)
 
+    @tracing.traced()
     def refresh_lanes(self):
-        summary = get_lane_summary()
+        summaries = get_all_lane_summaries() or [get_lane_summary()]
 
         self.lanes_box.configure(state="normal")
         self.lanes_box.delete("1.0", "end")
 
-        self.lanes_box.insert("end", f"Port: {summary.get('port')}\n")
-        self.lanes_box.insert("end", f"Mode: {summary.get('mode')}\n")
-        self.lanes_box.insert("end", f"Power Role: {summary.get('power_role')}\n")
-        self.lanes_box.insert("end", f"Data Role: {summary.get('data_role')}\n\n")
-
-        lanes = summary.get("lanes", ["unknown"] * 4)
-        for i, lane in enumerate(lanes, start=1):
-            self.lanes_box.insert("end", f"Lane {i}: {lane}\n")
+        for summary in summaries:
+            self.lanes_box.insert("end", f"Port: {summary.get('port')}\n")
+            self.lanes_box.insert("end", f"Mode: {summary.get('mode')}\n")
+            self.lanes_box.insert("end", f"Power Role: {summary.get('power_role')}\n")
+            self.lanes_box.insert("end", f"Data Role: {summary.get('data_role')}\n")
+            if summary.get("orientation"):
+                self.lanes_box.insert("end", f"Orientation: {summary['orientation']}\n")
+            if summary.get("altmodes"):
+                self.lanes_box.insert("end", f"Alt Modes: {', '.join(summary['altmodes'])}\n")
+            if summary.get("usb_device"):
+                self.lanes_box.insert(
+                    "end", f"USB Link: {summary['usb_device']} @ {summary.get('usb_speed')} Gbit/s\n"
+                )
+            if summary.get("usb4_link"):
+                self.lanes_box.insert("end", f"USB4 Link: {summary['usb4_link']}\n")
+            if summary.get("confidence"):
+                self.lanes_box.insert("end", f"Confidence: {summary['confidence']}\n")
+            self.lanes_box.insert("end", "\n")
+
+            lane_map = summary.get("lane_map")
+            if lane_map:
+                for i, lane in enumerate(lane_map, start=1):
+                    self.lanes_box.insert(
+                        "end",
+                        f"Lane {i} ({lane['pair']}): {lane['use']} "
+                        f"[{lane['confidence']}] {lane['source'] or ''}\n"
+                    )
+            else:
+                lanes = summary.get("lanes", ["unknown"] * 4)
+                for i, lane in enumerate(lanes, start=1):
+                    self.lanes_box.insert("end", f"Lane {i}: {lane}\n")
+            self.lanes_box.insert("end", "\n")
 
         self.lanes_box.configure(state="disabled")
 
@@ -145,7 +308,20 @@ class SoftCableGUI:
         self.path_entry.pack(pady=5)
 
         ctk.CTkButton(tab, text="Browse", command=self.browse_path).pack()
+
+        self.verify_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(tab, text="Verify data integrity", variable=self.verify_var).pack(pady=5)
+
+        self.power_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(tab, text="Measure power under load", variable=self.power_var).pack(pady=5)
+
+        ctk.CTkLabel(tab, text="Pin test I/O to cores (e.g. 2,3; empty = no pinning):").pack()
+        self.cpus_entry = ctk.CTkEntry(tab, width=200)
+        self.cpus_entry.pack(pady=5)
+
         ctk.CTkButton(tab, text="Run Test", command=self.run_data_test).pack(pady=10)
+        ctk.CTkButton(tab, text="Run Block Size / Queue Depth Sweep", command=self.run_data_sweep).pack(pady=5)
+        ctk.CTkButton(tab, text="Run Read-Only Raw Device Test", command=self.run_raw_test).pack(pady=5)
 
         self.data_box = ctk.CTkTextbox(tab, height=350, width=900)
         self.data_box.pack(pady=10)
@@ -153,17 +329,17 @@ class SoftCableGUI:
 
         self.refresh_drives()
 
+    @tracing.traced()
     def refresh_drives(self):
-        drives = []
+        index = get_mount_index()
+        drives = [e["mountpoint"] for e in index.usb_drives()]
 
-        if os.path.exists(self.base_mount_dir):
-            for user_folder in os.listdir(self.base_mount_dir):
-                user_path = os.path.join(self.base_mount_dir, user_folder)
-                if os.path.isdir(user_path):
-                    for entry in os.listdir(user_path):
-                        full_path = os.path.join(user_path, entry)
-                        if os.path.isdir(full_path):
-                            drives.append(full_path)
+        # Put the drive behind the cable under test first
+        cable_ports = {key.split("/")[0] for key in (get_cable_info() or {})}
+        for port in sorted(cable_ports):
+            for entry in index.drives_on_port(port):
+                drives.remove(entry["mountpoint"])
+                drives.insert(0, entry["mountpoint"])
 
         self.drive_dropdown.configure(values=drives)
 
@@ -182,8 +358,11 @@ class SoftCableGUI:
             self.path_entry.delete(0, "end")
             self.path_entry.insert(0, path)
 
+    @tracing.traced()
     def run_data_test(self):
         path = self.path_entry.get().strip()
+        if self.test_busy(self.data_box):
+            return
 
         self.data_box.configure(state="normal")
         self.data_box.delete("1.0", "end")
@@ -193,19 +372,126 @@ class SoftCableGUI:
             self.data_box.configure(state="disabled")
             return
 
-        result = run_speed_test(path)
+        drive = get_mount_index().entry_for_path(path)
+        if drive:
+            self.data_box.insert("end", f"Drive: {describe_drive(drive)}\n\n")
+
+        if drive and drive["typec_port"]:
+            fingerprint = cable_for_port(drive["typec_port"])
+        else:
+            fingerprint = single_attached_cable()
+        runs = suggested_runs(get_history(fingerprint), "data", 4)
+        if runs < 4:
+            self.data_box.insert("end", f"Known cable with a recent result: shortened to {runs} runs.\n\n")
+
+        try:
+            cpus = parse_cpu_list(self.cpus_entry.get())
+        except ValueError:
+            self.data_box.insert("end", "Cores must be a list such as 2,3 or 2-3.\n")
+            self.data_box.configure(state="disabled")
+            return
+
+        power = self.power_var.get()
+        self.run_test(self.data_box, "run_speed_test", run_speed_test,
+                      lambda result: self.show_data_result(result, fingerprint, power),
+                      target_path=path, runs=runs, verify=self.verify_var.get(), power=power, cpus=cpus)
 
+    def show_data_result(self, result, fingerprint, power):
         if result["error"]:
             self.data_box.insert("end", f"Error: {result['error']}\n")
         else:
+            record_result(fingerprint, "data", result)
+
             for i, run in enumerate(result["runs"], start=1):
                 self.data_box.insert("end", f"Run {i}: Write {run['write']} MB/s | Read {run['read']} MB/s\n")
+                for line in device_run_lines(run) + power_run_lines(run) + cpu_run_lines(run):
+                    self.data_box.insert("end", f"  {line}\n")
+                if run["integrity"] and not run["integrity"]["ok"]:
+                    self.data_box.insert("end", f"  Integrity: {format_integrity(run['integrity'])}\n")
 
             self.data_box.insert("end", "\n")
             self.data_box.insert("end", f"Average Write Speed: {result['avg_write']} MB/s\n")
             self.data_box.insert("end", f"Average Read Speed: {result['avg_read']} MB/s\n")
+            for line in device_result_lines(result):
+                self.data_box.insert("end", f"{line}\n")
+            if result["integrity"]:
+                self.data_box.insert("end", f"Integrity: {format_integrity(result['integrity'])}\n")
+            for line in cpu_result_lines(result["cpu"]):
+                self.data_box.insert("end", f"{line}\n")
+            if power:
+                for line in power_result_lines(result["power"]):
+                    self.data_box.insert("end", f"{line}\n")
+
+            link = single_active_link()
+            if link:
+                self.data_box.insert("end", f"\nUSB4 Link: {describe_link(link)}\n")
+                self.data_box.insert("end", f"{compare_to_link(result, link)}\n")
+
+    @tracing.traced()
+    def run_data_sweep(self):
+        path = self.path_entry.get().strip()
+        if self.test_busy(self.data_box):
+            return
 
-        self.data_box.configure(state="disabled")
+        self.data_box.configure(state="normal")
+        self.data_box.delete("1.0", "end")
+
+        if not path:
+            self.data_box.insert("end", "Please select a valid USB drive.\n")
+            self.data_box.configure(state="disabled")
+            return
+
+        drive = get_mount_index().entry_for_path(path)
+        if drive and drive["typec_port"]:
+            fingerprint = cable_for_port(drive["typec_port"])
+        else:
+            fingerprint = single_attached_cable()
+
+        self.run_test(self.data_box, "run_sweep", run_sweep,
+                      lambda result: self.show_sweep_result(result, fingerprint), target_path=path)
+
+    def show_sweep_result(self, result, fingerprint):
+        if result["error"]:
+            self.data_box.insert("end", f"Error: {result['error']}\n")
+        else:
+            record_result(fingerprint, "sweep", result)
+
+            for cell in result["runs"]:
+                self.data_box.insert("end", f"{format_cell(cell)}\n")
+            self.data_box.insert("end", "\n")
+            for line in sweep_result_lines(result):
+                self.data_box.insert("end", f"{line}\n")
+
+    @tracing.traced()
+    def run_raw_test(self):
+        path = self.path_entry.get().strip()
+        if self.test_busy(self.data_box):
+            return
+
+        self.data_box.configure(state="normal")
+        self.data_box.delete("1.0", "end")
+
+        if not path:
+            self.data_box.insert("end", "Please select a USB drive or a device such as /dev/sdb.\n")
+            self.data_box.configure(state="disabled")
+            return
+
+        drive = get_mount_index().entry_for_path(path)
+        if drive and drive["typec_port"]:
+            fingerprint = cable_for_port(drive["typec_port"])
+        else:
+            fingerprint = single_attached_cable()
+
+        self.run_test(self.data_box, "run_raw_read_test", run_raw_read_test,
+                      lambda result: self.show_raw_result(result, fingerprint), path=path)
+
+    def show_raw_result(self, result, fingerprint):
+        if result["error"]:
+            self.data_box.insert("end", f"Error: {result['error']}\n")
+        else:
+            record_result(fingerprint, "raw", result)
+            for line in raw_result_lines(result):
+                self.data_box.insert("end", f"{line}\n")
 
     # ============================================================
     #  TAB: POWER TEST (Live Dashboard)
@@ -219,11 +505,15 @@ class SoftCableGUI:
         self.current_label = ctk.CTkLabel(tab, text="Current: -- A", font=("Arial", 16))
         self.wattage_label = ctk.CTkLabel(tab, text="Wattage: -- W", font=("Arial", 16))
         self.stability_label = ctk.CTkLabel(tab, text="Stability: -- W", font=("Arial", 16))
+        self.contract_label = ctk.CTkLabel(tab, text="Contract: --", font=("Arial", 14))
+        self.limit_label = ctk.CTkLabel(tab, text="", font=("Arial", 14), text_color="orange")
 
         self.voltage_label.pack(pady=5)
         self.current_label.pack(pady=5)
         self.wattage_label.pack(pady=5)
         self.stability_label.pack(pady=5)
+        self.contract_label.pack(pady=5)
+        self.limit_label.pack(pady=5)
 
         ctk.CTkButton(tab, text="Start Monitoring", command=self.start_power_test).pack(pady=10)
         ctk.CTkButton(tab, text="Stop Monitoring", command=self.stop_power_test).pack()
@@ -239,8 +529,19 @@ class SoftCableGUI:
     def power_loop(self):
         readings = []
 
+        # Contract and cable rating only change on renegotiation / replug
+        limits = get_power_limits()
+        contract = limits["contract"]
+        if contract:
+            self.contract_label.configure(
+                text=f"Contract ({limits['port']}): {contract['voltage']} V @ {contract['current']} A"
+                     f" ({contract['wattage']} W)"
+            )
+        else:
+            self.contract_label.configure(text="Contract: unknown")
+
         while self.power_running:
-            data = read_power_values()
+            data = read_power_checked(limits)
 
             if data is None or "error" in data:
                 self.voltage_label.configure(text="Voltage: -- V")
@@ -264,6 +565,7 @@ class SoftCableGUI:
             self.current_label.configure(text=f"Current: {current} A")
             self.wattage_label.configure(text=f"Wattage: {wattage} W")
             self.stability_label.configure(text=f"Stability: {stability} W")
+            self.limit_label.configure(text="\n".join(data["warnings"]))
 
             time.sleep(1)
 
@@ -280,6 +582,13 @@ class SoftCableGUI:
         self.stab_path_entry.pack(pady=5)
 
         ctk.CTkButton(tab, text="Use Data Test Path", command=self.copy_data_path).pack(pady=5)
+
+        self.stab_verify_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(tab, text="Verify data integrity", variable=self.stab_verify_var).pack(pady=5)
+
+        self.stab_power_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(tab, text="Measure power under load", variable=self.stab_power_var).pack(pady=5)
+
         ctk.CTkButton(tab, text="Run Stability Test", command=self.run_stability).pack(pady=10)
 
         self.stab_box = ctk.CTkTextbox(tab, height=350, width=900)
@@ -290,8 +599,11 @@ class SoftCableGUI:
         self.stab_path_entry.delete(0, "end")
         self.stab_path_entry.insert(0, self.path_entry.get())
 
+    @tracing.traced()
     def run_stability(self):
         path = self.stab_path_entry.get().strip()
+        if self.test_busy(self.stab_box):
+            return
 
         self.stab_box.configure(state="normal")
         self.stab_box.delete("1.0", "end")
@@ -301,20 +613,49 @@ class SoftCableGUI:
             self.stab_box.configure(state="disabled")
             return
 
-        result = run_stability_test(path)
+        fingerprint = single_attached_cable()
+        runs = suggested_runs(get_history(fingerprint), "stability", 10)
+        if runs < 10:
+            self.stab_box.insert("end", f"Known cable with a recent result: shortened to {runs} runs.\n\n")
+
+        try:
+            cpus = parse_cpu_list(self.cpus_entry.get())
+        except ValueError:
+            self.stab_box.insert("end", "Cores on the Data Test tab must be a list such as 2,3 or 2-3.\n")
+            self.stab_box.configure(state="disabled")
+            return
+
+        power = self.stab_power_var.get()
+        self.run_test(self.stab_box, "run_stability_test", run_stability_test,
+                      lambda result: self.show_stability_result(result, fingerprint, power),
+                      path=path, runs=runs, verify=self.stab_verify_var.get(), power=power, cpus=cpus)
 
+    def show_stability_result(self, result, fingerprint, power):
         if result["error"]:
             self.stab_box.insert("end", f"Error: {result['error']}\n")
         else:
+            record_result(fingerprint, "stability", result)
+
             for i, run in enumerate(result["runs"], start=1):
                 self.stab_box.insert("end", f"Run {i}: Write {run['write']} MB/s | Read {run['read']} MB/s\n")
+                for line in device_run_lines(run) + power_run_lines(run) + cpu_run_lines(run):
+                    self.stab_box.insert("end", f"  {line}\n")
+                if run["integrity"] and not run["integrity"]["ok"]:
+                    self.stab_box.insert("end", f"  Integrity: {format_integrity(run['integrity'])}\n")
 
             self.stab_box.insert("end", "\n")
             self.stab_box.insert("end", f"Write Variance: {result['write_var']} MB/s\n")
             self.stab_box.insert("end", f"Read Variance: {result['read_var']} MB/s\n")
             self.stab_box.insert("end", f"Stability Score: {result['score']}/100\n")
-
-        self.stab_box.configure(state="disabled")
+            for line in device_result_lines(result):
+                self.stab_box.insert("end", f"{line}\n")
+            if result["integrity"]:
+                self.stab_box.insert("end", f"Integrity: {format_integrity(result['integrity'])}\n")
+            for line in cpu_result_lines(result["cpu"]):
+                self.stab_box.insert("end", f"{line}\n")
+            if power:
+                for line in power_result_lines(result["power"]):
+                    self.stab_box.insert("end", f"{line}\n")
 
     # ============================================================
     #  TAB: RAW DATA
@@ -330,13 +671,14 @@ class SoftCableGUI:
         self.raw_box.pack(pady=10)
         self.raw_box.configure(state="disabled")
 
+    @tracing.traced()
     def refresh_raw(self):
-        data = get_raw_data()
+        data = get_raw_snapshot().to_sections()
 
         self.raw_box.configure(state="normal")
         self.raw_box.delete("1.0", "end")
 
-        for section, content in (data or {}).items():
+        for section, content in data.items():
             self.raw_box.insert("end", f"=== {section.upper()} ===\n\n")
 
             if content is None:
@@ -366,6 +708,7 @@ class SoftCableGUI:
         self.identity_box.pack(pady=10)
         self.identity_box.configure(state="disabled")
 
+    @tracing.traced()
     def refresh_identity(self):
         data = get_cable_info()
 
@@ -382,6 +725,8 @@ class SoftCableGUI:
             self.identity_box.configure(state="disabled")
             return
 
+        known = sync_attached(data)
+
         for cable, info in data.items():
             self.identity_box.insert("end", f"=== {cable} ===\n")
 
@@ -392,7 +737,7 @@ class SoftCableGUI:
             identity = info.get("identity", None)
 
             for key, val in info.items():
-                if key != "identity":
+                if key not in ("identity", "decoded"):
                     self.identity_box.insert("end", f"  {key}: {val}\n")
 
             if identity:
@@ -402,6 +747,17 @@ class SoftCableGUI:
             else:
                 self.identity_box.insert("end", "  No identity block exposed.\n")
 
+            decoded = info.get("decoded")
+            if decoded:
+                self.identity_box.insert("end", "  [Decoded VDOs]\n")
+                for dec_key, dec_val in decoded.items():
+                    self.identity_box.insert("end", f"    {dec_key}: {dec_val}\n")
+
+            if cable in known:
+                self.identity_box.insert("end", "  [History]\n")
+                for line in format_history(known[cable]["history"]):
+                    self.identity_box.insert("end", f"    {line}\n")
+
             self.identity_box.insert("end", "\n")
 
         self.identity_box.configure(state="disabled")
@@ -426,6 +782,14 @@ class SoftCableGUI:
 
         ctk.CTkButton(tab, text="Use Stability Test Path", command=self.fill_export_stab_path).pack(pady=5)
 
+        self.sweep_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(tab, text="Include block size / queue depth sweep on the data test path",
+                        variable=self.sweep_var).pack(pady=5)
+
+        self.raw_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(tab, text="Include read-only raw device test for the data test path",
+                        variable=self.raw_var).pack(pady=5)
+
         ctk.CTkButton(tab, text="Export Report as .txt", command=self.export_report).pack(pady=15)
 
         self.export_box = ctk.CTkTextbox(tab, height=200, width=900)
@@ -440,7 +804,10 @@ class SoftCableGUI:
         self.export_stab_entry.delete(0, "end")
         self.export_stab_entry.insert(0, self.stab_path_entry.get())
 
+    @tracing.traced()
     def export_report(self):
+        if self.test_busy(self.export_box):
+            return
         self.export_box.configure(state="normal")
         self.export_box.delete("1.0", "end")
 
@@ -459,18 +826,147 @@ class SoftCableGUI:
         stab_path = self.export_stab_entry.get().strip() or None
 
         try:
-            path = generate_report(export_file, data_test_path=data_path, stability_path=stab_path)
-            self.export_box.insert("end", f"Report exported to:\n{path}\n")
-        except Exception as e:
-            self.export_box.insert("end", f"Error exporting report: {e}\n")
+            cpus = parse_cpu_list(self.cpus_entry.get())
+        except ValueError:
+            self.export_box.insert("end", "Cores on the Data Test tab must be a list such as 2,3 or 2-3.\n")
+            self.export_box.configure(state="disabled")
+            return
 
-        self.export_box.configure(state="disabled")
+        # The report runs the tests too, so it is built off the Tk thread as well
+        self.run_test(self.export_box, "generate_report", generate_report, self.show_export_result,
+                      export_path=export_file, data_test_path=data_path, stability_path=stab_path,
+                      verify=self.verify_var.get(), power=self.power_var.get(),
+                      sweep=self.sweep_var.get(), raw=self.raw_var.get(), cpus=cpus)
+
+    def show_export_result(self, result):
+        if isinstance(result, dict):
+            self.export_box.insert("end", f"Error exporting report: {result['error']}\n")
+        else:
+            self.export_box.insert("end", f"Report exported to:\n{result}\n")
+
+
+    # ============================================================
+    #  TAB: REPLAY
+    # ============================================================
+    def create_replay_tab(self):
+        tab = self.tabs.add("Replay")
+
+        ctk.CTkLabel(tab, text="Replay a Recorded Session", font=("Arial", 18, "bold")).pack(pady=10)
+
+        self.replay = None
+        self.replay_stop = threading.Event()
+        ctk.CTkButton(tab, text="Open Recording…", command=self.open_recording).pack(pady=5)
+
+        controls = ctk.CTkFrame(tab)
+        controls.pack(pady=5)
+        ctk.CTkLabel(controls, text="From (s):").pack(side="left", padx=5)
+        self.replay_from_entry = ctk.CTkEntry(controls, width=80)
+        self.replay_from_entry.insert(0, "0")
+        self.replay_from_entry.pack(side="left", padx=5)
+        ctk.CTkLabel(controls, text="Speed (x, 0 = instant):").pack(side="left", padx=5)
+        self.replay_speed_entry = ctk.CTkEntry(controls, width=60)
+        self.replay_speed_entry.insert(0, "1")
+        self.replay_speed_entry.pack(side="left", padx=5)
+        ctk.CTkButton(controls, text="Play", command=self.play_recording).pack(side="left", padx=5)
+        ctk.CTkButton(controls, text="Stop", command=lambda: self.replay_stop.set()).pack(side="left", padx=5)
+        ctk.CTkButton(controls, text="Export Report at From",
+                      command=self.export_replay_report).pack(side="left", padx=5)
+
+        self.replay_power_label = ctk.CTkLabel(tab, text="Power: --", font=("Arial", 14))
+        self.replay_power_label.pack(pady=5)
+
+        self.replay_box = ctk.CTkTextbox(tab, height=400, width=900)
+        self.replay_box.pack(pady=10)
+        self.replay_box.configure(state="disabled")
+
+    def replay_message(self, text):
+        self.replay_box.configure(state="normal")
+        self.replay_box.insert("end", text + "\n")
+        self.replay_box.see("end")
+        self.replay_box.configure(state="disabled")
+
+    def open_recording(self):
+        path = filedialog.askopenfilename(
+            filetypes=[("SoftCable recording", "*.screc"), ("All files", "*")],
+            title="Open Recording"
+        )
+        if not path:
+            return
+
+        self.replay_stop.set()
+        self.replay_box.configure(state="normal")
+        self.replay_box.delete("1.0", "end")
+        self.replay_box.configure(state="disabled")
+        try:
+            self.replay = Recording(path)
+        except (OSError, ValueError) as e:
+            self.replay = None
+            self.replay_message(f"Error: {e}")
+            return
+        for line in recording_lines(self.replay):
+            self.replay_message(line)
+
+    def replay_position(self):
+        try:
+            return float(self.replay_from_entry.get() or 0), float(self.replay_speed_entry.get() or 0)
+        except ValueError:
+            self.replay_message("From and Speed must be numbers.")
+            return None
+
+    def play_recording(self):
+        position = self.replay_position() if self.replay else None
+        if position is None:
+            if not self.replay:
+                self.replay_message("Open a recording first.")
+            return
+
+        self.replay_stop.set()
+        self.replay_stop = threading.Event()
+        start, speed = position
+        threading.Thread(target=self.replay_loop, args=(self.replay, start, speed, self.replay_stop),
+                         daemon=True).start()
+
+    def replay_loop(self, replay, start, speed, stop):
+        self.replay_message(f"--- playing from {start} s at {speed or 'full'} speed ---")
+        for t, kind, payload in replay.play(speed, start, cancel=stop):
+            if kind == "power":
+                # 100 samples a second during tests: shown like the live power view, not listed
+                volts, amps = payload
+                self.replay_power_label.configure(
+                    text=f"Power at {t:.2f} s: {volts:.3f} V, {amps:.3f} A ({volts * amps:.2f} W)"
+                )
+            else:
+                self.replay_message(record_line(t, kind, payload))
+        self.replay_message("--- stopped ---" if stop.is_set() else "--- end of recording ---")
+
+    @tracing.traced()
+    def export_replay_report(self):
+        position = self.replay_position() if self.replay else None
+        if position is None:
+            if not self.replay:
+                self.replay_message("Open a recording first.")
+            return
+
+        export_file = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Text files", "*.txt")],
+            title="Save Replayed Report"
+        )
+        if not export_file:
+            return
+        try:
+            path = replay_report(self.replay.path, export_file, position[0])
+            self.replay_message(f"Report as of {position[0]} s exported to: {path}")
+        except (OSError, RuntimeError) as e:
+            self.replay_message(f"Error exporting report: {e}")
 
 
 # ============================================================
 #  ENTRY POINT
 # ============================================================
 def launch_gui():
+    # Test files a killed or crashed run left behind; off the UI thread in case a drive hangs
+    threading.Thread(target=cleanup_orphans, daemon=True).start()
     root = ctk.CTk()
     SoftCableGUI(root)
     root.mainloop()
@@ -0,0 +1,111 @@
+import socket
+import threading
+
+NETLINK_KOBJECT_UEVENT = 15
+KERNEL_GROUP = 1
+
+
+def parse_uevent(raw):
+    """
+    Parse a kernel uevent datagram ("add@/devices/...\\0ACTION=add\\0...")
+    into a dict of its KEY=VALUE fields.
+    """
+    parts = raw.split(b"\0")
+    event = {}
+
+    for part in parts[1:]:
+        key, sep, value = part.partition(b"=")
+        if sep:
+            event[key.decode(errors="replace")] = value.decode(errors="replace")
+
+    if "ACTION" not in event and b"@" in parts[0]:
+        action, _, devpath = parts[0].partition(b"@")
+        event["ACTION"] = action.decode(errors="replace")
+        event["DEVPATH"] = devpath.decode(errors="replace")
+
+    return event
+
+
+class HotplugMonitor:
+    """
+    Listens for kernel uevents on a netlink socket and hands them to
+    subscribers. Needs no udev; start() returns False where netlink is
+    unavailable, and callers fall back to polling.
+    """
+
+    def __init__(self):
+        self.listeners = []
+        self.event_count = 0
+        self.running = False
+        self.sock = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def subscribe(self, callback):
+        with self.lock:
+            if callback not in self.listeners:
+                self.listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        with self.lock:
+            if callback in self.listeners:
+                self.listeners.remove(callback)
+
+    def start(self):
+        if self.running:
+            return True
+
+        try:
+            self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM,
+                                      NETLINK_KOBJECT_UEVENT)
+            self.sock.bind((0, KERNEL_GROUP))
+        except (AttributeError, OSError):
+            self.sock = None
+            return False
+
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        self.running = False
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+
+    def dispatch(self, event):
+        """Deliver one parsed event to every subscriber."""
+        self.event_count += 1
+        with self.lock:
+            listeners = list(self.listeners)
+        for callback in listeners:
+            try:
+                callback(event)
+            except Exception:
+                # A broken subscriber must not stop hotplug delivery
+                continue
+
+    def _loop(self):
+        while self.running:
+            try:
+                raw = self.sock.recv(65536)
+            except OSError:
+                break
+            self.dispatch(parse_uevent(raw))
+        self.running = False
+
+
+_MONITOR = None
+
+
+def get_monitor():
+    """Return the shared hotplug monitor (started on first use)."""
+    global _MONITOR
+    if _MONITOR is None:
+        _MONITOR = HotplugMonitor()
+        _MONITOR.start()
+    return _MONITOR
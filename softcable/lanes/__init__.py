@@ -1,3 +1,3 @@
 # softcable/lanes/__init__.py
 
-from .lane_detector import get_lane_summary
+from .lane_detector import get_lane_summary, get_all_lane_summaries
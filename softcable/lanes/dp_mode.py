@@ -1,15 +1,96 @@
 # softcable/lanes/dp_mode.py
 
 import glob
+import os
 
+from softcable.sysfs import sys_path
 
-def detect_dp_lanes() -> int | None:
+DRM_CLASS_PATH = sys_path("class", "drm")
+
+DP_SVID = 0xFF01
+
+# DisplayPort Alt Mode pin assignments -> number of DP lanes
+PIN_ASSIGNMENT_LANES = {"A": 4, "B": 2, "C": 4, "D": 2, "E": 4, "F": 2}
+
+
+def _read_file(path: str) -> str | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except (FileNotFoundError, PermissionError, OSError):
+        return None
+
+
+def lanes_from_pin_assignment(pin: str | None) -> int | None:
+    return PIN_ASSIGNMENT_LANES.get(pin) if pin else None
+
+
+# Connector -> Type-C port links only change when DRM connectors come and go
+_CONNECTOR_CACHE: dict = {"listing": None, "ports": {}}
+
+
+def _connector_ports() -> dict[str, str | None]:
+    try:
+        listing = tuple(sorted(os.listdir(DRM_CLASS_PATH)))
+    except OSError:
+        return {}
+
+    if _CONNECTOR_CACHE["listing"] == listing:
+        return _CONNECTOR_CACHE["ports"]
+
+    ports = {}
+    for name in listing:
+        # card0-DP-1, card1-DP-2 ... (eDP is internal, HDMI has no Type-C link)
+        if "-DP-" not in name:
+            continue
+        link = os.path.join(DRM_CLASS_PATH, name, "typec_connector")
+        ports[name] = os.path.basename(os.path.realpath(link)) if os.path.exists(link) else None
+
+    _CONNECTOR_CACHE["listing"] = listing
+    _CONNECTOR_CACHE["ports"] = ports
+    return ports
+
+
+def get_dp_connectors(port: str | None = None) -> list[dict]:
+    """
+    Return DP connectors with their live link state:
+    [{"name": "card0-DP-1", "typec_port": "port0", "status": "connected", "lanes": 4}]
+
+    With `port` given ("port0" or a full path), only connectors the kernel
+    links to that Type-C port are returned.
+    """
+    port_name = os.path.basename(port) if port else None
+    result = []
+
+    for name, typec_port in _connector_ports().items():
+        if port_name and typec_port != port_name:
+            continue
+        path = os.path.join(DRM_CLASS_PATH, name)
+        raw_lanes = _read_file(os.path.join(path, "max_link_lanes"))
+        result.append({
+            "name": name,
+            "typec_port": typec_port,
+            "status": _read_file(os.path.join(path, "status")),
+            "lanes": int(raw_lanes) if raw_lanes and raw_lanes.isdigit() else None,
+        })
+    return result
+
+
+def detect_dp_lanes(port: str | None = None) -> int | None:
     """
     Try to infer DisplayPort lane count from DRM sysfs.
     Returns 2, 4, or None if unknown.
+
+    With `port`, only connectors linked to that Type-C port are considered.
     """
+    if port is not None:
+        for conn in get_dp_connectors(port):
+            if conn["status"] == "connected" and conn["lanes"] in (2, 4):
+                return conn["lanes"]
+        return None
+
     # Very heuristic: look for DP-* connectors with "max_link_lanes"
-    for path in glob.glob("/sys/class/drm/card*/DP-*/max_link_lanes"):
+    for path in glob.glob(os.path.join(DRM_CLASS_PATH, "card*", "DP-*", "max_link_lanes")):
         try:
             with open(path, "r", encoding="utf-8") as f:
                 raw = f.read().strip()
@@ -1,13 +1,122 @@
 # softcable/lanes/lane_detector.py
 
-from .typec_reader import get_typec_ports, get_port_mode, get_power_role, get_data_role
-from .usb_speed import get_usb_speeds
-from .dp_mode import detect_dp_lanes
+import os
 
+from .typec_reader import (
+    get_typec_ports, get_port_mode, get_power_role, get_data_role,
+    get_orientation, get_partner_path, get_partner_usb_mode, get_partner_altmodes,
+)
+from .usb_speed import get_usb_index
+from .dp_mode import DP_SVID, get_dp_connectors, lanes_from_pin_assignment
+from softcable.thunderbolt import get_port_link, describe_link
+from softcable.tracing import traced
 
-def get_lane_summary() -> dict:
+TBT_SVID = 0x8087
+
+# The four high-speed pairs of a Type-C receptacle, in the order "lanes" uses
+LANE_PAIRS = ("TX1", "RX1", "TX2", "RX2")
+
+CONFIDENCE_ORDER = {"low": 0, "medium": 1, "high": 2}
+
+
+def infer_lanes(orientation: str, altmodes: list[dict], usb_mode: str | None,
+                usb_link, dp_connectors: list[dict], partner: bool,
+                usb4_link: dict | None = None) -> list[dict]:
+    """
+    Assign each high-speed pair a use with a confidence level.
+
+    Evidence, strongest first: a trained USB4/Thunderbolt router link behind
+    the port, an active Thunderbolt alt mode or USB4 mode,
+    the DisplayPort pin assignment, USB rx/tx lane counts, the USB link
+    speed behind the port and connected DRM connectors linked to the port.
+    The plug orientation decides which pair set a single USB 3 lane uses.
+    """
+    if usb4_link and usb4_link.get("link_gbps"):
+        return [{"pair": p, "use": "USB4/TBT", "confidence": "high",
+                 "source": f"thunderbolt {usb4_link['name']}: {describe_link(usb4_link)}"}
+                for p in LANE_PAIRS]
+
+    if not partner:
+        return [{"pair": p, "use": "unused", "confidence": "high", "source": "no partner"}
+                for p in LANE_PAIRS]
+
+    lanes = [{"pair": p, "use": "unknown", "confidence": "low", "source": None}
+             for p in LANE_PAIRS]
+
+    def assign(indices, use, confidence, source):
+        for i in indices:
+            lanes[i].update(use=use, confidence=confidence, source=source)
+
+    oriented = orientation in ("normal", "reverse")
+    near, far = ((2, 3), (0, 1)) if orientation == "reverse" else ((0, 1), (2, 3))
+
+    active = [m for m in altmodes if m["active"]]
+    tbt = any(m["svid"] == TBT_SVID for m in active)
+    dp_alt = next((m for m in active if m["svid"] == DP_SVID), None)
+
+    if tbt or usb_mode == "usb4":
+        assign(range(4), "USB4/TBT", "high", "Thunderbolt alt mode" if tbt else "usb_mode")
+        return lanes
+
+    speed = usb_link.link_gbps if usb_link and usb_link.link_gbps else 0.0
+    superspeed = speed >= 5.0
+    usb_x2 = bool(usb_link and ((usb_link.rx_lanes or 0) >= 2 or (usb_link.tx_lanes or 0) >= 2))
+
+    # DisplayPort lane count and how sure we are about it
+    dp_lanes, dp_conf, dp_source = None, None, None
+    connected = [c for c in dp_connectors if c["status"] == "connected"]
+    if dp_alt:
+        dp_lanes = lanes_from_pin_assignment(dp_alt["pin_assignment"])
+        dp_conf, dp_source = "high", f"pin assignment {dp_alt['pin_assignment']}"
+        if dp_lanes is None:
+            known = [c["lanes"] for c in connected if c["lanes"]]
+            if known:
+                dp_lanes, dp_conf, dp_source = known[0], "medium", "DRM connector"
+            else:
+                # USB 3 still running alongside DP means a 2-lane assignment
+                dp_lanes = 2 if superspeed else 4
+                dp_conf, dp_source = "low", "DP alt mode active"
+    elif connected:
+        known = [c["lanes"] for c in connected if c["lanes"]]
+        dp_lanes = known[0] if known else (2 if superspeed else 4)
+        dp_conf = "medium" if known else "low"
+        dp_source = f"DRM {connected[0]['name']}"
+
+    if dp_lanes == 4:
+        assign(range(4), "DP Alt Mode", dp_conf, dp_source)
+        return lanes
+
+    if usb_x2 and not dp_lanes:
+        assign(range(4), "USB 3.2 x2", "high", f"{usb_link.name} rx/tx lanes")
+        return lanes
+
+    if superspeed:
+        assign(near, "USB 3.x", "high" if oriented else "medium",
+               f"{usb_link.name} @ {speed:g} Gbit/s")
+    if dp_lanes == 2:
+        assign(far, "DP Alt Mode", dp_conf if oriented else "low", dp_source)
+
+    # A partner with no evidence for a pair leaves it idle
+    for lane in lanes:
+        if lane["use"] == "unknown" and (usb_link or dp_alt or connected):
+            lane.update(use="unused", confidence="medium", source="no high-speed function")
+
+    return lanes
+
+
+def _pick_default_port(ports: list[str]) -> str:
+    # Prefer a port with something attached over an idle one
+    for port in ports:
+        if get_partner_path(port):
+            return port
+    return ports[0]
+
+
+@traced()
+def get_lane_summary(port: str | None = None) -> dict:
     """
-    Return a high-level summary of lane usage.
+    Return a high-level summary of lane usage for one Type-C port
+    (by default the first port with a partner attached).
 
     Structure:
     {
@@ -15,6 +124,16 @@ def get_lane_summary() -> dict:
         "mode": "<raw mode string or 'unknown'>",
         "power_role": "...",
         "data_role": "...",
+        "orientation": "normal" | "reverse" | "unknown",
+        "altmodes": ["DisplayPort (active)", ...],
+        "usb_device": "<device behind the port, e.g. '2-1', or None>",
+        "usb_speed": <link speed in Gbit/s or None>,
+        "usb4_link": "<'20 Gb/s x2 (Gen 3), expected ~3000 MB/s' or None>",
+        "confidence": "low" | "medium" | "high",
+        "lane_map": [
+            {"pair": "TX1", "use": "USB 3.x", "confidence": "high", "source": "..."},
+            ...
+        ],
         "lanes": [
             "USB 3.x",
             "USB 3.x",
@@ -23,45 +142,63 @@ def get_lane_summary() -> dict:
         ]
     }
     """
-    ports = get_typec_ports()
-    if not ports:
-        return {
-            "port": "No /sys/class/typec ports found",
-            "mode": "unknown",
-            "power_role": "unknown",
-            "data_role": "unknown",
-            "lanes": ["unknown"] * 4,
-        }
-
-    port = ports[0]  # use first detected port
+    if port is None:
+        ports = get_typec_ports()
+        if not ports:
+            return {
+                "port": "No /sys/class/typec ports found",
+                "mode": "unknown",
+                "power_role": "unknown",
+                "data_role": "unknown",
+                "lanes": ["unknown"] * 4,
+            }
+        port = _pick_default_port(ports)
+
     mode = get_port_mode(port) or "unknown"
     power_role = get_power_role(port) or "unknown"
     data_role = get_data_role(port) or "unknown"
+    orientation = get_orientation(port)
+    altmodes = get_partner_altmodes(port)
 
-    usb_speeds = get_usb_speeds()
-    max_usb = max(usb_speeds) if usb_speeds else 0.0
-    dp_lanes = detect_dp_lanes()
+    # Link speed of the device behind this port, not the system-wide max
+    usb_link = get_usb_index().link_behind(os.path.basename(port))
+    usb4_link = get_port_link(port)
 
-    lanes = ["unknown"] * 4
+    lane_map = infer_lanes(
+        orientation,
+        altmodes,
+        get_partner_usb_mode(port),
+        usb_link,
+        get_dp_connectors(port),
+        partner=get_partner_path(port) is not None,
+        usb4_link=usb4_link,
+    )
+    confidence = min((lane["confidence"] for lane in lane_map),
+                     key=CONFIDENCE_ORDER.__getitem__)
 
-    # Basic inference rules
-    if "dfp" in data_role.lower() or "host" in data_role.lower():
-        if max_usb >= 5.0:
-            lanes[0] = "USB 3.x"
-            lanes[1] = "USB 3.x"
-
-    if dp_lanes == 4:
-        lanes = ["DP Alt Mode"] * 4
-    elif dp_lanes == 2:
-        lanes[0] = "USB 3.x"
-        lanes[1] = "USB 3.x"
-        lanes[2] = "DP Alt Mode"
-        lanes[3] = "DP Alt Mode"
+    altmode_names = []
+    for m in altmodes:
+        name = {DP_SVID: "DisplayPort", TBT_SVID: "Thunderbolt"}.get(
+            m["svid"], f"SVID 0x{m['svid']:04x}" if m["svid"] is not None else "unknown")
+        altmode_names.append(f"{name} ({'active' if m['active'] else 'inactive'})")
 
     return {
         "port": port,
         "mode": mode,
         "power_role": power_role,
         "data_role": data_role,
-        "lanes": lanes,
+        "orientation": orientation,
+        "altmodes": altmode_names,
+        "usb_device": usb_link.name if usb_link else None,
+        "usb_speed": usb_link.link_gbps if usb_link else None,
+        "usb4_link": describe_link(usb4_link),
+        "confidence": confidence,
+        "lane_map": lane_map,
+        "lanes": [lane["use"] for lane in lane_map],
     }
+
+
+@traced()
+def get_all_lane_summaries() -> list[dict]:
+    """Return get_lane_summary() for every Type-C port."""
+    return [get_lane_summary(port) for port in get_typec_ports()]
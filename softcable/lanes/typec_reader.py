@@ -1,8 +1,11 @@
 # softcable/lanes/typec_reader.py
 
 import os
+import re
 
-TYPEC_CLASS_PATH = "/sys/class/typec"
+from softcable.sysfs import sys_path
+
+TYPEC_CLASS_PATH = sys_path("class", "typec")
 
 
 def _read_file(path: str) -> str | None:
@@ -19,7 +22,8 @@ def get_typec_ports() -> list[str]:
     entries = []
     for name in os.listdir(TYPEC_CLASS_PATH):
         full = os.path.join(TYPEC_CLASS_PATH, name)
-        if os.path.isdir(full) and name.startswith("port"):
+        # port0, port1 ... but not port0-partner / port0-cable / port0-plug0
+        if os.path.isdir(full) and re.fullmatch(r"port\d+", name):
             entries.append(full)
     return sorted(entries)
 
@@ -39,3 +43,94 @@ def get_power_role(port_path: str) -> str | None:
 
 def get_data_role(port_path: str) -> str | None:
     return _read_file(os.path.join(port_path, "data_role"))
+
+
+def get_orientation(port_path: str) -> str:
+    """Plug orientation: "normal", "reverse" or "unknown"."""
+    value = _read_file(os.path.join(port_path, "orientation"))
+    return value if value in ("normal", "reverse") else "unknown"
+
+
+def get_partner_path(port_path: str) -> str | None:
+    # Kernel layout is port0-partner next to port0; older code used port0/partner
+    for candidate in (port_path.rstrip("/") + "-partner", os.path.join(port_path, "partner")):
+        if os.path.isdir(candidate):
+            return candidate
+    return None
+
+
+def get_partner_usb_mode(port_path: str) -> str | None:
+    """The USB mode in use with the partner ("usb2", "usb3", "usb4"), if exposed."""
+    partner = get_partner_path(port_path)
+    if not partner:
+        return None
+    raw = _read_file(os.path.join(partner, "usb_mode"))
+    if not raw:
+        return None
+    # Selected value is bracketed: "usb2 usb3 [usb4]"
+    for word in raw.split():
+        if word.startswith("[") and word.endswith("]"):
+            return word[1:-1]
+    return raw
+
+
+# Alt-mode folders only appear/disappear on (re)attach, so their layout is
+# cached by the partner's directory listing; live attributes are re-read.
+_ALTMODE_CACHE: dict[str, tuple[tuple, list[tuple[str, int | None]]]] = {}
+
+
+def _altmode_dirs(partner: str) -> list[tuple[str, int | None]]:
+    try:
+        listing = tuple(sorted(os.listdir(partner)))
+    except OSError:
+        return []
+
+    cached = _ALTMODE_CACHE.get(partner)
+    if cached and cached[0] == listing:
+        return cached[1]
+
+    dirs = []
+    base = os.path.basename(partner)
+    for name in listing:
+        full = os.path.join(partner, name)
+        # port0-partner.0 (kernel) or mode1 (older layouts)
+        if not os.path.isdir(full) or not (name.startswith(base + ".") or name.startswith("mode")):
+            continue
+        raw_svid = _read_file(os.path.join(full, "svid"))
+        try:
+            svid = int(raw_svid, 16) if raw_svid else None
+        except ValueError:
+            svid = None
+        dirs.append((full, svid))
+
+    _ALTMODE_CACHE[partner] = (listing, dirs)
+    return dirs
+
+
+def get_partner_altmodes(port_path: str) -> list[dict]:
+    """
+    Return the partner's alternate modes:
+    [{"svid": 0xff01, "active": True, "vdo": "0x...", "pin_assignment": "D", "path": ...}]
+    """
+    partner = get_partner_path(port_path)
+    if not partner:
+        return []
+
+    modes = []
+    for path, svid in _altmode_dirs(partner):
+        active = _read_file(os.path.join(path, "active"))
+        pin = None
+        pins = _read_file(os.path.join(path, "displayport", "pin_assignment"))
+        if pins:
+            # Selected assignment is bracketed: "C [D] E"
+            for word in pins.split():
+                if word.startswith("[") and word.endswith("]"):
+                    pin = word[1:-1]
+        modes.append({
+            "svid": svid,
+            "active": active in ("yes", "1"),
+            "vdo": _read_file(os.path.join(path, "vdo")),
+            "pin_assignment": pin,
+            "path": path,
+        })
+    return modes
@@ -1,23 +1,292 @@
 # softcable/lanes/usb_speed.py
 
-import glob
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+
+from softcable.hotplug import get_monitor
+from softcable.sysfs import sys_path
+
+USB_DEVICES_PATH = sys_path("bus", "usb", "devices")
+
+# "usb1" root hubs and "1-2.3" devices; interfaces ("1-2:1.0") are skipped
+_DEVICE_NAME = re.compile(r"usb\d+|\d+-\d+(\.\d+)*")
+
+
+def _read_file(path: str) -> str | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except (FileNotFoundError, PermissionError, OSError):
+        return None
+
+
+def _read_number(path: str) -> float | None:
+    raw = _read_file(path)
+    try:
+        return float(raw) if raw else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class UsbNode:
+    """One USB device (or root hub) in the topology."""
+    name: str
+    busnum: int | None = None
+    parent: str | None = None
+    children: list[str] = field(default_factory=list)
+    speed_mbps: float | None = None
+    rx_lanes: int | None = None
+    tx_lanes: int | None = None
+    version: str | None = None
+    product: str | None = None
+    typec_port: str | None = None
+
+    @property
+    def link_gbps(self) -> float | None:
+        """Negotiated link rate in Gbit/s (sysfs already counts all lanes)."""
+        if self.speed_mbps is None:
+            return None
+        return self.speed_mbps / 1000.0
+
+    @property
+    def is_root_hub(self) -> bool:
+        return self.name.startswith("usb")
+
+
+def parent_name(name: str) -> str | None:
+    """Parent device name: "1-2.3" -> "1-2", "1-2" -> "usb1", "usb1" -> None."""
+    if name.startswith("usb"):
+        return None
+    bus, _, ports = name.partition("-")
+    if "." in ports:
+        return f"{bus}-{ports.rsplit('.', 1)[0]}"
+    return f"usb{bus}"
+
+
+def _topology_order(name: str) -> tuple:
+    # Root hubs first, then by length so parents precede their children
+    return (not name.startswith("usb"), len(name), name)
+
+
+def root_port_name(name: str) -> str | None:
+    """Device directly on the root hub that `name` sits behind: "1-2.3.1" -> "1-2"."""
+    if name.startswith("usb"):
+        return None
+    bus, _, ports = name.partition("-")
+    return f"{bus}-{ports.split('.', 1)[0]}"
+
+
+class UsbTopology:
+    """
+    Index of /sys/bus/usb/devices as a bus/hub/port tree.
+
+    Built once, then kept current by update() (directory diff) or
+    apply_uevent() (hotplug events). Per-device and per-Type-C-port
+    lookups are dict accesses.
+    """
+
+    def __init__(self, root: str = USB_DEVICES_PATH):
+        self.root = root
+        self.devices: dict[str, UsbNode] = {}
+        self.by_typec: dict[str, set[str]] = {}
+        self.lock = threading.Lock()
+        self.live = False  # True while hotplug events keep the index current
+
+    # ---------------- building ----------------
+
+    def _read_node(self, name: str) -> UsbNode:
+        path = os.path.join(self.root, name)
+        busnum = _read_number(os.path.join(path, "busnum"))
+        rx = _read_number(os.path.join(path, "rx_lanes"))
+        tx = _read_number(os.path.join(path, "tx_lanes"))
+        version = _read_file(os.path.join(path, "version"))
+
+        return UsbNode(
+            name=name,
+            busnum=int(busnum) if busnum is not None else None,
+            parent=parent_name(name),
+            speed_mbps=_read_number(os.path.join(path, "speed")),
+            rx_lanes=int(rx) if rx is not None else None,
+            tx_lanes=int(tx) if tx is not None else None,
+            version=version.strip() if version else None,
+            product=_read_file(os.path.join(path, "product")),
+        )
+
+    def _connector_of(self, root_port: str) -> str | None:
+        # The hub port links to its Type-C connector: <dev>/port/connector -> .../port0
+        link = os.path.join(self.root, root_port, "port", "connector")
+        if not os.path.exists(link):
+            return None
+        return os.path.basename(os.path.realpath(link))
+
+    def _insert(self, node: UsbNode):
+        self.devices[node.name] = node
+
+        parent = self.devices.get(node.parent) if node.parent else None
+        if parent is not None and node.name not in parent.children:
+            parent.children.append(node.name)
+
+        root_port = root_port_name(node.name)
+        if root_port == node.name:
+            node.typec_port = self._connector_of(node.name)
+        elif root_port in self.devices:
+            node.typec_port = self.devices[root_port].typec_port
+
+        if node.typec_port:
+            self.by_typec.setdefault(node.typec_port, set()).add(node.name)
+
+    def _remove(self, name: str):
+        node = self.devices.pop(name, None)
+        if node is None:
+            return
+
+        parent = self.devices.get(node.parent) if node.parent else None
+        if parent is not None and name in parent.children:
+            parent.children.remove(name)
+
+        if node.typec_port and node.typec_port in self.by_typec:
+            self.by_typec[node.typec_port].discard(name)
+            if not self.by_typec[node.typec_port]:
+                del self.by_typec[node.typec_port]
+
+        # Unplugging a hub removes everything behind it
+        for child in list(node.children):
+            self._remove(child)
+
+    def _list_names(self) -> set[str]:
+        if not os.path.isdir(self.root):
+            return set()
+        return {n for n in os.listdir(self.root) if _DEVICE_NAME.fullmatch(n)}
+
+    def build(self):
+        """(Re)build the whole index from sysfs."""
+        with self.lock:
+            self.devices.clear()
+            self.by_typec.clear()
+            for name in sorted(self._list_names(), key=_topology_order):
+                self._insert(self._read_node(name))
+        return self
+
+    def update(self) -> tuple[set[str], set[str]]:
+        """
+        Bring the index in line with sysfs, reading only new devices.
+        Returns (added, removed) device names.
+        """
+        with self.lock:
+            current = self._list_names()
+            known = set(self.devices)
+            added = current - known
+            removed = known - current
+
+            for name in removed:
+                self._remove(name)
+            for name in sorted(added, key=_topology_order):
+                self._insert(self._read_node(name))
+
+        return added, removed
+
+    def apply_uevent(self, event: dict):
+        """Apply one kernel uevent (see softcable.hotplug) to the index."""
+        if event.get("SUBSYSTEM") != "usb" or event.get("DEVTYPE") != "usb_device":
+            return
+
+        name = os.path.basename(event.get("DEVPATH", ""))
+        if not _DEVICE_NAME.fullmatch(name):
+            return
+
+        with self.lock:
+            action = event.get("ACTION")
+            if action == "remove":
+                self._remove(name)
+            elif action == "add":
+                self._remove(name)
+                self._insert(self._read_node(name))
+            elif action in ("change", "bind") and name in self.devices:
+                # Link state may have changed; keep the tree links as they are
+                old = self.devices[name]
+                fresh = self._read_node(name)
+                fresh.children = old.children
+                fresh.typec_port = old.typec_port
+                self.devices[name] = fresh
+
+    # ---------------- queries ----------------
+    # The hotplug thread and build() change the dicts in place, so queries
+    # copy what they need under the lock and work on the copy.
+
+    def get(self, name: str) -> UsbNode | None:
+        with self.lock:
+            return self.devices.get(name)
+
+    def children(self, name: str) -> list[UsbNode]:
+        with self.lock:
+            node = self.devices.get(name)
+            if node is None:
+                return []
+            return [self.devices[c] for c in node.children if c in self.devices]
+
+    def typec_ports(self) -> list[str]:
+        """Type-C ports with USB devices behind them."""
+        with self.lock:
+            return list(self.by_typec)
+
+    def devices_behind(self, typec_port: str) -> list[UsbNode]:
+        """All USB devices attached through a Type-C port (e.g. "port1")."""
+        with self.lock:
+            names = self.by_typec.get(os.path.basename(typec_port), ())
+            return [self.devices[n] for n in names if n in self.devices]
+
+    def link_behind(self, typec_port: str) -> UsbNode | None:
+        """
+        The device directly on the root port wired to a Type-C connector,
+        preferring the SuperSpeed bus when both USB 2 and USB 3 enumerate.
+        """
+        best = None
+        for node in self.devices_behind(typec_port):
+            if root_port_name(node.name) != node.name:
+                continue
+            if best is None or (node.speed_mbps or 0) > (best.speed_mbps or 0):
+                best = node
+        return best
+
+    def link_speed(self, typec_port: str) -> float | None:
+        """Negotiated link speed in Gbit/s of the device behind a Type-C port."""
+        node = self.link_behind(typec_port)
+        return node.link_gbps if node else None
+
+    def speeds(self) -> list[float]:
+        with self.lock:
+            nodes = list(self.devices.values())
+        return [n.link_gbps for n in nodes if n.link_gbps is not None]
+
+
+_INDEX: UsbTopology | None = None
+
+
+def get_usb_index() -> UsbTopology:
+    """
+    Return the shared topology index, building it on first use.
+
+    Hotplug events keep it current when netlink is available; otherwise each
+    call refreshes it with a directory diff, which only reads new devices.
+    The monitor thread exits on a socket error (e.g. ENOBUFS), so a live
+    index drops back to the directory diff once it stops.
+    """
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = UsbTopology().build()
+        monitor = get_monitor()
+        if monitor.running:
+            monitor.subscribe(_INDEX.apply_uevent)
+            _INDEX.live = True
+    elif not _INDEX.live or not get_monitor().running:
+        _INDEX.live = False
+        _INDEX.update()
+    return _INDEX
 
 
 def get_usb_speeds() -> list[float]:
     """Return a list of observed USB link speeds in Gbit/s."""
-    speeds = []
-    for path in glob.glob("/sys/bus/usb/devices/*/speed"):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                raw = f.read().strip()
-            if not raw:
-                continue
-            val = float(raw)
-            # Convert to Gbit/s where appropriate (USB reports in Mb/s)
-            if val > 100:  # assume Mb/s
-                speeds.append(val / 1000.0)
-            else:
-                speeds.append(val)
-        except (FileNotFoundError, PermissionError, OSError, ValueError):
-            continue
-    return speeds
+    return get_usb_index().speeds()
@@ -1,4 +1,42 @@
+import argparse
+
+from softcable import metrics, recording, tracing
 from softcable.gui import launch_gui
 
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="softcable", description="USB‑C cable diagnostics.")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record spans for backend calls and write a Chrome trace on exit")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="run the sampling profiler and write folded stacks on exit")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve OpenMetrics telemetry on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--record", metavar="FILE",
+                        help="record the session (sysfs, hotplug, power, test I/O) for offline replay")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        tracing.enable()
+    if args.profile:
+        tracing.start_profiler()
+    if args.metrics_port:
+        metrics.start_exporter(args.metrics_port)
+    if args.record:
+        recording.start_recording(args.record)
+
+    try:
+        launch_gui()
+    finally:
+        if args.trace:
+            tracing.export_chrome_trace(args.trace)
+        if args.profile:
+            tracing.stop_profiler(args.profile)
+        if args.metrics_port:
+            metrics.stop_exporter()
+        if args.record:
+            recording.stop_recording()
+
+
 if __name__ == "__main__":
-    launch_gui()
+    main()
@@ -0,0 +1,272 @@
+import bisect
+import collections
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from softcable.hotplug import get_monitor
+
+# Collection is off until the exporter starts, so tests and readings only
+# pay for a flag check when nobody is scraping.
+ENABLED = False
+
+DEFAULT_PORT = 9464
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+ROLLING_RUNS = 10  # rolling throughput averages over the last N runs per port
+
+WATT_BUCKETS = (1, 2.5, 5, 10, 15, 27, 45, 60, 100, 140, 240)
+THROUGHPUT_BUCKETS = (10, 25, 50, 100, 200, 400, 800, 1200, 2000, 3000, 5000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+
+    def header(self):
+        return [f"# TYPE {self.name} {self.kind}", f"# HELP {self.name} {self.help}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        self.values[tuple(sorted(labels.items()))] = value
+
+    def remove(self, **labels):
+        self.values.pop(tuple(sorted(labels.items())), None)
+
+    def render(self):
+        lines = self.header()
+        for labels, value in self.values.items():
+            if value is not None:
+                lines.append(f"{self.name}{_labels(labels)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = self.header()
+        for labels, value in self.values.items():
+            lines.append(f"{self.name}_total{_labels(labels)} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Fixed buckets, counted on observe(), so rendering never sorts samples."""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        state = self.values.get(key)
+        if state is None:
+            state = self.values[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+        state["counts"][bisect.bisect_left(self.buckets, value)] += 1
+        state["sum"] += value
+        state["count"] += 1
+
+    def render(self):
+        lines = self.header()
+        for labels, state in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), state["counts"]):
+                cumulative += count
+                le = labels + (("le", bound),)
+                lines.append(f"{self.name}_bucket{_labels(le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {round(state['sum'], 6)}")
+            lines.append(f"{self.name}_count{_labels(labels)} {state['count']}")
+        return lines
+
+
+class Registry:
+    """All SoftCable metrics, updated in place as readings and tests happen."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.recent = collections.defaultdict(lambda: collections.deque(maxlen=ROLLING_RUNS))
+
+        self.voltage = Gauge("softcable_power_voltage_volts", "Last USB-C supply voltage reading.")
+        self.current = Gauge("softcable_power_current_amperes", "Last USB-C supply current reading.")
+        self.wattage = Gauge("softcable_power_watts", "Last USB-C supply power reading.")
+        self.watt_hist = Histogram("softcable_power_watts_distribution",
+                                   "USB-C supply power readings.", WATT_BUCKETS)
+        self.throughput = Gauge("softcable_throughput_mb_per_second",
+                                "Throughput of the last test run per port and direction.")
+        self.rolling = Gauge("softcable_throughput_rolling_mb_per_second",
+                             f"Mean throughput of the last {ROLLING_RUNS} runs per port and direction.")
+        self.throughput_hist = Histogram("softcable_run_throughput_mb_per_second",
+                                         "Per-run throughput of data and stability tests.", THROUGHPUT_BUCKETS)
+        self.stability = Gauge("softcable_stability_score", "Last stability score (0-100) per port.")
+        self.integrity = Counter("softcable_integrity_failures", "Test runs that failed data verification.")
+        self.link = Gauge("softcable_usb_link_gbps", "Negotiated USB link speed behind each Type-C port.")
+        self.hotplug = Counter("softcable_hotplug_events", "Kernel hotplug events by subsystem and action.")
+
+        self.metrics = (self.voltage, self.current, self.wattage, self.watt_hist,
+                        self.throughput, self.rolling, self.throughput_hist, self.stability,
+                        self.integrity, self.link, self.hotplug)
+
+    def render(self):
+        """OpenMetrics text for every metric: O(series), no sysfs access."""
+        with self.lock:
+            lines = []
+            for metric in self.metrics:
+                lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ---------------- feeding the registry ----------------
+
+_forward = None
+
+
+def forward(send):
+    """Pass record_power() readings to `send((voltage, current))` instead of the registry (test workers)."""
+    global ENABLED, _forward
+    _forward = send
+    ENABLED = True
+
+
+def record_power(voltage, current):
+    """Record one supply reading (live view or a PowerSampler sample)."""
+    if not ENABLED:
+        return
+    if _forward is not None:
+        _forward((voltage, current))
+        return
+    wattage = round(voltage * current, 3)
+    with REGISTRY.lock:
+        REGISTRY.voltage.set(round(voltage, 3))
+        REGISTRY.current.set(round(current, 3))
+        REGISTRY.wattage.set(wattage)
+        REGISTRY.watt_hist.observe(wattage)
+
+
+def _port_label(path, result):
+    """Type-C port behind `path`, else its block device."""
+    # Imported here: the mount index pulls in the USB topology
+    from softcable.mount_index import get_mount_index
+    entry = get_mount_index().entry_for_path(path)
+    if entry is not None and entry["typec_port"]:
+        return entry["typec_port"]
+    return result.get("device") or "unknown"
+
+
+def record_test(path, kind, result):
+    """Record a finished data ("data") or stability ("stability") test on `path`."""
+    if not ENABLED or not result or result.get("error"):
+        return
+    port = _port_label(path, result)
+
+    with REGISTRY.lock:
+        for run in result["runs"]:
+            for direction in ("write", "read"):
+                speed = run.get(direction)
+                if speed is None:
+                    continue
+                REGISTRY.throughput.set(speed, port=port, direction=direction)
+                REGISTRY.throughput_hist.observe(speed, kind=kind, direction=direction)
+                recent = REGISTRY.recent[(port, direction)]
+                recent.append(speed)
+                REGISTRY.rolling.set(round(sum(recent) / len(recent), 2), port=port, direction=direction)
+            if run.get("integrity") and not run["integrity"]["ok"]:
+                REGISTRY.integrity.inc(port=port)
+
+        if kind == "stability":
+            REGISTRY.stability.set(result["score"], port=port)
+
+
+def _refresh_links():
+    from softcable.lanes.usb_speed import get_usb_index
+    index = get_usb_index()
+    with REGISTRY.lock:
+        REGISTRY.link.values.clear()
+        for port in index.typec_ports():
+            REGISTRY.link.set(index.link_speed(port), port=port)
+
+
+def _on_uevent(event):
+    with REGISTRY.lock:
+        REGISTRY.hotplug.inc(subsystem=event.get("SUBSYSTEM", "unknown"),
+                             action=event.get("ACTION", "unknown"))
+    if event.get("SUBSYSTEM") == "usb":
+        # The topology index has already applied this event; only its memory is read
+        _refresh_links()
+
+
+# ---------------- HTTP endpoint ----------------
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_server = None
+
+
+def start_exporter(port=DEFAULT_PORT, host="127.0.0.1"):
+    """
+    Serve /metrics on host:port from a background thread and start collecting.
+    Returns the server; call stop_exporter() to shut it down.
+    """
+    global ENABLED, _server
+    if _server is not None:
+        return _server
+
+    # Bind first: a port already in use must not leave collection switched on
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+
+    ENABLED = True
+    _refresh_links()
+    get_monitor().subscribe(_on_uevent)
+
+    _server = server
+    threading.Thread(target=_server.serve_forever, name="softcable-metrics", daemon=True).start()
+    return _server
+
+
+def stop_exporter():
+    global ENABLED, _server
+    ENABLED = False
+    get_monitor().unsubscribe(_on_uevent)
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
@@ -0,0 +1,371 @@
+import re
+import sys
+from array import array
+from dataclasses import dataclass
+
+# Values up to this length are interned: sysfs repeats short strings ("usb",
+# "host", "0x0", "Linux Foundation") across every device
+INTERN_MAX = 64
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+# "-0" is left as text: int() would read it back as "0"
+_INTEGER = re.compile(r"0|-?[1-9][0-9]*")
+
+
+def parse_value(text):
+    """
+    Sysfs text to a typed value: canonical integers and floats become
+    numbers, everything else stays a (possibly interned) string.
+    Only conversions that str() turns back into the same text are made,
+    so to_dict() adapters reproduce the original dump exactly.
+    """
+    if not isinstance(text, str):
+        return text
+    if _INTEGER.fullmatch(text):
+        return int(text)
+    if "." in text:
+        try:
+            number = float(text)
+        except ValueError:
+            pass
+        else:
+            if repr(number) == text:
+                return number
+    return sys.intern(text) if len(text) <= INTERN_MAX else text
+
+
+def format_value(value):
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+class Schema:
+    """An interned, ordered set of attribute names shared by every record that has them."""
+    __slots__ = ("keys", "index")
+
+    _cache = {}
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.index = {key: i for i, key in enumerate(keys)}
+
+    @classmethod
+    def of(cls, keys):
+        keys = tuple(sys.intern(k) for k in keys)
+        schema = cls._cache.get(keys)
+        if schema is None:
+            schema = cls._cache[keys] = cls(keys)
+        return schema
+
+
+@dataclass(slots=True)
+class SysfsRecord:
+    """
+    One sysfs folder: attribute values in a tuple, names in a shared Schema.
+    Devices of one kind expose the same attributes, so a record costs one
+    small object and a tuple instead of a dict.
+    """
+    name: str
+    schema: Schema
+    values: tuple
+
+    @classmethod
+    def from_dict(cls, name, data):
+        if data is None:
+            return None
+        schema = Schema.of(data)
+        return cls(sys.intern(name), schema, tuple(parse_value(data[k]) for k in data))
+
+    def get(self, key, default=None):
+        i = self.schema.index.get(key)
+        return default if i is None else self.values[i]
+
+    def __getitem__(self, key):
+        return self.values[self.schema.index[key]]
+
+    def __contains__(self, key):
+        return key in self.schema.index
+
+    def __len__(self):
+        return len(self.values)
+
+    def items(self):
+        return zip(self.schema.keys, self.values)
+
+    def to_dict(self):
+        """The read_sysfs_folder() dict this record was built from."""
+        return {key: format_value(value) for key, value in self.items()}
+
+
+def _records(section):
+    if section is None:
+        return None
+    return {sys.intern(name): SysfsRecord.from_dict(name, data) for name, data in section.items()}
+
+
+def _section_dict(records):
+    if records is None:
+        return None
+    return {name: record.to_dict() if record is not None else None for name, record in records.items()}
+
+
+@dataclass(slots=True)
+class RawSnapshot:
+    """get_raw_data() as records; to_dict() gives back the nested dict form."""
+    power_supply: dict | None = None
+    typec: dict | None = None
+    usb_devices: dict | None = None
+
+    @classmethod
+    def from_dict(cls, raw):
+        return cls(_records(raw.get("power_supply")), _records(raw.get("typec")),
+                   _records(raw.get("usb_devices")))
+
+    def to_dict(self):
+        return {
+            "power_supply": _section_dict(self.power_supply),
+            "typec": _section_dict(self.typec),
+            "usb_devices": _section_dict(self.usb_devices),
+        }
+
+    def to_sections(self):
+        """{section: {name: SysfsRecord}}, in get_raw_data() order, without converting records."""
+        return {"power_supply": self.power_supply, "typec": self.typec, "usb_devices": self.usb_devices}
+
+    def batch(self, section):
+        """One section ("usb_devices", ...) as a columnar RecordBatch."""
+        records = getattr(self, section) or {}
+        return RecordBatch.from_records(r for r in records.values() if r is not None)
+
+
+class RecordBatch:
+    """
+    Many records stored by column. Integer columns are array("q") with a
+    presence mask, so column() hands out a memoryview without copying, and
+    row() is a view that reads straight from the columns. Each row keeps
+    its record's Schema, so to_dicts() gives back every key in its order,
+    None values included.
+    """
+    __slots__ = ("names", "schemas", "columns", "present")
+
+    def __init__(self, names, schemas, columns, present):
+        self.names = names
+        self.schemas = schemas
+        self.columns = columns
+        self.present = present
+
+    @classmethod
+    def from_records(cls, records):
+        records = list(records)
+        keys = {}
+        for record in records:
+            for key in record.schema.keys:
+                keys.setdefault(key, None)
+
+        columns = {}
+        present = {}
+        for key in keys:
+            values = [record.get(key) for record in records]
+            mask = bytearray(v is not None for v in values)
+            numeric = [v for v in values if v is not None]
+            if numeric and all(type(v) is int and INT64_MIN <= v <= INT64_MAX for v in numeric):
+                columns[key] = array("q", (0 if v is None else v for v in values))
+                if not all(mask):
+                    present[key] = mask
+            else:
+                columns[key] = values
+        return cls([record.name for record in records], [record.schema for record in records],
+                   columns, present)
+
+    def __len__(self):
+        return len(self.names)
+
+    def column(self, key):
+        """The column itself (a memoryview for integer columns); missing rows hold 0 there."""
+        data = self.columns[key]
+        return memoryview(data) if isinstance(data, array) else data
+
+    def value(self, row, key):
+        mask = self.present.get(key)
+        if mask is not None and not mask[row]:
+            return None
+        column = self.columns.get(key)
+        return None if column is None else column[row]
+
+    def row(self, i):
+        return RowView(self, i)
+
+    def __iter__(self):
+        return (RowView(self, i) for i in range(len(self.names)))
+
+    def to_dicts(self):
+        """{name: read_sysfs_folder()-style dict} for every row."""
+        return {row.name: row.to_dict() for row in self}
+
+
+class RowView:
+    """One row of a RecordBatch, read on access."""
+    __slots__ = ("batch", "index")
+
+    def __init__(self, batch, index):
+        self.batch = batch
+        self.index = index
+
+    @property
+    def name(self):
+        return self.batch.names[self.index]
+
+    def __contains__(self, key):
+        return key in self.batch.schemas[self.index].index
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        return self.batch.value(self.index, key)
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        return self.batch.value(self.index, key)
+
+    def to_dict(self):
+        return {key: format_value(self.batch.value(self.index, key))
+                for key in self.batch.schemas[self.index].keys}
+
+
+# ---------------- typed views of backend results ----------------
+
+@dataclass(slots=True)
+class CablePlug:
+    """
+    One decoded cable plug from get_cable_info(). Sysfs attributes keep
+    their text ("yes", "1"); `active` reads it as a bool. `keys` is the
+    Schema of the original dict, so to_dict() gives back the same keys in
+    the same order, None values included.
+    """
+    key: str
+    keys: Schema
+    active_text: str | None = None
+    plug_type: str | None = None
+    speed: str | None = None
+    current_capability: str | None = None
+    type: str | None = None
+    identity: SysfsRecord | None = None
+    decoded: dict | None = None
+    fingerprint: str | None = None
+    note: str | None = None
+
+    @classmethod
+    def from_dict(cls, key, data):
+        return cls(
+            key=sys.intern(key),
+            keys=Schema.of(data),
+            active_text=data.get("active"),
+            plug_type=data.get("plug_type"),
+            speed=data.get("speed"),
+            current_capability=data.get("current_capability"),
+            type=data.get("type"),
+            identity=SysfsRecord.from_dict("identity", data.get("identity")),
+            decoded=data.get("decoded"),
+            fingerprint=data.get("fingerprint"),
+            note=data.get("note"),
+        )
+
+    @property
+    def active(self):
+        """The "active" attribute as a bool ("1"/"yes"), None if not exposed."""
+        return None if self.active_text is None else self.active_text in ("1", "yes")
+
+    def to_dict(self):
+        data = {}
+        for name in self.keys.keys:
+            if name == "active":
+                data[name] = self.active_text
+            elif name == "identity":
+                data[name] = self.identity.to_dict() if self.identity is not None else None
+            else:
+                data[name] = getattr(self, name)
+        return data
+
+
+def cables_from_dict(info):
+    """get_cable_info() result as {key: CablePlug}."""
+    if info is None:
+        return None
+    return {key: CablePlug.from_dict(key, data) for key, data in info.items()}
+
+
+def cables_to_dict(cables):
+    """The get_cable_info() dict back from cables_from_dict()."""
+    if cables is None:
+        return None
+    return {key: plug.to_dict() for key, plug in cables.items()}
+
+
+@dataclass(slots=True)
+class LaneUse:
+    """One lane_map entry; `keys` keeps which of its keys the dict had."""
+    keys: Schema
+    pair: str
+    use: str
+    confidence: str
+    source: str | None = None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(Schema.of(data), sys.intern(data["pair"]), sys.intern(data["use"]),
+                   sys.intern(data["confidence"]), data.get("source"))
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.keys.keys}
+
+
+@dataclass(slots=True)
+class LaneSummary:
+    """
+    get_lane_summary() result with typed fields. The "no ports" result
+    carries only some of the keys; `keys` keeps which, so to_dict() gives
+    back exactly the dict it was built from.
+    """
+    keys: Schema
+    port: str
+    mode: str = "unknown"
+    power_role: str = "unknown"
+    data_role: str = "unknown"
+    orientation: str = "unknown"
+    altmodes: tuple = ()
+    usb_device: str | None = None
+    usb_speed: float | None = None
+    usb4_link: str | None = None
+    confidence: str = "low"
+    lane_map: tuple = ()
+    lanes: tuple = ("unknown",) * 4
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            keys=Schema.of(data),
+            port=data["port"],
+            mode=data.get("mode", "unknown"),
+            power_role=data.get("power_role", "unknown"),
+            data_role=data.get("data_role", "unknown"),
+            orientation=data.get("orientation", "unknown"),
+            altmodes=tuple(data.get("altmodes", ())),
+            usb_device=data.get("usb_device"),
+            usb_speed=data.get("usb_speed"),
+            usb4_link=data.get("usb4_link"),
+            confidence=data.get("confidence", "low"),
+            lane_map=tuple(LaneUse.from_dict(lane) for lane in data.get("lane_map", ())),
+            lanes=tuple(sys.intern(use) for use in data.get("lanes", ("unknown",) * 4)),
+        )
+
+    def to_dict(self):
+        data = {}
+        for key in self.keys.keys:
+            value = getattr(self, key)
+            if key in ("altmodes", "lanes"):
+                value = list(value)
+            elif key == "lane_map":
+                value = [lane.to_dict() for lane in value]
+            data[key] = value
+        return data
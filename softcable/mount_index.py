@@ -0,0 +1,270 @@
+import os
+import re
+import select
+import threading
+
+from softcable.hotplug import get_monitor
+from softcable.lanes.usb_speed import get_usb_index
+from softcable.sysfs import sys_path
+from softcable.tracing import traced
+
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+SYS_DEV_BLOCK = sys_path("dev", "block")
+
+_USB_DEVICE = re.compile(r"\d+-\d+(\.\d+)*")
+_OCTAL_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+
+def _unescape(field):
+    """mountinfo escapes spaces, tabs and backslashes as \\040, \\011, \\134."""
+    return _OCTAL_ESCAPE.sub(lambda m: chr(int(m.group(1), 8)), field)
+
+
+def parse_mountinfo(text):
+    """
+    Parse /proc/self/mountinfo into {mountpoint: {"dev": "8:17", "fstype", "source"}}.
+    Later mounts on the same mountpoint shadow earlier ones, as in the kernel.
+    """
+    mounts = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) < 10 or "-" not in fields:
+            continue
+        sep = fields.index("-", 6)
+        mounts[_unescape(fields[4])] = {
+            "dev": fields[2],
+            "fstype": fields[sep + 1],
+            "source": _unescape(fields[sep + 2]),
+        }
+    return mounts
+
+
+def resolve_usb_path(dev):
+    """
+    Follow /sys/dev/block/<maj:min> to the block device and the USB device
+    it hangs off. Returns (block name, disk name, USB device name or None),
+    or None if the device number is not a block device.
+    """
+    link = os.path.join(SYS_DEV_BLOCK, dev)
+    if not os.path.exists(link):
+        return None
+
+    real = os.path.realpath(link)
+    name = os.path.basename(real)
+    if os.path.exists(os.path.join(real, "partition")):
+        disk = os.path.basename(os.path.dirname(real))
+    else:
+        disk = name
+
+    # .../usb2/2-1/2-1.4/2-1.4:1.0/host0/.../block/sdb/sdb1 -> deepest "2-1.4"
+    usb_device = None
+    for part in real.split(os.sep):
+        if _USB_DEVICE.fullmatch(part):
+            usb_device = part
+
+    return name, disk, usb_device
+
+
+class MountIndex:
+    """
+    Maps mountpoint -> block device -> USB device -> hub port -> Type-C port.
+
+    Mount changes are picked up by polling /proc/self/mountinfo (the kernel
+    flags it on every mount/umount) and only new mountpoints are resolved
+    through sysfs. Block-device removals arrive as hotplug events.
+    """
+
+    def __init__(self):
+        self.mounts = {}
+        self.ignored = {}  # non-block mounts (proc, tmpfs, ...) -> dev, never re-resolved
+        self.by_port = {}
+        self.lock = threading.Lock()
+        self.fd = None
+        self.poller = None
+
+    def _resolve(self, mountpoint, info):
+        resolved = resolve_usb_path(info["dev"])
+        if resolved is None:
+            return None
+        name, disk, usb_device = resolved
+
+        entry = {
+            "mountpoint": mountpoint,
+            "fstype": info["fstype"],
+            "source": info["source"],
+            "dev": info["dev"],
+            "device": name,
+            "disk": disk,
+            "usb_device": usb_device,
+            "hub_port": None,
+            "typec_port": None,
+        }
+
+        if usb_device:
+            # Port on the parent hub is the last number in the device name
+            entry["hub_port"] = int(re.split(r"[-.]", usb_device)[-1])
+            node = get_usb_index().get(usb_device)
+            if node is not None:
+                entry["typec_port"] = node.typec_port
+        return entry
+
+    def _resolve_ports(self):
+        """
+        Fill in the Type-C port of USB mounts resolved before the USB index
+        knew their device (the drive mounted before its hub was indexed).
+        """
+        pending = [e for e in self.mounts.values() if e["usb_device"] and not e["typec_port"]]
+        if not pending:
+            return
+        index = get_usb_index()
+        for entry in pending:
+            node = index.get(entry["usb_device"])
+            if node is not None and node.typec_port:
+                entry["typec_port"] = node.typec_port
+                self.by_port.setdefault(node.typec_port, []).append(entry["mountpoint"])
+
+    def _add(self, mountpoint, info):
+        entry = self._resolve(mountpoint, info)
+        if entry is None:
+            self.ignored[mountpoint] = info["dev"]
+            return
+        self.mounts[mountpoint] = entry
+        if entry["typec_port"]:
+            self.by_port.setdefault(entry["typec_port"], []).append(mountpoint)
+
+    def _drop(self, mountpoint):
+        self.ignored.pop(mountpoint, None)
+        entry = self.mounts.pop(mountpoint, None)
+        if entry and entry["typec_port"] in self.by_port:
+            ports = self.by_port[entry["typec_port"]]
+            if mountpoint in ports:
+                ports.remove(mountpoint)
+            if not ports:
+                del self.by_port[entry["typec_port"]]
+
+    def _read_mountinfo(self):
+        if self.fd is not None:
+            chunks = []
+            offset = 0
+            while True:
+                chunk = os.pread(self.fd, 65536, offset)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                offset += len(chunk)
+            return b"".join(chunks).decode(errors="replace")
+        with open(MOUNTINFO_PATH, "r") as f:
+            return f.read()
+
+    def build(self):
+        with self.lock:
+            try:
+                self.fd = os.open(MOUNTINFO_PATH, os.O_RDONLY)
+                self.poller = select.poll()
+                self.poller.register(self.fd, select.POLLPRI | select.POLLERR)
+            except (OSError, AttributeError):
+                self.fd = None
+                self.poller = None
+
+            self.mounts.clear()
+            self.ignored.clear()
+            self.by_port.clear()
+            try:
+                mounts = parse_mountinfo(self._read_mountinfo())
+            except OSError:
+                mounts = {}
+            for mountpoint, info in mounts.items():
+                self._add(mountpoint, info)
+
+        get_monitor().subscribe(self.apply_uevent)
+        return self
+
+    def update(self, force=False):
+        """Re-read mountinfo if the kernel flagged a change; resolve only new mounts."""
+        with self.lock:
+            self._resolve_ports()
+        if not force and self.poller is not None and not self.poller.poll(0):
+            return False
+
+        with self.lock:
+            try:
+                mounts = parse_mountinfo(self._read_mountinfo())
+            except OSError:
+                return False
+
+            for mountpoint in (set(self.mounts) | set(self.ignored)) - set(mounts):
+                self._drop(mountpoint)
+            for mountpoint, info in mounts.items():
+                known = self.mounts.get(mountpoint)
+                known_dev = known["dev"] if known else self.ignored.get(mountpoint)
+                if known_dev != info["dev"]:
+                    self._drop(mountpoint)
+                    self._add(mountpoint, info)
+        return True
+
+    def apply_uevent(self, event):
+        """Forget mounts whose block device disappeared (see softcable.hotplug)."""
+        if event.get("SUBSYSTEM") != "block" or event.get("ACTION") != "remove":
+            return
+        name = os.path.basename(event.get("DEVPATH", ""))
+        with self.lock:
+            for mountpoint in [m for m, e in self.mounts.items()
+                               if e["device"] == name or e["disk"] == name]:
+                self._drop(mountpoint)
+
+    # ---------------- queries ----------------
+
+    def usb_drives(self):
+        """Every mounted filesystem that lives on a USB device."""
+        return [e for e in self.mounts.values() if e["usb_device"]]
+
+    def drives_on_port(self, typec_port):
+        """Mounts behind a Type-C port ("port1" or a path)."""
+        names = self.by_port.get(os.path.basename(typec_port), [])
+        return [self.mounts[m] for m in names if m in self.mounts]
+
+    def entry_for_path(self, path):
+        """
+        The mount holding `path` (walks up to the nearest mountpoint), or None
+        when that mountpoint is not a block device (tmpfs on /tmp, /run/user ...).
+        """
+        path = os.path.abspath(path)
+        while True:
+            entry = self.mounts.get(path)
+            if entry is not None:
+                return entry
+            if path in self.ignored:
+                return None
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+
+
+_INDEX = None
+
+
+@traced()
+def get_mount_index():
+    """Return the shared mount index, refreshed if mounts changed since last use."""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = MountIndex().build()
+    else:
+        _INDEX.update()
+    return _INDEX
+
+
+def describe_drive(entry):
+    """Describe a mount for the data test, e.g. "/dev/sdb1 (ext4) via USB 2-1 on port1 @ 10 Gbit/s"."""
+    if not entry:
+        return None
+    text = f"/dev/{entry['device']} ({entry['fstype']})"
+    if entry["usb_device"]:
+        text += f" via USB {entry['usb_device']}"
+        node = get_usb_index().get(entry["usb_device"])
+        if entry["typec_port"]:
+            text += f" on {entry['typec_port']}"
+        if node is not None and node.link_gbps:
+            text += f" @ {node.link_gbps:g} Gbit/s"
+    return text
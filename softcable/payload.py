@@ -0,0 +1,72 @@
+import os
+import threading
+
+
+class PayloadPool:
+    """
+    Keeps one fresh random buffer per size ready. Taking it starts
+    generating the next one in the background, so a test run gets its data
+    without waiting on os.urandom and no buffer is ever written twice.
+    """
+
+    def __init__(self):
+        self.ready = {}
+        self.filling = set()
+        self.sizes = set()
+        self.lock = threading.Lock()
+        self.filled = threading.Condition(self.lock)
+
+    def _fill(self, size):
+        data = os.urandom(size)
+        with self.lock:
+            self.ready[size] = data
+            self.filling.discard(size)
+            self.filled.notify_all()
+
+    def refill(self, size):
+        with self.lock:
+            self.sizes.add(size)
+            if size in self.ready or size in self.filling:
+                return
+            self.filling.add(size)
+        threading.Thread(target=self._fill, args=(size,), daemon=True).start()
+
+    def take(self, size):
+        with self.lock:
+            # A buffer already being generated is waited for rather than generated twice
+            while size in self.filling and size not in self.ready:
+                self.filled.wait()
+            data = self.ready.pop(size, None)
+        self.refill(size)
+        return data if data is not None else os.urandom(size)
+
+
+_pool = None
+
+
+def enable_pool(sizes_mb=()):
+    """
+    Serve random_payload() from a prefilled pool (used by the agent, and by
+    the test workers it starts: see softcable.executor).
+    """
+    global _pool
+    if _pool is None:
+        _pool = PayloadPool()
+    for size_mb in sizes_mb:
+        _pool.refill(size_mb * 1024 * 1024)
+    return _pool
+
+
+def pool_sizes_mb():
+    """Sizes (MB) the pool keeps ready, or None when it is off."""
+    if _pool is None:
+        return None
+    with _pool.lock:
+        return sorted(size // (1024 * 1024) for size in _pool.sizes)
+
+
+def random_payload(size):
+    """`size` random bytes for a write test."""
+    if _pool is None:
+        return os.urandom(size)
+    return _pool.take(size)
@@ -0,0 +1,321 @@
+import os
+import re
+
+from softcable.sysfs import sys_path
+from softcable.tracing import traced
+
+TYPEC_PATH = sys_path("class", "typec") + "/"
+POWER_PATH = sys_path("class", "power_supply") + "/"
+
+# Kernel names capability entries "<index>:<kind>", e.g. "1:fixed_supply"
+PDO_KINDS = {
+    "fixed_supply": "fixed",
+    "variable_supply": "variable",
+    "battery": "battery",
+    "programmable_supply": "pps",
+    "adjustable_voltage_supply": "avs",
+}
+
+# Capabilities only change on renegotiation, which recreates the
+# usb_power_delivery device, so cache by its resolved path + entry names.
+_CACHE = {}
+
+
+def read_file(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _parse_value(raw):
+    """Turn "5000mV" / "3000mA" / "1" into an int, leaving other text as-is."""
+    if raw is None:
+        return None
+    match = re.fullmatch(r"(\d+)\s*(mV|mA|mW|uV|uA|uW)?", raw)
+    if match:
+        return int(match.group(1))
+    return raw
+
+
+def _unit_key(name, raw):
+    """Suffix numeric attributes with their unit so callers know the scale."""
+    if raw and raw.endswith("mV"):
+        return f"{name}_mv"
+    if raw and raw.endswith("mA"):
+        return f"{name}_ma"
+    if raw and raw.endswith("mW"):
+        return f"{name}_mw"
+    return name
+
+
+def read_pdo(path):
+    """Read one PDO directory into a dict of parsed attributes."""
+    name = os.path.basename(path)
+    index, _, kind = name.partition(":")
+
+    pdo = {
+        "index": int(index) if index.isdigit() else None,
+        "type": PDO_KINDS.get(kind, kind or "unknown"),
+    }
+
+    for item in sorted(os.listdir(path)):
+        full = os.path.join(path, item)
+        if os.path.isfile(full) and item != "uevent":
+            raw = read_file(full)
+            pdo[_unit_key(item, raw)] = _parse_value(raw)
+
+    # Nominal power the PDO can deliver, for quick comparison
+    if "maximum_power_mw" in pdo:
+        pdo["power_mw"] = pdo["maximum_power_mw"]
+    else:
+        voltage = pdo.get("voltage_mv") or pdo.get("maximum_voltage_mv")
+        current = pdo.get("maximum_current_ma") or pdo.get("operational_current_ma")
+        if isinstance(voltage, int) and isinstance(current, int):
+            pdo["power_mw"] = voltage * current // 1000
+
+    return pdo
+
+
+def read_capabilities(caps_path):
+    """Read a source-capabilities or sink-capabilities folder, ordered by index."""
+    if not os.path.isdir(caps_path):
+        return []
+
+    pdos = []
+    for entry in os.listdir(caps_path):
+        full = os.path.join(caps_path, entry)
+        if os.path.isdir(full) and ":" in entry:
+            pdos.append(read_pdo(full))
+
+    return sorted(pdos, key=lambda p: p["index"] if p["index"] is not None else 0)
+
+
+def _signature(pd_path):
+    names = []
+    for caps in ("source-capabilities", "sink-capabilities"):
+        try:
+            names.append(tuple(sorted(os.listdir(os.path.join(pd_path, caps)))))
+        except OSError:
+            names.append(())
+    return (os.path.realpath(pd_path), tuple(names))
+
+
+def read_pd_device(pd_path, refresh=False):
+    """
+    Read source and sink PDOs of one usb_power_delivery device.
+    Returns None if the device does not exist.
+    """
+    if not os.path.isdir(pd_path):
+        return None
+
+    signature = _signature(pd_path)
+    cached = _CACHE.get(pd_path)
+    if cached and cached[0] == signature and not refresh:
+        return cached[1]
+
+    result = {
+        "revision": read_file(os.path.join(pd_path, "revision")),
+        "source": read_capabilities(os.path.join(pd_path, "source-capabilities")),
+        "sink": read_capabilities(os.path.join(pd_path, "sink-capabilities")),
+    }
+    _CACHE[pd_path] = (signature, result)
+    return result
+
+
+def get_typec_port_names():
+    """Return port names (port0, port1, ...) without partner/cable/plug entries."""
+    if not os.path.exists(TYPEC_PATH):
+        return []
+    return sorted(p for p in os.listdir(TYPEC_PATH)
+                  if re.fullmatch(r"port\d+", p))
+
+
+def get_partner_path(port):
+    # Kernel layout is /sys/class/typec/port0-partner; older code used port0/partner
+    for candidate in (os.path.join(TYPEC_PATH, f"{port}-partner"),
+                      os.path.join(TYPEC_PATH, port, "partner")):
+        if os.path.isdir(candidate):
+            return candidate
+    return None
+
+
+def find_port_power_supply(port):
+    """
+    Find the power_supply that reports the contract on a Type-C port.
+
+    UCSI names its supplies ucsi-source-psy-<dev>:<n> with n = port index + 1.
+    Falls back to the first USB/Type-C supply, like power_test does.
+    """
+    if not os.path.exists(POWER_PATH):
+        return None
+
+    entries = sorted(os.listdir(POWER_PATH))
+    index = port[4:]
+    if index.isdigit():
+        suffix = f":{int(index) + 1:03d}"
+        for item in entries:
+            if "ucsi" in item.lower() and item.endswith(suffix):
+                return os.path.join(POWER_PATH, item)
+
+    for item in entries:
+        lower = item.lower()
+        if "usb" in lower or "typec" in lower or "pd" in lower:
+            return os.path.join(POWER_PATH, item)
+    return None
+
+
+def _matching_pdo(pdos, voltage_mv):
+    """Find the source PDO whose voltage (range) covers the contract voltage."""
+    if voltage_mv is None:
+        return None
+    best = None
+    for pdo in pdos:
+        if pdo["type"] == "fixed":
+            if abs((pdo.get("voltage_mv") or 0) - voltage_mv) <= 500:
+                return pdo
+        else:
+            low = pdo.get("minimum_voltage_mv") or 0
+            high = pdo.get("maximum_voltage_mv") or 0
+            if low <= voltage_mv <= high and best is None:
+                best = pdo
+    return best
+
+
+def get_contract(port, partner_source=None):
+    """
+    Return the negotiated contract of a port as reported by its power supply.
+
+    The kernel publishes the contract as voltage_max/current_max on the port's
+    power_supply; the matching partner source PDO is attached when known.
+    """
+    supply = find_port_power_supply(port)
+    if supply is None:
+        return None
+
+    def read_int(name):
+        raw = read_file(os.path.join(supply, name))
+        return int(raw) if raw and raw.lstrip("-").isdigit() else None
+
+    voltage_uv = read_int("voltage_max") or read_int("voltage_now")
+    current_ua = read_int("current_max")
+    if voltage_uv is None and current_ua is None:
+        return None
+
+    voltage = voltage_uv / 1_000_000 if voltage_uv is not None else None
+    current = current_ua / 1_000_000 if current_ua is not None else None
+    wattage = round(voltage * current, 2) if voltage is not None and current is not None else None
+
+    pdo = _matching_pdo(partner_source or [], voltage_uv // 1000 if voltage_uv else None)
+
+    return {
+        "supply": os.path.basename(supply),
+        "usb_type": read_file(os.path.join(supply, "usb_type")),
+        "voltage": voltage,
+        "current": current,
+        "wattage": wattage,
+        "pdo": pdo,
+    }
+
+
+@traced()
+def get_port_pd(port, refresh=False):
+    """
+    Return PD capabilities for one port and its partner:
+
+    {
+        "port": {"revision": ..., "source": [...], "sink": [...]} or None,
+        "partner": {...} or None,
+        "contract": {...} or None,
+    }
+    """
+    port_pd = read_pd_device(os.path.join(TYPEC_PATH, port, "usb_power_delivery"), refresh)
+
+    partner = get_partner_path(port)
+    partner_pd = None
+    if partner:
+        partner_pd = read_pd_device(os.path.join(partner, "usb_power_delivery"), refresh)
+
+    partner_source = partner_pd["source"] if partner_pd else None
+    contract = get_contract(port, partner_source) if partner else None
+
+    return {"port": port_pd, "partner": partner_pd, "contract": contract}
+
+
+@traced()
+def get_pd_info(refresh=False):
+    """Return {port: get_port_pd(port)} for every Type-C port, or None."""
+    ports = get_typec_port_names()
+    if not ports:
+        return None
+    return {port: get_port_pd(port, refresh) for port in ports}
+
+
+def format_pdo(pdo):
+    """One-line human-readable description of a PDO."""
+    kind = pdo["type"]
+    if kind == "fixed":
+        text = f"Fixed {pdo.get('voltage_mv', 0) / 1000:g} V"
+        current = pdo.get("maximum_current_ma") or pdo.get("operational_current_ma")
+        if current is not None:
+            text += f" @ {current / 1000:g} A"
+    elif kind == "battery":
+        text = (f"Battery {pdo.get('minimum_voltage_mv', 0) / 1000:g}-"
+                f"{pdo.get('maximum_voltage_mv', 0) / 1000:g} V, "
+                f"{pdo.get('maximum_power_mw', 0) / 1000:g} W")
+    else:
+        label = {"variable": "Variable", "pps": "PPS", "avs": "AVS"}.get(kind, kind)
+        text = (f"{label} {pdo.get('minimum_voltage_mv', 0) / 1000:g}-"
+                f"{pdo.get('maximum_voltage_mv', 0) / 1000:g} V")
+        current = pdo.get("maximum_current_ma") or pdo.get("operational_current_ma")
+        if current is not None:
+            text += f" @ {current / 1000:g} A"
+
+    if "power_mw" in pdo:
+        text += f" ({pdo['power_mw'] / 1000:g} W)"
+    return f"#{pdo['index']} {text}"
+
+
+def check_power_limits(measured, contract=None, cable=None):
+    """
+    Compare a power reading against the negotiated contract and the
+    cable's e-marker rating (cable = decoded VDO dict).
+
+    Returns a list of warning strings; empty when everything is within limits.
+    """
+    warnings = []
+    if not measured or "error" in measured:
+        return warnings
+
+    voltage = measured.get("voltage")
+    current = measured.get("current")
+
+    if contract:
+        if contract.get("current") and current and current > contract["current"] * 1.05:
+            warnings.append(
+                f"Current {current} A exceeds the contract ({contract['current']} A)."
+            )
+        if contract.get("voltage") and voltage and voltage > contract["voltage"] * 1.05:
+            warnings.append(
+                f"Voltage {voltage} V exceeds the contract ({contract['voltage']} V)."
+            )
+
+    if cable:
+        cable_current = cable.get("current_a")
+        if cable_current and current and current > cable_current:
+            warnings.append(
+                f"Current {current} A exceeds the cable rating ({cable_current} A)."
+            )
+        if contract and cable_current and contract.get("current") \
+                and contract["current"] > cable_current:
+            warnings.append(
+                f"Contract current {contract['current']} A exceeds the cable rating ({cable_current} A)."
+            )
+        cable_vbus = cable.get("max_vbus_v")
+        if cable_vbus and voltage and voltage > cable_vbus * 1.05:
+            warnings.append(
+                f"Voltage {voltage} V exceeds the cable rating ({cable_vbus} V)."
+            )
+
+    return warnings
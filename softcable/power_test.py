@@ -1,36 +1,57 @@
 import os
+import threading
 import time
 
-POWER_PATH = "/sys/class/power_supply/"
+from softcable.pd_caps import get_typec_port_names, get_port_pd, check_power_limits
+from softcable.cable_identity import get_cable_info
+from softcable import metrics, recording
+from softcable.sysfs import sys_path
+from softcable.tracing import traced
 
+POWER_PATH = sys_path("class", "power_supply") + "/"
+POWER_SAMPLE_INTERVAL = 0.01
+IDLE_DURATION = 0.5
+
+
+def find_power_supply():
+    """Return the first USB/Type‑C power supply folder, or None."""
+    try:
+        items = os.listdir(POWER_PATH)
+    except OSError:
+        return None
+    for item in items:
+        # Look for USB or Type‑C power devices
+        if "usb" in item.lower() or "typec" in item.lower() or "pd" in item.lower():
+            return os.path.join(POWER_PATH, item)
+    return None
+
+
+@traced()
 def read_power_values():
     """Reads voltage, current, and wattage from any USB/Type‑C power supply."""
     voltage = None
     current = None
 
     try:
-        for item in os.listdir(POWER_PATH):
-            item_path = os.path.join(POWER_PATH, item)
-
-            # Look for USB or Type‑C power devices
-            if "usb" in item.lower() or "typec" in item.lower() or "pd" in item.lower():
-                v_path = os.path.join(item_path, "voltage_now")
-                c_path = os.path.join(item_path, "current_now")
+        item_path = find_power_supply()
+        if item_path:
+            v_path = os.path.join(item_path, "voltage_now")
+            c_path = os.path.join(item_path, "current_now")
 
-                if os.path.exists(v_path):
-                    with open(v_path, "r") as f:
-                        voltage = int(f.read().strip()) / 1_000_000  # µV → V
+            if os.path.exists(v_path):
+                with open(v_path, "r") as f:
+                    voltage = int(f.read().strip()) / 1_000_000  # µV → V
 
-                if os.path.exists(c_path):
-                    with open(c_path, "r") as f:
-                        current = int(f.read().strip()) / 1_000_000  # µA → A
-
-                break
+            if os.path.exists(c_path):
+                with open(c_path, "r") as f:
+                    current = int(f.read().strip()) / 1_000_000  # µA → A
 
         if voltage is None or current is None:
             return None
 
         wattage = round(voltage * current, 2)
+        metrics.record_power(voltage, current)
+        recording.record("power", [voltage, current])
 
         return {
             "voltage": round(voltage, 3),
@@ -40,3 +61,217 @@ def read_power_values():
 
     except Exception as e:
         return {"error": str(e)}
+
+
+def get_power_limits():
+    """
+    Return the limits a power reading should stay within:
+    {"port", "contract", "cable"} for the first port with a PD contract,
+    where "cable" is the decoded e-marker of the cable on that port.
+    """
+    limits = {"port": None, "contract": None, "cable": None}
+
+    for port in get_typec_port_names():
+        contract = get_port_pd(port)["contract"]
+        if contract:
+            limits["port"] = port
+            limits["contract"] = contract
+            break
+
+    cables = get_cable_info() or {}
+    for key, info in cables.items():
+        if limits["port"] and not key.startswith(f"{limits['port']}/"):
+            continue
+        if info.get("decoded"):
+            limits["cable"] = info["decoded"]
+            break
+
+    return limits
+
+
+def read_power_checked(limits):
+    """Read power values and add any contract / cable-rating warnings."""
+    data = read_power_values()
+    if data is None or "error" in data:
+        return data
+
+    data["warnings"] = check_power_limits(data, limits.get("contract"), limits.get("cable"))
+    return data
+
+
+class PowerSampler:
+    """
+    Polls voltage_now/current_now in a background thread while an I/O run
+    is in progress. Samples are stamped with time.perf_counter(), the same
+    monotonic clock the data and stability tests time their phases with,
+    so a summary can be cut to exactly the I/O window.
+
+    with PowerSampler(supply) as sampler:
+        start = time.perf_counter(); ... do I/O ...; end = time.perf_counter()
+    sampler.summary(start, end, size_mb)
+    """
+
+    def __init__(self, supply, interval=POWER_SAMPLE_INTERVAL):
+        self.supply = supply
+        self.interval = interval
+        self.fds = None
+        self.thread = None
+        self.running = False
+        self.samples = []  # (perf_counter, volts, amps)
+
+    def _sample(self):
+        volts, amps = (int(os.pread(fd, 64, 0)) / 1_000_000 for fd in self.fds)
+        now = time.perf_counter()
+        self.samples.append((now, volts, amps))
+        metrics.record_power(volts, amps)
+        recording.record("power", [volts, amps], now)
+
+    def _loop(self):
+        while self.running:
+            try:
+                self._sample()
+            except (OSError, ValueError):
+                break
+            time.sleep(self.interval)
+
+    def start(self):
+        if self.supply is None:
+            return self
+        try:
+            self.fds = [os.open(os.path.join(self.supply, name), os.O_RDONLY)
+                        for name in ("voltage_now", "current_now")]
+            self._sample()
+        except (OSError, ValueError):
+            self.close()
+            return self
+
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.fds is None:
+            return self
+        self.running = False
+        self.thread.join()
+        try:
+            # Close the window with a sample even if the run was shorter than the interval
+            self._sample()
+        except (OSError, ValueError):
+            pass
+        self.close()
+        return self
+
+    def close(self):
+        for fd in self.fds or []:
+            os.close(fd)
+        self.fds = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def summary(self, start=None, end=None, size_mb=None):
+        """
+        Power figures for the samples inside [start, end] (perf_counter times),
+        or None without samples: average/minimum voltage, average/peak current,
+        average power, energy in joules and joules per GB moved.
+        """
+        window = [s for s in self.samples
+                  if (start is None or s[0] >= start) and (end is None or s[0] <= end)]
+        if not window:
+            # Phase shorter than one sample interval: use the closest readings
+            window = self.samples
+        if not window:
+            return None
+
+        volts = [v for _, v, _ in window]
+        amps = [a for _, _, a in window]
+        watts = sum(v * a for _, v, a in window) / len(window)
+        if start is not None and end is not None:
+            elapsed = end - start
+        else:
+            elapsed = window[-1][0] - window[0][0]
+        energy = watts * elapsed
+
+        return {
+            "avg_voltage": round(sum(volts) / len(volts), 3),
+            "min_voltage": round(min(volts), 3),
+            "avg_current": round(sum(amps) / len(amps), 3),
+            "peak_current": round(max(amps), 3),
+            "avg_wattage": round(watts, 2),
+            "energy_j": round(energy, 3),
+            "j_per_gb": round(energy / (size_mb / 1024), 2) if size_mb else None,
+            "samples": len(window),
+        }
+
+
+def measure_idle(supply, duration=IDLE_DURATION):
+    """Sample the supply with no test I/O running, as the baseline for voltage sag."""
+    with PowerSampler(supply) as sampler:
+        time.sleep(duration)
+    return sampler.summary()
+
+
+def summarize_power(runs, idle):
+    """
+    Combine per-run "power_write"/"power_read" summaries with the idle baseline:
+    joules per GB per direction, peak current and the worst voltage sag.
+    None when nothing was sampled.
+    """
+    phases = {"write": [], "read": []}
+    for run in runs:
+        for phase in phases:
+            if run.get(f"power_{phase}"):
+                phases[phase].append(run[f"power_{phase}"])
+    loaded = phases["write"] + phases["read"]
+    if not loaded:
+        return None
+
+    def avg_j_per_gb(summaries):
+        values = [s["j_per_gb"] for s in summaries if s["j_per_gb"] is not None]
+        return round(sum(values) / len(values), 2) if values else None
+
+    min_voltage = min(s["min_voltage"] for s in loaded)
+    return {
+        "idle": idle,
+        "write_j_per_gb": avg_j_per_gb(phases["write"]),
+        "read_j_per_gb": avg_j_per_gb(phases["read"]),
+        "peak_current": max(s["peak_current"] for s in loaded),
+        "min_voltage": min_voltage,
+        "voltage_sag": round(idle["avg_voltage"] - min_voltage, 3) if idle else None,
+    }
+
+
+def power_run_lines(run):
+    """Per-run power lines to print under a run's throughput figures."""
+    lines = []
+    for phase in ("write", "read"):
+        summary = run.get(f"power_{phase}")
+        if summary:
+            lines.append(
+                f"{phase.capitalize()} power: {summary['avg_wattage']} W avg, "
+                f"{summary['min_voltage']} V min, {summary['peak_current']} A peak, "
+                f"{summary['j_per_gb']} J/GB"
+            )
+    return lines
+
+
+def power_result_lines(power):
+    """Power-under-load summary for a whole data/stability test."""
+    if not power:
+        return ["Power under load: no power supply readings available."]
+
+    lines = []
+    idle = power["idle"]
+    if idle:
+        lines.append(f"Idle: {idle['avg_voltage']} V, {idle['avg_current']} A")
+    lines.append(f"Energy: write {power['write_j_per_gb']} J/GB | read {power['read_j_per_gb']} J/GB")
+    lines.append(f"Peak Current: {power['peak_current']} A")
+    if power["voltage_sag"] is not None:
+        lines.append(f"Voltage Sag: {power['voltage_sag']} V (min {power['min_voltage']} V under load)")
+    return lines
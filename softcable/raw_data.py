@@ -1,4 +1,9 @@
 import os
+import sys
+
+from softcable.model import RawSnapshot, SysfsRecord
+from softcable.sysfs import sys_path
+from softcable.tracing import traced, span
 
 def read_sysfs_folder(path):
     """Reads all files in a sysfs folder and returns a dict."""
@@ -7,21 +12,22 @@ def read_sysfs_folder(path):
     if not os.path.exists(path):
         return None
 
-    for item in os.listdir(path):
-        full = os.path.join(path, item)
+    with span("read_sysfs_folder", path=path):
+        for item in os.listdir(path):
+            full = os.path.join(path, item)
 
-        if os.path.isfile(full):
-            try:
-                with open(full, "r") as f:
-                    data[item] = f.read().strip()
-            except:
-                data[item] = "<unreadable>"
+            if os.path.isfile(full):
+                try:
+                    with open(full, "r") as f:
+                        data[item] = f.read().strip()
+                except:
+                    data[item] = "<unreadable>"
 
     return data
 
 
 def read_power_supply():
-    base = "/sys/class/power_supply/"
+    base = sys_path("class", "power_supply") + "/"
     result = {}
 
     if not os.path.exists(base):
@@ -36,7 +42,7 @@ def read_power_supply():
 
 
 def read_typec():
-    base = "/sys/class/typec/"
+    base = sys_path("class", "typec") + "/"
     result = {}
 
     if not os.path.exists(base):
@@ -51,7 +57,7 @@ def read_typec():
 
 
 def read_usb_devices():
-    base = "/sys/bus/usb/devices/"
+    base = sys_path("bus", "usb", "devices") + "/"
     result = {}
 
     if not os.path.exists(base):
@@ -65,9 +71,35 @@ def read_usb_devices():
     return result
 
 
+@traced()
 def get_raw_data():
     return {
         "power_supply": read_power_supply(),
         "typec": read_typec(),
         "usb_devices": read_usb_devices()
     }
+
+
+def _read_records(base):
+    if not os.path.exists(base):
+        return None
+
+    records = {}
+    for entry in os.listdir(base):
+        full = os.path.join(base, entry)
+        if os.path.isdir(full):
+            records[sys.intern(entry)] = SysfsRecord.from_dict(entry, read_sysfs_folder(full))
+    return records
+
+
+@traced()
+def get_raw_snapshot():
+    """
+    get_raw_data() as a RawSnapshot: parsed values and interned names,
+    converted folder by folder so the dict form never exists all at once.
+    """
+    return RawSnapshot(
+        power_supply=_read_records(sys_path("class", "power_supply")),
+        typec=_read_records(sys_path("class", "typec")),
+        usb_devices=_read_records(sys_path("bus", "usb", "devices")),
+    )
@@ -0,0 +1,163 @@
+import mmap
+import os
+import stat
+import time
+
+from softcable.block_stats import resolve_block_device, read_queue_limits, BlockSampler
+from softcable.integrity import open_direct
+from softcable.sweep import measure_cell
+from softcable.sysfs import sys_path
+from softcable.tracing import traced
+
+SEQ_BLOCK_KB = 1024
+SEQ_ZONES = 8         # sequential reads are sampled at this many points across the device
+ZONE_MB = 32          # MB read at each point
+RANDOM_BLOCK_KB = 1024  # large aligned reads, so the link rather than seek time sets the pace
+RANDOM_QUEUE_DEPTH = 8
+RANDOM_SECONDS = 2.0
+
+
+def resolve_raw_device(path):
+    """
+    Return the whole-disk node ("/dev/sdb") for a device node or a path on
+    a mounted filesystem, or None if it is not backed by a block device.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    if stat.S_ISBLK(st.st_mode):
+        # A device node: its own number (st_rdev), not the /dev filesystem's. The
+        # kernel name comes from sysfs, so /dev/disk/by-id/... links resolve to sdX
+        real = os.path.realpath(sys_path("dev", "block", f"{os.major(st.st_rdev)}:{os.minor(st.st_rdev)}"))
+        if not os.path.exists(real):
+            return os.path.realpath(path)
+        if os.path.exists(os.path.join(real, "partition")):
+            real = os.path.dirname(real)
+        return f"/dev/{os.path.basename(real)}"
+
+    device = resolve_block_device(path)
+    return f"/dev/{device['disk']}" if device else None
+
+
+def _zone_offsets(size, zone_bytes, zones, align):
+    """Evenly spaced, aligned start offsets from the start to the end of the device."""
+    if size <= zone_bytes:
+        return [0]
+    last = (size - zone_bytes) // align * align
+    if zones == 1:
+        return [0]
+    return sorted({(last * i // (zones - 1)) // align * align for i in range(zones)})
+
+
+def read_zones(fd, size, block_kb=SEQ_BLOCK_KB, zones=SEQ_ZONES, zone_mb=ZONE_MB):
+    """
+    Sequentially read `zone_mb` at `zones` points spread over the device.
+    Sampling keeps multi-TB devices to a few hundred MB of reads while still
+    showing the outer-to-inner slowdown of spinning disks.
+    """
+    block_size = block_kb * 1024
+    zone_bytes = zone_mb * 1024 * 1024
+    buf = mmap.mmap(-1, block_size)
+    results = []
+
+    try:
+        for offset in _zone_offsets(size, zone_bytes, zones, block_size):
+            end_offset = min(offset + zone_bytes, size)
+            done = 0
+            start = time.perf_counter()
+            pos = offset
+            while pos < end_offset:
+                got = os.preadv(fd, [buf], pos)
+                if got <= 0:
+                    break
+                done += got
+                pos += got
+            elapsed = time.perf_counter() - start
+            results.append({
+                "offset_gb": round(offset / 1024 ** 3, 2),
+                "mb": round(done / (1024 * 1024), 2),
+                "mb_s": round(done / (1024 * 1024) / elapsed, 2) if elapsed else None,
+            })
+    finally:
+        buf.close()
+    return results
+
+
+@traced()
+def run_raw_read_test(path, zones=SEQ_ZONES, zone_mb=ZONE_MB,
+                      random_seconds=RANDOM_SECONDS, queue_depth=RANDOM_QUEUE_DEPTH):
+    """
+    Read-only link test straight on the block device behind `path`.
+
+    Bypasses the filesystem: sequential 1 MiB O_DIRECT reads sampled across
+    the whole device, then random 1 MiB aligned reads at `queue_depth`. Nothing is
+    ever written, so it is safe on media holding data. Needs read access
+    to the device node (usually root).
+    """
+    node = resolve_raw_device(path)
+    if node is None:
+        return {"error": f"{path} is not on a block device"}
+
+    # open_direct only ever uses O_RDONLY, so this test cannot modify the device
+    try:
+        fd, direct = open_direct(node)
+    except OSError as e:
+        return {"error": f"Cannot open {node} read-only: {e}"}
+
+    try:
+        size = os.lseek(fd, 0, os.SEEK_END)
+        if size <= 0:
+            return {"error": f"{node} reports no capacity"}
+
+        # The node lives on devtmpfs, so point the sampler at the disk directly
+        disk = os.path.basename(node)
+        device = {"name": disk, "disk": disk, "sysfs": sys_path("block", disk)}
+        with BlockSampler(device) as sampler:
+            sequential = read_zones(fd, size, zones=zones, zone_mb=zone_mb)
+        seq_device = sampler.summary()
+    except OSError as e:
+        return {"error": str(e)}
+    finally:
+        os.close(fd)
+
+    # Random reads reuse the sweep's worker threads; the device is opened read-only
+    size_mb = size // (1024 * 1024)
+    random_reads = measure_cell(node, RANDOM_BLOCK_KB, queue_depth, size_mb, "read", random_seconds)
+    if random_reads["error"]:
+        return {"error": random_reads["error"]}
+
+    speeds = [z["mb_s"] for z in sequential if z["mb_s"]]
+    return {
+        "error": None,
+        "device": node,
+        "size_gb": round(size / 1024 ** 3, 2),
+        "direct_io": direct,
+        "zones": sequential,
+        "avg_read": round(sum(speeds) / len(speeds), 2) if speeds else None,
+        "min_read": min(speeds) if speeds else None,
+        "max_read": max(speeds) if speeds else None,
+        "random": random_reads,
+        "device_read": seq_device,
+        "queue": read_queue_limits(disk),
+    }
+
+
+def raw_result_lines(result):
+    """Lines for reports and the GUI."""
+    lines = [f"Device: {result['device']} ({result['size_gb']} GB), read-only"]
+    if not result["direct_io"]:
+        lines.append("O_DIRECT not supported here: figures include the page cache.")
+    for zone in result["zones"]:
+        lines.append(f"  @ {zone['offset_gb']} GB: {zone['mb_s']} MB/s ({zone['mb']} MB)")
+    lines.append(
+        f"Sequential Read: avg {result['avg_read']} MB/s "
+        f"(min {result['min_read']}, max {result['max_read']})"
+    )
+    rnd = result["random"]
+    lines.append(
+        f"Random {rnd['block_kb']} KiB QD{rnd['queue_depth']}: {rnd['iops']} IOPS, "
+        f"{rnd['mb_s']} MB/s, lat avg {rnd['avg_lat_ms']} ms p99 {rnd['p99_lat_ms']} ms"
+    )
+    return lines
@@ -0,0 +1,741 @@
+import argparse
+import bisect
+import collections
+import heapq
+import json
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+from softcable.sysfs import SYSFS_ROOT
+
+# Off unless a session is being recorded; every hook starts with a check of
+# this flag, so an idle hook costs one global lookup.
+ENABLED = False
+
+MAGIC = b"SCREC01\n"
+INDEX_SUFFIX = ".idx"
+KINDS = ("session", "keyframe", "delta", "uevent", "power", "io", "test", "event", "result")
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+RECORD = struct.Struct("<IdBB")      # payload length, seconds since start, kind, flags
+INDEX_ENTRY = struct.Struct("<dQB")  # seconds since start, file offset, keyframe
+COMPRESSED = 1
+COMPRESS_MIN = 512                   # smaller payloads are written as plain JSON
+
+FLUSH_INTERVAL = 0.5      # the writer thread batches records this long
+REORDER_WINDOW = 1.0      # records are held this long so late arrivals still go out in time order
+INDEX_INTERVAL = 1.0      # one index entry per second of recording, plus every keyframe
+KEYFRAME_INTERVAL = 30.0  # full sysfs state at most this often; deltas in between
+SETTLE = 0.25             # rescan sysfs this long after a uevent, once its burst is over
+IO_CHUNK = 4 * 1024 * 1024
+READ_LIMIT = 4096         # bytes kept per sysfs attribute, as much as the kernel shows
+MAX_DEPTH = 4             # folder levels captured below each watched device
+
+# Everything the backends read, below the sysfs root
+WATCHED = (
+    ("class", "typec"),
+    ("class", "usb_power_delivery"),
+    ("class", "power_supply"),
+    ("class", "drm"),
+    ("bus", "usb", "devices"),
+    ("bus", "thunderbolt", "devices"),
+)
+
+UNREADABLE = ["unreadable"]
+EMPTY_DIR = ["dir"]
+NOT_RECORDED = {"error": "Not in the recording"}
+
+_sink = None
+_recorder = None
+
+
+# ---------------- sysfs state ----------------
+
+def _read_attr(path):
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return UNREADABLE
+    try:
+        return os.read(fd, READ_LIMIT).decode("utf-8", "surrogateescape")
+    except OSError:
+        return UNREADABLE
+    finally:
+        os.close(fd)
+
+
+def _walk(root, rel, state, depth):
+    try:
+        entries = os.scandir(os.path.join(root, rel))
+    except OSError:
+        return
+    empty = True
+    with entries:
+        for entry in entries:
+            empty = False
+            path = f"{rel}/{entry.name}"
+            try:
+                if entry.is_symlink():
+                    # Links are kept as links and never followed: sysfs is full of cycles
+                    state[path] = ["link", os.readlink(entry.path)]
+                elif entry.is_dir():
+                    if depth < MAX_DEPTH:
+                        _walk(root, path, state, depth + 1)
+                    else:
+                        state[path] = EMPTY_DIR
+                else:
+                    state[path] = _read_attr(entry.path)
+            except OSError:
+                continue
+    if empty:
+        state[rel] = EMPTY_DIR
+
+
+def snapshot(root=None):
+    """
+    The sysfs folders the backends read, as {path below the root: value}.
+    A value is the attribute text, ["link", target], ["dir"] for an empty
+    (or not descended) folder or ["unreadable"]. Class entries that link
+    into /sys/devices are kept as links and their targets captured too.
+    """
+    root = root or SYSFS_ROOT
+    real_root = os.path.realpath(root)
+    state = {}
+    walked = set()
+
+    for parts in WATCHED:
+        base = "/".join(parts)
+        try:
+            names = os.listdir(os.path.join(root, base))
+        except OSError:
+            continue
+        if not names:
+            state[base] = EMPTY_DIR
+        for name in names:
+            rel = f"{base}/{name}"
+            full = os.path.join(root, rel)
+            if os.path.islink(full):
+                state[rel] = ["link", os.readlink(full)]
+                target = os.path.relpath(os.path.realpath(full), real_root)
+                if target.startswith("..") or target in walked or not os.path.isdir(full):
+                    continue
+                walked.add(target)
+                _walk(root, target, state, 1)
+            elif os.path.isdir(full):
+                _walk(root, rel, state, 1)
+            else:
+                state[rel] = _read_attr(full)
+    return state
+
+
+def _diff(old, new):
+    changed = {path: value for path, value in new.items() if old.get(path) != value}
+    removed = [path for path in old if path not in new]
+    return {"set": changed, "del": removed}
+
+
+def apply_delta(state, delta):
+    state.update(delta["set"])
+    for path in delta["del"]:
+        state.pop(path, None)
+    return state
+
+
+def materialize(state, root, recorded_root="/sys"):
+    """Write a snapshot() state out as a tree under `root` (for SOFTCABLE_SYSFS_ROOT)."""
+    for rel, value in sorted(state.items()):
+        if os.path.normpath(rel).startswith(".."):
+            continue
+        full = os.path.join(root, rel)
+        if value == EMPTY_DIR:
+            os.makedirs(full, exist_ok=True)
+            continue
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        if isinstance(value, list) and value[0] == "link":
+            target = value[1]
+            if os.path.isabs(target):
+                target = os.path.relpath(os.path.join(root, os.path.relpath(target, recorded_root)),
+                                         os.path.dirname(full))
+            if not os.path.lexists(full):
+                os.symlink(target, full)
+        elif value == UNREADABLE:
+            open(full, "w").close()
+            os.chmod(full, 0o200)
+        else:
+            with open(full, "w", encoding="utf-8", errors="surrogateescape") as f:
+                f.write(value)
+    return root
+
+
+# ---------------- recording ----------------
+
+class Recorder:
+    """
+    Writes one session to an append-only log: a magic line, then records
+    of (length, time, kind, flags) followed by their JSON payload, zlib
+    compressed when that pays. A sidecar .idx holds fixed-size (time,
+    offset, keyframe) entries, one per second and one per keyframe, so a
+    reader can seek without scanning.
+
+    Hooks only append to a deque; a writer thread batches, encodes and
+    writes the records, and rescans sysfs after hotplug events and test
+    checkpoints, logging what changed as a delta against the last state.
+
+    Record times never decrease through the file, which is what the index
+    and Recording rely on. Records reach the queue late (worker processes
+    send theirs over a pipe), so the writer holds them in a heap for
+    REORDER_WINDOW before writing; one later than that is written at the
+    time of the record before it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "wb")
+        self.index = open(path + INDEX_SUFFIX, "wb")
+        self.file.write(MAGIC)
+        self.origin = time.perf_counter()
+        self.queue = collections.deque()
+        self.pending = []  # heap of (seconds, sequence, kind, payload)
+        self.sequence = 0
+        self.written = 0.0
+        self.wake = threading.Event()
+        self.stopping = False
+        self.rescan_at = None
+        self.state = {}
+        self.last_keyframe = None
+        self.next_index = 0.0
+        self.counts = collections.Counter()
+        self._write(0.0, "session", {
+            "started": time.time(),
+            "host": os.uname().nodename,
+            "sysfs_root": SYSFS_ROOT,
+        })
+        self.thread = threading.Thread(target=self._run, name="softcable-recorder", daemon=True)
+
+    def _write(self, t, kind, payload):
+        data = json.dumps(payload, separators=(",", ":"), default=str).encode()
+        flags = 0
+        if len(data) >= COMPRESS_MIN:
+            packed = zlib.compress(data, 1)
+            if len(packed) < len(data):
+                data, flags = packed, COMPRESSED
+
+        offset = self.file.tell()
+        keyframe = kind == "keyframe"
+        if keyframe or t >= self.next_index:
+            self.index.write(INDEX_ENTRY.pack(t, offset, keyframe))
+            self.next_index = t + INDEX_INTERVAL
+        self.file.write(RECORD.pack(len(data), t, KIND_CODES[kind], flags))
+        self.file.write(data)
+        self.written = t
+        self.counts[kind] += 1
+
+    def _drain(self, final=False):
+        """Write the queued records older than REORDER_WINDOW (all of them when `final`), oldest first."""
+        while self.queue:
+            t, kind, payload = self.queue.popleft()
+            heapq.heappush(self.pending, (max(0.0, t - self.origin), self.sequence, kind, payload))
+            self.sequence += 1
+        horizon = time.perf_counter() - self.origin - REORDER_WINDOW
+        while self.pending and (final or self.pending[0][0] <= horizon):
+            t, _, kind, payload = heapq.heappop(self.pending)
+            self._write(max(t, self.written), kind, payload)
+
+    def _scan(self):
+        state = snapshot()
+        now = time.perf_counter()
+        t = now - self.origin
+        if self.last_keyframe is None or t - self.last_keyframe >= KEYFRAME_INTERVAL:
+            self.queue.append((now, "keyframe", state))
+            self.last_keyframe = t
+        else:
+            delta = _diff(self.state, state)
+            if delta["set"] or delta["del"]:
+                self.queue.append((now, "delta", delta))
+        self.state = state
+
+    def _run(self):
+        self._scan()
+        while True:
+            timeout = FLUSH_INTERVAL
+            if self.rescan_at is not None:
+                timeout = max(0.0, min(timeout, self.rescan_at - time.perf_counter()))
+            self.wake.wait(timeout)
+            self.wake.clear()
+
+            if self.stopping or (self.rescan_at is not None and time.perf_counter() >= self.rescan_at):
+                self.rescan_at = None
+                self._scan()
+            self._drain(final=self.stopping)
+            self.file.flush()
+            self.index.flush()
+            if self.stopping:
+                break
+
+    def request_scan(self, delay=SETTLE):
+        if self.rescan_at is None:
+            self.rescan_at = time.perf_counter() + delay
+            self.wake.set()
+
+    def on_uevent(self, event):
+        self.queue.append((time.perf_counter(), "uevent", event))
+        self.request_scan()
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopping = True
+        self.wake.set()
+        self.thread.join()
+        self.file.close()
+        self.index.close()
+        return {"path": self.path, "duration_s": round(time.perf_counter() - self.origin, 3),
+                "records": dict(self.counts), "bytes": os.path.getsize(self.path)}
+
+
+def start_recording(path):
+    """
+    Record this session to `path`: sysfs state and its changes, hotplug
+    events, power samples, per-chunk test I/O and test results, including
+    those of supervised worker processes. Call stop_recording() to finish.
+    """
+    global ENABLED, _sink, _recorder
+    from softcable.hotplug import get_monitor
+
+    if _recorder is not None:
+        return _recorder
+    _recorder = Recorder(path).start()
+    _sink = _recorder.queue.append
+    ENABLED = True
+    get_monitor().subscribe(_recorder.on_uevent)
+    return _recorder
+
+
+def stop_recording():
+    """Finish the recording; returns its path, duration, size and record counts."""
+    global ENABLED, _sink, _recorder
+    from softcable.hotplug import get_monitor
+
+    if _recorder is None:
+        return None
+    ENABLED = False
+    _sink = None
+    get_monitor().unsubscribe(_recorder.on_uevent)
+    recorder, _recorder = _recorder, None
+    return recorder.stop()
+
+
+def forward(send):
+    """Record into `send((time, kind, payload))` instead of a file (test worker processes)."""
+    global ENABLED, _sink
+    _sink = send
+    ENABLED = True
+
+
+def record(kind, payload, t=None):
+    """Add one record, stamped with perf_counter() unless `t` is given."""
+    if not ENABLED:
+        return
+    _sink((time.perf_counter() if t is None else t, kind, payload))
+
+
+def checkpoint(kind, payload):
+    """record(), then capture what changed in sysfs since the last scan."""
+    if not ENABLED:
+        return
+    record(kind, payload)
+    if _recorder is not None:
+        _recorder.request_scan(0.0)
+
+
+def timed_write(f, data, name):
+    """
+    f.write(data). While recording, the data goes out in IO_CHUNK pieces
+    and the time each one finished is recorded, in seconds from the start
+    of the write; the record is stamped when the write is done, and
+    "elapsed" gives how long before that it started.
+    """
+    if not ENABLED:
+        f.write(data)
+        return
+    view = memoryview(data)
+    start = time.perf_counter()
+    done = []
+    for offset in range(0, len(view), IO_CHUNK):
+        f.write(view[offset:offset + IO_CHUNK])
+        done.append(round(time.perf_counter() - start, 6))
+    now = time.perf_counter()
+    record("io", {"op": "write", "file": name, "bytes": len(view), "chunk": IO_CHUNK, "done": done,
+                  "elapsed": round(now - start, 6)}, now)
+
+
+def timed_read(f, name):
+    """f.read(), or while recording a chunked read with each chunk's finish time recorded (as timed_write)."""
+    if not ENABLED:
+        f.read()
+        return
+    buf = memoryview(bytearray(IO_CHUNK))
+    start = time.perf_counter()
+    done = []
+    total = 0
+    while True:
+        got = f.readinto(buf)
+        if not got:
+            break
+        total += got
+        done.append(round(time.perf_counter() - start, 6))
+    now = time.perf_counter()
+    record("io", {"op": "read", "file": name, "bytes": total, "chunk": IO_CHUNK, "done": done,
+                  "elapsed": round(now - start, 6)}, now)
+
+
+# ---------------- replay ----------------
+
+def _decode(data, flags):
+    if flags & COMPRESSED:
+        data = zlib.decompress(data)
+    return json.loads(data)
+
+
+class Recording:
+    """
+    A recorded session, read back without hardware.
+
+    rec = Recording("session.screc")
+    for t, kind, payload in rec.play(speed=10, start=30.0): ...
+    rec.state_at(42.0)   # sysfs as it was 42 s in
+    rec.results()        # latest test results, re-scored
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a SoftCable recording")
+        self.entries = self._load_index()
+        self.times = [t for t, _, _ in self.entries]
+        self.session = next(self._read(len(MAGIC), kinds=("session",)), (0.0, None, {}))[2]
+        self.duration = self._last_time()
+
+    def _headers(self, offset):
+        """(offset, time, kind code) of every complete record from `offset` on."""
+        size = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while True:
+                header = f.read(RECORD.size)
+                if len(header) < RECORD.size:
+                    return
+                length, t, code, _ = RECORD.unpack(header)
+                if offset + RECORD.size + length > size:
+                    return
+                yield offset, t, code
+                offset += RECORD.size + length
+                f.seek(offset)
+
+    def _load_index(self):
+        try:
+            with open(self.path + INDEX_SUFFIX, "rb") as f:
+                raw = f.read()
+            usable = len(raw) - len(raw) % INDEX_ENTRY.size
+            entries = [INDEX_ENTRY.unpack_from(raw, i) for i in range(0, usable, INDEX_ENTRY.size)]
+            if entries:
+                return entries
+        except OSError:
+            pass
+
+        # No index (the recorder was killed before it flushed one): rebuild it from the headers
+        entries = []
+        next_index = 0.0
+        for offset, t, code in self._headers(len(MAGIC)):
+            keyframe = KINDS[code] == "keyframe" if code < len(KINDS) else False
+            if keyframe or t >= next_index:
+                entries.append((t, offset, keyframe))
+                next_index = t + INDEX_INTERVAL
+        return entries
+
+    def _last_time(self):
+        start = self.entries[-1][1] if self.entries else len(MAGIC)
+        last = 0.0
+        for _, t, _ in self._headers(start):
+            last = max(last, t)
+        return last
+
+    def _offset_before(self, t):
+        i = bisect.bisect_right(self.times, t) - 1
+        return self.entries[i][1] if i >= 0 else len(MAGIC)
+
+    def _read(self, offset, start=0.0, end=None, kinds=None):
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while True:
+                header = f.read(RECORD.size)
+                if len(header) < RECORD.size:
+                    return
+                length, t, code, flags = RECORD.unpack(header)
+                if end is not None and t > end:
+                    # Times never decrease through the file (see Recorder)
+                    return
+                kind = KINDS[code] if code < len(KINDS) else None
+                if t < start or kind is None or (kinds and kind not in kinds):
+                    f.seek(length, os.SEEK_CUR)
+                    continue
+                data = f.read(length)
+                if len(data) < length:
+                    return
+                yield t, kind, _decode(data, flags)
+
+    def records(self, start=0.0, end=None, kinds=None):
+        """(seconds, kind, payload) from `start` to `end`, seeking through the index."""
+        return self._read(self._offset_before(start), start, end, kinds)
+
+    def play(self, speed=1.0, start=0.0, end=None, kinds=None, cancel=None):
+        """
+        records(), paced at `speed` times real time (None or 0: as fast as
+        they can be read). Setting the `cancel` event stops the playback.
+        """
+        began = time.perf_counter()
+        for t, kind, payload in self.records(start, end, kinds):
+            if speed:
+                delay = (t - start) / speed - (time.perf_counter() - began)
+                if delay > 0 and cancel is not None and cancel.wait(delay):
+                    return
+                if delay > 0 and cancel is None:
+                    time.sleep(delay)
+            if cancel is not None and cancel.is_set():
+                return
+            yield t, kind, payload
+
+    def state_at(self, t=None):
+        """The sysfs state at `t` seconds (default: the end): last keyframe plus later deltas."""
+        t = self.duration if t is None else t
+        keyframes = [offset for when, offset, keyframe in self.entries if keyframe and when <= t]
+        offset = keyframes[-1] if keyframes else len(MAGIC)
+
+        state = {}
+        for _, kind, payload in self._read(offset, end=t, kinds=("keyframe", "delta")):
+            if kind == "keyframe":
+                state = payload
+            else:
+                apply_delta(state, payload)
+        return state
+
+    def materialize(self, root, t=None):
+        """Write the sysfs state at `t` as a tree under `root`."""
+        return materialize(self.state_at(t), root, self.session.get("sysfs_root", "/sys"))
+
+    def results(self, t=None):
+        """
+        {kind: {"t", "path", "drive", "result"}}: the last result of each test
+        up to `t`, re-scored, with the mount its path was on when it started.
+        """
+        latest = {}
+        drives = {}
+        for when, kind, payload in self.records(0.0, t, kinds=("test", "result")):
+            if kind == "test":
+                drives[payload["kind"]] = payload.get("drive")
+                continue
+            latest[payload["kind"]] = {"t": when, "path": payload["path"],
+                                       "drive": drives.get(payload["kind"]),
+                                       "result": rescore(payload["kind"], payload["result"])}
+        return latest
+
+
+def rescore(kind, result):
+    """Recompute a test's summary from its recorded runs with the current analysis code."""
+    from softcable.data_test import summarize_speed
+    from softcable.stability_test import summarize_stability
+    from softcable.sweep import summarize_cells
+
+    if not result or result.get("error") or not result.get("runs"):
+        return result
+    summarize = {"data": summarize_speed, "stability": summarize_stability, "sweep": summarize_cells}[kind]
+    return dict(result, **summarize(result["runs"]))
+
+
+def replay_report(path, export_path, t=None):
+    """
+    generate_report() for the moment `t` (default: the end) of a recording.
+
+    The backends read their sysfs root at import, so the recorded state is
+    written to a temporary tree and the report runs in a fresh interpreter
+    pointed at it, with the recorded (re-scored) test results in place of
+    live tests and a throwaway home so the cable history is left alone.
+    Returns `export_path`; raises RuntimeError if the report failed.
+    """
+    recording = Recording(path)
+    t = recording.duration if t is None else t
+    scratch = tempfile.mkdtemp(prefix="softcable-replay-")
+    try:
+        recording.materialize(os.path.join(scratch, "sys"), t)
+        env = dict(os.environ, SOFTCABLE_SYSFS_ROOT=os.path.join(scratch, "sys"), HOME=scratch)
+        proc = subprocess.run(
+            [sys.executable, "-m", "softcable.recording", "render", path,
+             os.path.abspath(export_path), "--at", repr(t)],
+            env=env, capture_output=True, text=True,
+        )
+        if proc.returncode:
+            lines = proc.stderr.strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else f"Report failed (exit code {proc.returncode})")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return export_path
+
+
+def _render(path, export_path, t):
+    # Runs in the interpreter replay_report() started, against the materialized tree
+    from softcable.export_txt import generate_report
+
+    tests = Recording(path).results(t)
+    replay = {kind: test["result"] for kind, test in tests.items()}
+    data = tests.get("data") or tests.get("sweep")
+    # This host's mounts say nothing about the recorded drive; use the one recorded with the test
+    replay["drive"] = data["drive"] if data else None
+    stability = tests.get("stability")
+    power = any(test["result"].get("power") for test in tests.values())
+    return generate_report(export_path, data_test_path=data["path"] if data else None,
+                           stability_path=stability["path"] if stability else None,
+                           power=power, sweep="sweep" in tests, replay=replay)
+
+
+# ---------------- display ----------------
+
+def record_line(t, kind, payload):
+    """One human-readable line for a record."""
+    if kind == "session":
+        text = (f"session on {payload['host']} "
+                f"({time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(payload['started']))})")
+    elif kind == "keyframe":
+        text = f"sysfs state: {len(payload)} entries"
+    elif kind == "delta":
+        changed = sorted(payload["set"])
+        text = f"sysfs changed: {len(changed)} set, {len(payload['del'])} removed"
+        if changed and len(changed) <= 3:
+            text += f" ({', '.join(changed)})"
+    elif kind == "uevent":
+        text = (f"hotplug {payload.get('ACTION', '?')} {payload.get('SUBSYSTEM', '?')} "
+                f"{payload.get('DEVPATH', '')}")
+    elif kind == "power":
+        volts, amps = payload
+        text = f"power {volts:.3f} V {amps:.3f} A ({volts * amps:.2f} W)"
+    elif kind == "io":
+        done = payload["done"]
+        gaps = [b - a for a, b in zip([0.0] + done, done)]
+        mb = payload["bytes"] / (1024 * 1024)
+        speed = round(mb / done[-1], 2) if done and done[-1] else None
+        text = f"{payload['op']} {payload['file']}: {mb:.1f} MB in {len(done)} chunks, {speed} MB/s"
+        if gaps:
+            text += f", slowest chunk {max(gaps) * 1000:.1f} ms"
+    elif kind == "test":
+        text = f"{payload['kind']} test started on {payload['path']}"
+    elif kind == "event":
+        event = payload["event"]
+        result = event["result"]
+        if result.get("error"):
+            text = f"{payload['kind']} {event['type']} {event['index']}: error {result['error']}"
+        elif event["type"] == "cell":
+            from softcable.sweep import format_cell
+            text = f"sweep cell {event['index']}: {format_cell(result)}"
+        else:
+            text = (f"{payload['kind']} run {event['index']}/{event['runs']}: "
+                    f"write {result['write']} MB/s | read {result['read']} MB/s")
+    else:
+        text = f"{payload['kind']} test finished: {_result_summary(payload['kind'], payload['result'])}"
+    return f"{t:10.3f} s  {text}"
+
+
+def _result_summary(kind, result):
+    if result.get("error"):
+        return f"error {result['error']}"
+    if kind == "data":
+        return f"write {result['avg_write']} MB/s | read {result['avg_read']} MB/s"
+    if kind == "stability":
+        return f"score {result['score']}/100"
+    return f"saturation {result['saturation_mb_s']} MB/s"
+
+
+def recording_lines(recording):
+    """Summary of a recording for the GUI and `python -m softcable.recording info`."""
+    session = recording.session
+    counts = collections.Counter(kind for _, kind, _ in recording.records(kinds=KINDS[1:]))
+    lines = [
+        f"Recorded: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(session.get('started', 0)))} "
+        f"on {session.get('host', '?')} (sysfs {session.get('sysfs_root', '?')})",
+        f"Duration: {recording.duration:.1f} s, {os.path.getsize(recording.path) / 1024:.1f} KiB, "
+        f"{len(recording.entries)} index entries",
+        "Records: " + (", ".join(f"{kind} {counts[kind]}" for kind in KINDS if counts[kind]) or "none"),
+    ]
+    tests = recording.results()
+    for kind, test in tests.items():
+        lines.append(f"{kind} on {test['path']} at {test['t']:.1f} s: {_result_summary(kind, test['result'])}")
+    return lines
+
+
+# ---------------- command line ----------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m softcable.recording",
+                                     description="Inspect and replay SoftCable session recordings.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    info = commands.add_parser("info", help="summarize a recording")
+    info.add_argument("recording")
+
+    play = commands.add_parser("play", help="print the records, paced like the session")
+    play.add_argument("recording")
+    play.add_argument("--speed", type=float, default=0.0,
+                      help="times real time; 0 prints as fast as possible (default)")
+    play.add_argument("--from", dest="start", type=float, default=0.0, metavar="SECONDS")
+    play.add_argument("--to", dest="end", type=float, metavar="SECONDS")
+    play.add_argument("--kinds", help="comma-separated record kinds to show")
+
+    report = commands.add_parser("report", help="write the report as of a point in the recording")
+    report.add_argument("recording")
+    report.add_argument("output")
+    report.add_argument("--at", type=float, metavar="SECONDS", help="default: the end")
+
+    state = commands.add_parser("state", help="write the recorded sysfs tree to a folder")
+    state.add_argument("recording")
+    state.add_argument("folder")
+    state.add_argument("--at", type=float, metavar="SECONDS", help="default: the end")
+
+    render = commands.add_parser("render", help="internal: report against SOFTCABLE_SYSFS_ROOT")
+    render.add_argument("recording")
+    render.add_argument("output")
+    render.add_argument("--at", type=float)
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "render":
+            _render(args.recording, args.output, args.at)
+            return 0
+
+        recording = Recording(args.recording)
+        if args.command == "info":
+            print("\n".join(recording_lines(recording)))
+        elif args.command == "play":
+            kinds = tuple(args.kinds.split(",")) if args.kinds else None
+            for t, kind, payload in recording.play(args.speed, args.start, args.end, kinds):
+                print(record_line(t, kind, payload), flush=True)
+        elif args.command == "report":
+            print(replay_report(args.recording, args.output, args.at))
+        else:
+            print(recording.materialize(args.folder, args.at))
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
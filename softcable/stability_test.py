@@ -1,51 +1,86 @@
 import os
 import time
 
-def run_single_test(path, size_mb=20):
-    """Runs one write/read test and returns speeds or error."""
-    result = {"write": None, "read": None, "error": None}
+from softcable.block_stats import (
+    BlockSampler, resolve_block_device, read_queue_limits, average_device_speed
+)
+from softcable.cpu_stats import CpuMeter, check_cpus, reserve_cpus, summarize_cpu
+from softcable.integrity import chunk_checksums, verify_file, summarize_integrity
+from softcable.payload import random_payload
+from softcable.power_test import PowerSampler, find_power_supply, measure_idle, summarize_power
+from softcable.recording import timed_read, timed_write
+from softcable.tracing import traced
+from softcable import metrics
+
+TEMP_NAME = "softcable_stability.bin"
+
+
+@traced()
+def run_single_test(path, size_mb=20, device=None, verify=False, supply=None, cpus=None):
+    """
+    Runs one write/read test and returns speeds or error. With `verify`,
+    the read phase also checks the data (see softcable.integrity).
+    """
+    result = {"write": None, "read": None, "error": None,
+              "device_write": None, "device_read": None, "integrity": None,
+              "power_write": None, "power_read": None, "cpu_write": None, "cpu_read": None}
+
+    temp_file = os.path.join(path, TEMP_NAME)
 
     try:
-        data = os.urandom(size_mb * 1024 * 1024)
-        temp_file = os.path.join(path, "softcable_stability.bin")
+        data = random_payload(size_mb * 1024 * 1024)
+
+        # Checksums are taken before the timed write so they cost nothing there
+        if verify:
+            view = memoryview(data)
+            checksums = chunk_checksums(view)
 
         # WRITE
-        start = time.time()
-        with open(temp_file, "wb") as f:
-            f.write(data)
-        end = time.time()
+        with BlockSampler(device) as sampler, PowerSampler(supply) as power, CpuMeter(cpus) as cpu:
+            start = time.perf_counter()
+            with open(temp_file, "wb") as f:
+                timed_write(f, data, TEMP_NAME)
+            end = time.perf_counter()
         result["write"] = round(size_mb / (end - start), 2)
+        result["device_write"] = sampler.summary()
+        result["power_write"] = power.summary(start, end, size_mb)
+        result["cpu_write"] = cpu.summary(result["device_write"], "write", size_mb)
 
-        # READ
-        start = time.time()
-        with open(temp_file, "rb") as f:
-            f.read()
-        end = time.time()
-        result["read"] = round(size_mb / (end - start), 2)
+        if verify:
+            # Verified reads bypass the page cache, so the data must be on the device
+            with open(temp_file, "rb+") as f:
+                os.fsync(f.fileno())
 
-        os.remove(temp_file)
+        # READ
+        with BlockSampler(device) as sampler, PowerSampler(supply) as power, CpuMeter(cpus) as cpu:
+            start = time.perf_counter()
+            if verify:
+                elapsed, result["integrity"] = verify_file(temp_file, view, checksums)
+            else:
+                with open(temp_file, "rb") as f:
+                    timed_read(f, TEMP_NAME)
+                elapsed = time.perf_counter() - start
+            end = time.perf_counter()
+        result["read"] = round(size_mb / elapsed, 2)
+        result["device_read"] = sampler.summary()
+        result["power_read"] = power.summary(start, end, size_mb)
+        result["cpu_read"] = cpu.summary(result["device_read"], "read", size_mb)
 
     except Exception as e:
         result["error"] = str(e)
 
-    return result
+    finally:
+        # Also on errors, so a failed run leaves nothing behind on the drive
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
 
+    return result
 
-def run_stability_test(path, runs=10):
-    """Runs multiple tests and computes stability score."""
-    results = []
-    write_speeds = []
-    read_speeds = []
-
-    for i in range(runs):
-        test = run_single_test(path)
-
-        if test["error"]:
-            return {"error": test["error"]}
 
-        results.append(test)
-        write_speeds.append(test["write"])
-        read_speeds.append(test["read"])
+def summarize_stability(results):
+    """Variance and stability score of a stability test's runs; also re-scores recorded runs."""
+    write_speeds = [run["write"] for run in results]
+    read_speeds = [run["read"] for run in results]
 
     # Compute variance
     write_var = max(write_speeds) - min(write_speeds)
@@ -56,9 +91,55 @@ def run_stability_test(path, runs=10):
     score = max(0, min(100, round(score, 2)))
 
     return {
-        "error": None,
-        "runs": results,
         "write_var": round(write_var, 2),
         "read_var": round(read_var, 2),
-        "score": score
+        "score": score,
+        "avg_device_write": average_device_speed(results, "device_write", "write_mb_s"),
+        "avg_device_read": average_device_speed(results, "device_read", "read_mb_s"),
+        "integrity": summarize_integrity(results),
+        "cpu": summarize_cpu(results),
     }
+
+
+@traced()
+def run_stability_test(path, runs=10, verify=False, power=False, cpus=None, progress=None, cancel=None):
+    """
+    Runs multiple tests and computes stability score. `cpus`, `progress`
+    and `cancel` work as in run_speed_test.
+    """
+    error = check_cpus(cpus)
+    if error:
+        return {"error": error}
+
+    results = []
+
+    device = resolve_block_device(path)
+
+    supply = find_power_supply() if power else None
+    idle = measure_idle(supply) if supply else None
+
+    # Samplers started from this thread inherit the cores it is kept to
+    with reserve_cpus(cpus):
+        for i in range(runs):
+            if cancel is not None and cancel.is_set():
+                return {"error": "Cancelled"}
+
+            test = run_single_test(path, device=device, verify=verify, supply=supply, cpus=cpus)
+            if progress:
+                progress({"type": "run", "index": i + 1, "runs": runs, "result": test})
+
+            if test["error"]:
+                return {"error": test["error"]}
+
+            results.append(test)
+
+    result = {
+        "error": None,
+        "runs": results,
+        **summarize_stability(results),
+        "device": device["name"] if device else None,
+        "queue": read_queue_limits(device["disk"]) if device else None,
+        "power": summarize_power(results, idle) if power else None,
+    }
+    metrics.record_test(path, "stability", result)
+    return result
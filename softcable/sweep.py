@@ -0,0 +1,222 @@
+import mmap
+import os
+import random
+import threading
+import time
+
+from softcable.integrity import open_direct
+from softcable.block_stats import resolve_block_device, read_queue_limits
+from softcable.tracing import traced
+
+TEMP_NAME = "softcable_sweep.bin"
+
+BLOCK_SIZES_KB = (4, 16, 64, 256, 1024, 4096)
+QUEUE_DEPTHS = (1, 2, 4, 8, 16, 32)
+
+CELL_SECONDS = 0.4   # each cell runs for a time budget instead of a fixed size
+KNEE_GAIN = 0.05     # a step that adds less than 5% throughput has stopped scaling
+KNEE_SHARE = 0.95    # the knee is the cheapest cell within 95% of the best
+
+
+def _prepare_file(path, size_mb):
+    """Write the sweep file in 4 MiB chunks and flush it to the device."""
+    chunk = os.urandom(4 * 1024 * 1024)
+    with open(path, "wb") as f:
+        for _ in range(size_mb // 4):
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _worker(path, mode, block_size, blocks, deadline, latencies, errors, seed):
+    try:
+        if mode == "write":
+            try:
+                fd = os.open(path, os.O_WRONLY | getattr(os, "O_DIRECT", 0))
+            except OSError:
+                fd = os.open(path, os.O_WRONLY)
+        else:
+            fd, _ = open_direct(path)
+    except OSError as e:
+        errors.append(str(e))
+        return
+
+    # Page-aligned buffer, as O_DIRECT requires
+    buf = mmap.mmap(-1, block_size)
+    if mode == "write":
+        buf.write(os.urandom(block_size))
+    rng = random.Random(seed)
+    io = os.pwritev if mode == "write" else os.preadv
+
+    try:
+        while True:
+            offset = rng.randrange(blocks) * block_size
+            start = time.perf_counter()
+            io(fd, [buf], offset)
+            end = time.perf_counter()
+            latencies.append(end - start)
+            if end >= deadline:
+                break
+    except OSError as e:
+        errors.append(str(e))
+    finally:
+        os.close(fd)
+        buf.close()
+
+
+@traced()
+def measure_cell(path, block_kb, queue_depth, size_mb, mode="read", seconds=CELL_SECONDS):
+    """
+    Run `queue_depth` threads doing random block_kb-sized O_DIRECT I/O on the
+    sweep file for `seconds`. preadv/pwritev release the GIL, so the threads
+    keep that many requests in flight.
+    """
+    block_size = block_kb * 1024
+    blocks = size_mb * 1024 * 1024 // block_size
+    latencies = [[] for _ in range(queue_depth)]
+    errors = []
+
+    start = time.perf_counter()
+    deadline = start + seconds
+    threads = [
+        threading.Thread(target=_worker, daemon=True,
+                         args=(path, mode, block_size, blocks, deadline, latencies[i], errors, i))
+        for i in range(queue_depth)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    if errors:
+        return {"block_kb": block_kb, "queue_depth": queue_depth, "error": errors[0]}
+
+    merged = sorted(lat for per_thread in latencies for lat in per_thread)
+    ops = len(merged)
+    return {
+        "block_kb": block_kb,
+        "queue_depth": queue_depth,
+        "error": None,
+        "mb_s": round(ops * block_size / (1024 * 1024) / elapsed, 2),
+        "iops": round(ops / elapsed),
+        "avg_lat_ms": round(sum(merged) / ops * 1000, 3) if ops else None,
+        "p99_lat_ms": round(merged[min(ops - 1, int(ops * 0.99))] * 1000, 3) if ops else None,
+    }
+
+
+def _scaled(new, old):
+    return new["mb_s"] > old["mb_s"] * (1 + KNEE_GAIN)
+
+
+def find_knee(cells):
+    """
+    The saturation point: the smallest block size, then the lowest queue
+    depth, that reaches KNEE_SHARE of the best throughput seen.
+    """
+    ok = [c for c in cells if not c["error"]]
+    if not ok:
+        return None
+    best = max(c["mb_s"] for c in ok)
+    candidates = [c for c in ok if c["mb_s"] >= best * KNEE_SHARE]
+    return min(candidates, key=lambda c: (c["block_kb"], c["queue_depth"]))
+
+
+def summarize_cells(cells):
+    """Knee and saturation figures of a sweep's cells; also re-scores recorded sweeps."""
+    knee = find_knee(cells)
+    # Latency cost: what the knee's queueing adds over one request at a time
+    base = next((c for c in cells if c["block_kb"] == knee["block_kb"] and c["queue_depth"] == 1), None)
+    return {
+        "knee": knee,
+        "saturation_mb_s": knee["mb_s"],
+        "best_mb_s": max(c["mb_s"] for c in cells),
+        "latency_cost_ms": round(knee["avg_lat_ms"] - base["avg_lat_ms"], 3) if base else None,
+    }
+
+
+@traced()
+def run_sweep(target_path, size_mb=256, mode="read",
+              block_sizes=BLOCK_SIZES_KB, queue_depths=QUEUE_DEPTHS, progress=None, cancel=None):
+    """
+    Walk the block-size x queue-depth grid and find where throughput stops scaling.
+
+    The grid is pruned as it goes: for each block size the queue depth is
+    raised only while it still adds throughput, and larger block sizes are
+    only tried while they beat the previous one. Usually a handful of the
+    cells run. `progress` gets a {"type": "cell", ...} event per cell and
+    the `cancel` event stops the sweep before the next one.
+    """
+    temp_file = os.path.join(target_path, TEMP_NAME)
+    size_mb = max(4, size_mb - size_mb % 4)
+    grid_size = len(block_sizes) * len(queue_depths)
+    cells = []
+
+    try:
+        _prepare_file(temp_file, size_mb)
+        fd, direct = open_direct(temp_file)
+        os.close(fd)
+
+        previous_best = None
+        for block_kb in block_sizes:
+            best = None
+            for depth in queue_depths:
+                if cancel is not None and cancel.is_set():
+                    return {"error": "Cancelled"}
+                cell = measure_cell(temp_file, block_kb, depth, size_mb, mode)
+                cells.append(cell)
+                if progress:
+                    progress({"type": "cell", "index": len(cells), "grid_size": grid_size, "result": cell})
+                if cell["error"]:
+                    return {"error": cell["error"]}
+                if best is not None and not _scaled(cell, best):
+                    break
+                if best is None or cell["mb_s"] > best["mb_s"]:
+                    best = cell
+
+            if previous_best is not None and not _scaled(best, previous_best):
+                break
+            previous_best = best
+
+    except Exception as e:
+        return {"error": str(e)}
+
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    device = resolve_block_device(target_path)
+
+    return {
+        "error": None,
+        "mode": mode,
+        "direct_io": direct,
+        "runs": cells,
+        "tested": len(cells),
+        "grid_size": grid_size,
+        **summarize_cells(cells),
+        "device": device["name"] if device else None,
+        "queue": read_queue_limits(device["disk"]) if device else None,
+    }
+
+
+def format_cell(cell):
+    return (
+        f"{cell['block_kb']} KiB x QD{cell['queue_depth']}: {cell['mb_s']} MB/s, "
+        f"{cell['iops']} IOPS, lat avg {cell['avg_lat_ms']} ms p99 {cell['p99_lat_ms']} ms"
+    )
+
+
+def sweep_result_lines(result):
+    """Summary lines for reports and the GUI."""
+    knee = result["knee"]
+    lines = [
+        f"Saturation: {result['saturation_mb_s']} MB/s at {knee['block_kb']} KiB x QD{knee['queue_depth']} "
+        f"({result['mode']}, best {result['best_mb_s']} MB/s)",
+    ]
+    if not result["direct_io"]:
+        lines.append("O_DIRECT not supported here: figures include the page cache.")
+    if result["latency_cost_ms"] is not None:
+        lines.append(f"Latency cost at the knee: +{result['latency_cost_ms']} ms per request over QD1")
+    lines.append(f"Cells tested: {result['tested']} of {result['grid_size']}")
+    return lines
@@ -0,0 +1,10 @@
+import os
+
+# Root every backend reads sysfs from. Point SOFTCABLE_SYSFS_ROOT at a fake
+# tree (see softcable.bench.fixtures) to run without USB-C hardware.
+SYSFS_ROOT = os.environ.get("SOFTCABLE_SYSFS_ROOT", "/sys")
+
+
+def sys_path(*parts):
+    """Join path parts below the sysfs root: sys_path("class", "typec")."""
+    return os.path.join(SYSFS_ROOT, *parts)
@@ -0,0 +1,174 @@
+import os
+import re
+
+from softcable.sysfs import sys_path
+from softcable.tracing import traced
+
+THUNDERBOLT_PATH = sys_path("bus", "thunderbolt", "devices") + "/"
+
+# Share of the raw USB4 link rate a storage device sees after tunnelling
+# and protocol overhead (a 2 x 20 Gb/s link lands around 3 GB/s).
+LINK_EFFICIENCY = 0.6
+
+
+def read_file(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _parse_speed(raw):
+    """Parse "20.0 Gb/s" into 20.0."""
+    if not raw:
+        return None
+    match = re.match(r"([\d.]+)", raw)
+    return float(match.group(1)) if match else None
+
+
+def _parse_int(raw):
+    return int(raw) if raw and raw.isdigit() else None
+
+
+def read_router(name):
+    """Read one router (host "0-0" or device "0-1", "0-301", ...)."""
+    path = os.path.join(THUNDERBOLT_PATH, name)
+    domain, _, route = name.partition("-")
+
+    router = {
+        "name": name,
+        "domain": f"domain{domain}",
+        "route": int(route, 16) if route else 0,
+        "generation": _parse_int(read_file(os.path.join(path, "generation"))),
+        "vendor": read_file(os.path.join(path, "vendor_name")),
+        "device": read_file(os.path.join(path, "device_name")),
+        "authorized": read_file(os.path.join(path, "authorized")),
+        "rx_speed": _parse_speed(read_file(os.path.join(path, "rx_speed"))),
+        "tx_speed": _parse_speed(read_file(os.path.join(path, "tx_speed"))),
+        "rx_lanes": _parse_int(read_file(os.path.join(path, "rx_lanes"))),
+        "tx_lanes": _parse_int(read_file(os.path.join(path, "tx_lanes"))),
+    }
+
+    # Link to the parent: per-lane speed x lanes, slower direction wins
+    totals = [s * l for s, l in ((router["rx_speed"], router["rx_lanes"]),
+                                 (router["tx_speed"], router["tx_lanes"])) if s and l]
+    router["link_gbps"] = min(totals) if totals else None
+    return router
+
+
+def _host_port_connectors(host):
+    """Map host router USB4 port number -> Type-C port via usb4_portN/connector."""
+    path = os.path.join(THUNDERBOLT_PATH, host)
+    result = {}
+    try:
+        entries = os.listdir(path)
+    except OSError:
+        return result
+
+    for entry in entries:
+        match = re.fullmatch(r"usb4_port(\d+)", entry)
+        if not match:
+            continue
+        link = os.path.join(path, entry, "connector")
+        if os.path.exists(link):
+            result[int(match.group(1))] = os.path.basename(os.path.realpath(link))
+    return result
+
+
+@traced()
+def get_usb4_info():
+    """
+    Enumerate Thunderbolt/USB4 domains and routers.
+
+    {
+        "domains": {"domain0": {"security": "user", "routers": [router, ...]}},
+        "ports": {"port0": router directly behind that Type-C port, ...},
+    }
+    Returns None if /sys/bus/thunderbolt does not exist.
+    """
+    if not os.path.exists(THUNDERBOLT_PATH):
+        return None
+
+    domains = {}
+    routers = []
+
+    for entry in sorted(os.listdir(THUNDERBOLT_PATH)):
+        if entry.startswith("domain"):
+            domains.setdefault(entry, {"routers": []})
+            domains[entry]["security"] = read_file(os.path.join(THUNDERBOLT_PATH, entry, "security"))
+        elif re.fullmatch(r"\d+-[0-9a-f]+", entry):
+            routers.append(read_router(entry))
+
+    ports = {}
+    for router in routers:
+        domains.setdefault(router["domain"], {"security": None, "routers": []})
+        domains[router["domain"]]["routers"].append(router)
+
+    # Host routers sit at route 0; their usb4_portN link to Type-C ports
+    connectors = {r["domain"]: _host_port_connectors(r["name"])
+                  for r in routers if r["route"] == 0}
+
+    for router in routers:
+        # Only routers one hop from the host: the route is a single byte
+        hops = connectors.get(router["domain"], {})
+        if router["route"] and router["route"] <= 0xFF and router["route"] in hops:
+            ports[hops[router["route"]]] = router
+
+    return {"domains": domains, "ports": ports}
+
+
+def get_port_link(typec_port, info=None):
+    """Return the router directly behind a Type-C port ("port0" or a path), or None."""
+    if info is None:
+        info = get_usb4_info()
+    if not info:
+        return None
+    return info["ports"].get(os.path.basename(typec_port))
+
+
+def get_active_links(info=None):
+    """Return every device router with a trained link (route != 0)."""
+    if info is None:
+        info = get_usb4_info()
+    if not info:
+        return []
+    return [r for d in info["domains"].values() for r in d["routers"]
+            if r["route"] and r["link_gbps"]]
+
+
+def expected_mb_s(router):
+    """Rough storage throughput in MB/s a link should sustain."""
+    if not router or not router.get("link_gbps"):
+        return None
+    return round(router["link_gbps"] * 1000 / 8 * LINK_EFFICIENCY)
+
+
+def describe_link(router):
+    """Describe a link for reports and the GUI, e.g. "20 Gb/s x2 (Gen 3), expected ~3000 MB/s"."""
+    if not router or not router.get("link_gbps"):
+        return None
+    speed = router["rx_speed"] or router["tx_speed"]
+    lanes = router["rx_lanes"] or router["tx_lanes"]
+    text = f"{speed:g} Gb/s x{lanes}"
+    if router["generation"]:
+        text += f" (Gen {router['generation']})"
+    return f"{text}, expected ~{expected_mb_s(router)} MB/s"
+
+
+def single_active_link(info=None):
+    """The only trained USB4 link on the system, or None if there are none or several."""
+    links = get_active_links(info)
+    return links[0] if len(links) == 1 else None
+
+
+def compare_to_link(result, router):
+    """
+    Compare a data test result against what the USB4 link should sustain.
+    Returns a line like "Best average reaches 41% of the ~3000 MB/s ...", or None.
+    """
+    expected = expected_mb_s(router)
+    if not expected or not result or result.get("error"):
+        return None
+    best = max(result.get("avg_read") or 0, result.get("avg_write") or 0)
+    return f"Best average reaches {round(best * 100 / expected)}% of the ~{expected} MB/s the link allows."
@@ -0,0 +1,328 @@
+import collections
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Off unless asked for; every hook starts with a check of this flag, so a
+# disabled span costs one global lookup.
+ENABLED = bool(os.environ.get("SOFTCABLE_TRACE"))
+
+MAX_EVENTS = 200_000
+PROFILE_INTERVAL = 0.005
+THREAD_IO_PATH = "/proc/thread-self/io"
+
+_events = collections.deque(maxlen=MAX_EVENTS)
+_local = threading.local()
+_origin = time.perf_counter()
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def clear():
+    _events.clear()
+
+
+class _ThreadIO:
+    """Per-thread handle on /proc/thread-self/io, closed when the thread's locals go."""
+
+    def __init__(self):
+        try:
+            self.fd = os.open(THREAD_IO_PATH, os.O_RDONLY)
+        except OSError:
+            self.fd = -1
+        self.overhead = [0, 0]
+
+    def __del__(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+
+
+def _io_counters():
+    """
+    This thread's syscall and byte counters from /proc/thread-self/io, read
+    with one pread on a per-thread fd. Returns (counters, own overhead so far)
+    so spans can leave out the reads tracing itself did.
+    """
+    handle = getattr(_local, "io", None)
+    if handle is None:
+        handle = _local.io = _ThreadIO()
+    if handle.fd < 0:
+        return None, None
+
+    try:
+        raw = os.pread(handle.fd, 512, 0)
+    except OSError:
+        return None, None
+
+    overhead = tuple(handle.overhead)
+    handle.overhead[0] += 1
+    handle.overhead[1] += len(raw)
+
+    counters = {}
+    for line in raw.decode().splitlines():
+        key, _, value = line.partition(":")
+        counters[key] = int(value)
+    return counters, overhead
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start", "io", "overhead")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.io, self.overhead = _io_counters()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        io, overhead = _io_counters()
+
+        args = self.args
+        if self.io and io:
+            own_calls = overhead[0] - self.overhead[0]
+            own_bytes = overhead[1] - self.overhead[1]
+            args["syscalls"] = (io["syscr"] + io["syscw"]
+                                - self.io["syscr"] - self.io["syscw"] - own_calls)
+            args["read_bytes"] = io["rchar"] - self.io["rchar"] - own_bytes
+            args["write_bytes"] = io["wchar"] - self.io["wchar"]
+            args["device_read_bytes"] = io["read_bytes"] - self.io["read_bytes"]
+            args["device_write_bytes"] = io["write_bytes"] - self.io["write_bytes"]
+        if exc_type is not None:
+            args["error"] = repr(exc)
+
+        _events.append({
+            "name": self.name,
+            "cat": self.cat,
+            "ph": "X",
+            "ts": round((self.start - _origin) * 1e6, 3),
+            "dur": round((end - self.start) * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, cat="softcable", **args):
+    """
+    Time a block: with span("read_sysfs_folder", path=path): ...
+    Records wall time plus what this thread did inside it: read/write-family
+    syscalls and bytes (rchar/wchar), and bytes that reached the device.
+    """
+    if not ENABLED:
+        return _NO_SPAN
+    return _Span(name, cat, args)
+
+
+def traced(name=None, cat="softcable"):
+    """Decorator form of span() for backend entry points."""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _Span(label, cat, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class SectionSpans:
+    """
+    Back-to-back spans for a long function with numbered sections:
+
+        with SectionSpans("report") as sections:
+            sections.mark("Overview")   # ends the previous section, starts this one
+            ...
+
+    Leaving the block ends the last section, also when a section raises
+    (the span then carries the error).
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.current = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end(exc_type, exc, tb)
+        return False
+
+    def mark(self, name):
+        self.end()
+        if ENABLED:
+            self.current = _Span(f"{self.prefix}:{name}", "section", {}).__enter__()
+
+    def end(self, exc_type=None, exc=None, tb=None):
+        if self.current is not None:
+            self.current.__exit__(exc_type, exc, tb)
+            self.current = None
+
+
+def get_events():
+    return list(_events)
+
+
+def take_events():
+    """
+    Remove and return (clock origin, spans): a test worker sends its spans
+    to the supervisor this way, and merge_events() adds them there.
+    """
+    events = []
+    while _events:
+        events.append(_events.popleft())
+    return _origin, events
+
+
+def merge_events(origin, events):
+    """Add spans recorded by another process whose timestamps count from `origin`."""
+    # perf_counter is the same monotonic clock in every process, only the origins differ
+    shift = (origin - _origin) * 1e6
+    for event in events:
+        event["ts"] = round(event["ts"] + shift, 3)
+        _events.append(event)
+
+
+def export_chrome_trace(path):
+    """Write recorded spans in Chrome trace-event format (chrome://tracing, Perfetto)."""
+    names = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": t.ident,
+              "args": {"name": t.name}} for t in threading.enumerate()]
+    with open(path, "w") as f:
+        json.dump({"traceEvents": names + list(_events), "displayTimeUnit": "ms"}, f)
+    return path
+
+
+def summarize(events=None):
+    """Total time, calls and syscalls per span name, slowest first."""
+    totals = {}
+    for event in events if events is not None else _events:
+        entry = totals.setdefault(event["name"], {"calls": 0, "total_ms": 0.0, "syscalls": 0})
+        entry["calls"] += 1
+        entry["total_ms"] += event["dur"] / 1000
+        entry["syscalls"] += event["args"].get("syscalls", 0)
+    return sorted(totals.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+
+
+class SamplingProfiler:
+    """
+    Samples every other thread's Python stack at a fixed interval and counts
+    folded stacks ("a;b;c 42"), the input format of flamegraph tools.
+    Costs nothing until started.
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.counts = collections.Counter()
+        self.samples = 0
+        self.thread = None
+        self.running = False
+
+    def _loop(self):
+        own = threading.get_ident()
+        while self.running:
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="softcable-profiler", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if not self.running:
+            return self
+        self.running = False
+        self.thread.join()
+        return self
+
+    def take(self):
+        """Hand over the stacks counted so far and start counting afresh."""
+        counts, self.counts = self.counts, collections.Counter()
+        return counts
+
+    def export_folded(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+_profiler = None
+
+
+def start_profiler(interval=PROFILE_INTERVAL):
+    """Start the shared sampling profiler (no-op if it is already running)."""
+    global _profiler
+    if _profiler is None or not _profiler.running:
+        _profiler = SamplingProfiler(interval)
+    return _profiler.start()
+
+
+def stop_profiler(path=None):
+    """Stop the shared profiler; write folded stacks to `path` if given."""
+    if _profiler is None:
+        return None
+    _profiler.stop()
+    if path:
+        _profiler.export_folded(path)
+    return _profiler
+
+
+def profiler_running():
+    return _profiler is not None and _profiler.running
+
+
+def take_profile():
+    """Stacks counted since the last call, for a test worker to send to its supervisor."""
+    return _profiler.take() if _profiler is not None else {}
+
+
+def merge_profile(counts):
+    """Add stack counts from another process to the running profiler."""
+    if _profiler is not None:
+        _profiler.counts.update(counts)
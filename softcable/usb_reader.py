@@ -1,17 +1,26 @@
 import os
+from dataclasses import dataclass, field, asdict
 
-TYPEC_PATH = "/sys/class/typec/"
-POWER_PATH = "/sys/class/power_supply/"
+from softcable.pd_caps import get_typec_port_names, get_partner_path, get_port_pd, format_pdo
+from softcable.sysfs import sys_path
+from softcable.tracing import traced
 
+TYPEC_PATH = sys_path("class", "typec") + "/"
+POWER_PATH = sys_path("class", "power_supply") + "/"
+
+@dataclass(slots=True)
 class USBInfo:
-    def __init__(self):
-        self.port = None
-        self.partner = None
-        self.pd_supported = False
-        self.pd_profiles = []
-        self.voltage = None
-        self.current = None
-        self.wattage = None
+    port: str | None = None
+    partner: str | None = None
+    pd_supported: bool = False
+    pd_profiles: list = field(default_factory=list)
+    contract: dict | None = None
+    voltage: float | None = None
+    current: float | None = None
+    wattage: float | None = None
+
+    def to_dict(self):
+        return asdict(self)
 
 def read_file(path):
     try:
@@ -20,32 +29,34 @@ def read_file(path):
     except:
         return None
 
+@traced()
 def detect_usb_c():
     info = USBInfo()
 
-    # Detect USB-C port
-    ports = [p for p in os.listdir(TYPEC_PATH) if "port" in p]
+    # Detect USB-C port (port0, not port0-partner / port0-cable)
+    ports = get_typec_port_names()
     if not ports:
         return None  # No USB-C ports found
 
     port = ports[0]
     info.port = port
 
-    partner_path = os.path.join(TYPEC_PATH, port, "partner")
-    if os.path.exists(partner_path):
+    partner_path = get_partner_path(port)
+    if partner_path:
         info.partner = os.path.basename(partner_path)
     else:
         info.partner = None
 
     # Detect PD support
-    pd_path = os.path.join(TYPEC_PATH, port, "usb_power_delivery")
-    if os.path.exists(pd_path):
+    pd = get_port_pd(port)
+    if pd["port"] is not None:
         info.pd_supported = True
 
-        # Read PD profiles
-        profiles_path = os.path.join(TYPEC_PATH, port, "port0", "supported_modes")
-        if os.path.exists(profiles_path):
-            info.pd_profiles = read_file(profiles_path)
+        # PD profiles: what the partner offers, else what this port offers
+        partner_source = pd["partner"]["source"] if pd["partner"] else []
+        port_source = pd["port"]["source"]
+        info.pd_profiles = [format_pdo(p) for p in (partner_source or port_source)]
+        info.contract = pd["contract"]
 
     # Read power info
     for item in os.listdir(POWER_PATH):
@@ -0,0 +1,390 @@
+"""
+USB PD identity VDO decoder.
+
+Decodes the raw hex strings exposed under a cable's `identity/` folder
+(ID Header, Cert Stat, Product and Cable VDOs) into named fields.
+
+Every enumerated field is a precomputed tuple indexed by its bit value,
+so decoding a VDO is a handful of shifts and tuple lookups. Decoded VDOs
+are memoized by value: a fleet archive holds thousands of identities but
+only a few distinct cable models, so `decode_batch` decodes each distinct
+VDO once and reuses the result for every record that carries it.
+"""
+
+# ============================================================
+#  LOOKUP TABLES
+# ============================================================
+
+# Common USB-IF vendor IDs seen on cables, docks and hosts
+VENDOR_IDS = {
+    0x03F0: "HP",
+    0x0451: "Texas Instruments",
+    0x045E: "Microsoft",
+    0x046D: "Logitech",
+    0x0483: "STMicroelectronics",
+    0x04B4: "Cypress",
+    0x04E8: "Samsung",
+    0x050D: "Belkin",
+    0x05AC: "Apple",
+    0x05E3: "Genesys Logic",
+    0x0781: "SanDisk",
+    0x0B05: "ASUS",
+    0x0BC2: "Seagate",
+    0x0BDA: "Realtek",
+    0x1058: "Western Digital",
+    0x12D1: "Huawei",
+    0x152D: "JMicron",
+    0x174C: "ASMedia",
+    0x17EF: "Lenovo",
+    0x18D1: "Google",
+    0x1A40: "Terminus Technology",
+    0x1D5C: "Fresco Logic",
+    0x1FC9: "NXP",
+    0x2109: "VIA Labs",
+    0x2188: "CalDigit",
+    0x2717: "Xiaomi",
+    0x291A: "Anker",
+    0x413C: "Dell",
+    0x8086: "Intel",
+    0x8087: "Intel",
+}
+
+
+def _table(width, values, reserved="reserved"):
+    """Build a lookup tuple with 2**width slots from a {bits: label} dict."""
+    return tuple(values.get(i, reserved) for i in range(1 << width))
+
+
+UFP_PRODUCT_TYPES = _table(3, {
+    0b000: "not a UFP / cable plug",
+    0b001: "PDUSB hub",
+    0b010: "PDUSB peripheral",
+    0b011: "passive cable",
+    0b100: "active cable",
+    0b101: "alternate mode adapter",
+    0b110: "VCONN-powered device",
+})
+
+DFP_PRODUCT_TYPES = _table(3, {
+    0b000: "not a DFP",
+    0b001: "PDUSB hub",
+    0b010: "PDUSB host",
+    0b011: "power brick",
+})
+
+CONNECTOR_TYPES = _table(2, {
+    0b00: "unspecified",
+    0b10: "USB Type-C receptacle",
+    0b11: "USB Type-C plug",
+})
+
+PLUG_TO_TYPES = _table(2, {
+    0b00: "USB Type-A",
+    0b01: "USB Type-B",
+    0b10: "USB Type-C",
+    0b11: "captive",
+})
+
+CABLE_LATENCIES = _table(4, {
+    0b0001: "<10 ns (~1 m)",
+    0b0010: "10-20 ns (~2 m)",
+    0b0011: "20-30 ns (~3 m)",
+    0b0100: "30-40 ns (~4 m)",
+    0b0101: "40-50 ns (~5 m)",
+    0b0110: "50-60 ns (~6 m)",
+    0b0111: "60-70 ns (~7 m)",
+    0b1000: ">70 ns (>~7 m)",
+    0b1001: "1000 ns (~200 m, optical)",
+    0b1010: "2000 ns (~400 m, optical)",
+    0b1011: "3000 ns (~600 m, optical)",
+})
+
+CABLE_TERMINATIONS = _table(2, {
+    0b00: "VCONN not required",
+    0b01: "VCONN required",
+    0b10: "one end active, one passive, VCONN required",
+    0b11: "both ends active, VCONN required",
+})
+
+MAX_VBUS_VOLTAGES = _table(2, {
+    0b00: 20,
+    0b01: 30,
+    0b10: 40,
+    0b11: 50,
+}, reserved=None)
+
+VBUS_CURRENTS = _table(2, {
+    0b01: 3.0,
+    0b10: 5.0,
+}, reserved=None)
+
+USB_SPEEDS = _table(3, {
+    0b000: "USB 2.0 only",
+    0b001: "USB 3.2 Gen1 (5 Gb/s)",
+    0b010: "USB 3.2 / USB4 Gen2 (10 Gb/s)",
+    0b011: "USB4 Gen3 (20 Gb/s)",
+    0b100: "USB4 Gen4 (40 Gb/s)",
+})
+
+# Per-lane signalling rate in Gb/s for the speed field above
+USB_SPEED_GBPS = _table(3, {
+    0b000: 0.48,
+    0b001: 5.0,
+    0b010: 10.0,
+    0b011: 20.0,
+    0b100: 40.0,
+}, reserved=None)
+
+U3_CLD_POWERS = _table(3, {
+    0b000: ">10 mW",
+    0b001: "5-10 mW",
+    0b010: "1-5 mW",
+    0b011: "0.5-1 mW",
+    0b100: "0.2-0.5 mW",
+    0b101: "50-200 uW",
+    0b110: "<50 uW",
+})
+
+TBT_CABLE_SPEEDS = _table(3, {
+    0b001: "USB 3.1 Gen1",
+    0b010: "10 Gb/s (USB 3.1 Gen2 passive)",
+    0b011: "10 and 20 Gb/s (Thunderbolt 3)",
+})
+
+TBT_ROUNDED = _table(2, {
+    0b00: "Gen3 non-rounded",
+    0b01: "Gen3/Gen4 rounded and non-rounded",
+})
+
+YES_NO = ("no", "yes")
+
+TBT_SVID = 0x8087
+
+# SOP' product type values in the ID Header
+PASSIVE_CABLE = 0b011
+ACTIVE_CABLE = 0b100
+
+
+# ============================================================
+#  FIELD LAYOUTS
+# ============================================================
+# (name, shift, width, table). A table of None means "raw integer".
+
+ID_HEADER_FIELDS = (
+    ("usb_host", 31, 1, YES_NO),
+    ("usb_device", 30, 1, YES_NO),
+    ("product_type", 27, 3, UFP_PRODUCT_TYPES),
+    ("modal_operation", 26, 1, YES_NO),
+    ("dfp_product_type", 23, 3, DFP_PRODUCT_TYPES),
+    ("connector_type", 21, 2, CONNECTOR_TYPES),
+    ("vendor_id", 0, 16, None),
+)
+
+CERT_STAT_FIELDS = (
+    ("xid", 0, 32, None),
+)
+
+PRODUCT_FIELDS = (
+    ("product_id", 16, 16, None),
+    ("bcd_device", 0, 16, None),
+)
+
+PASSIVE_CABLE_FIELDS = (
+    ("hw_version", 28, 4, None),
+    ("fw_version", 24, 4, None),
+    ("vdo_version", 21, 3, None),
+    ("plug_to", 18, 2, PLUG_TO_TYPES),
+    ("epr_capable", 17, 1, YES_NO),
+    ("latency", 13, 4, CABLE_LATENCIES),
+    ("termination", 11, 2, CABLE_TERMINATIONS),
+    ("max_vbus_v", 9, 2, MAX_VBUS_VOLTAGES),
+    ("current_a", 5, 2, VBUS_CURRENTS),
+    ("speed", 0, 3, USB_SPEEDS),
+    ("speed_gbps", 0, 3, USB_SPEED_GBPS),
+)
+
+ACTIVE_CABLE_VDO1_FIELDS = PASSIVE_CABLE_FIELDS + (
+    # SBU supported is active-low in the spec
+    ("sbu_supported", 8, 1, ("yes", "no")),
+    ("sbu_type", 7, 1, ("passive", "active")),
+    ("vbus_through_cable", 4, 1, YES_NO),
+    ("sop2_controller", 3, 1, YES_NO),
+)
+
+ACTIVE_CABLE_VDO2_FIELDS = (
+    ("max_operating_temp_c", 24, 8, None),
+    ("shutdown_temp_c", 16, 8, None),
+    ("u3_cld_power", 12, 3, U3_CLD_POWERS),
+    ("u3_to_u0", 11, 1, ("direct", "through U3S")),
+    ("physical_connection", 10, 1, ("copper", "optical")),
+    ("active_element", 9, 1, ("re-driver", "re-timer")),
+    # The USB support bits are active-low as well
+    ("usb4_supported", 8, 1, ("yes", "no")),
+    ("usb2_hub_hops", 6, 2, None),
+    ("usb2_supported", 5, 1, ("yes", "no")),
+    ("usb32_supported", 4, 1, ("yes", "no")),
+    ("usb_lanes", 3, 1, ("one", "two")),
+    ("optically_isolated", 2, 1, YES_NO),
+    ("usb4_asymmetric", 1, 1, YES_NO),
+    ("usb_gen", 0, 1, ("Gen1", "Gen2 or higher")),
+)
+
+TBT_CABLE_FIELDS = (
+    ("active", 25, 1, ("passive", "active")),
+    ("link_training", 23, 1, ("bi-directional", "uni-directional")),
+    ("retimer", 22, 1, YES_NO),
+    ("optical", 21, 1, YES_NO),
+    ("rounded", 19, 2, TBT_ROUNDED),
+    ("speed", 16, 3, TBT_CABLE_SPEEDS),
+)
+
+# Precompute the masks once so the decode loop only shifts and indexes
+_COMPILED = {}
+
+
+def _compile(fields):
+    key = id(fields)
+    compiled = _COMPILED.get(key)
+    if compiled is None:
+        compiled = tuple((name, shift, (1 << width) - 1, table)
+                         for name, shift, width, table in fields)
+        _COMPILED[key] = compiled
+    return compiled
+
+
+# ============================================================
+#  DECODING
+# ============================================================
+
+_MEMO = {}
+MEMO_LIMIT = 65536
+
+
+def parse_vdo(raw):
+    """Parse a sysfs VDO string ("0x18000000", "18000000" or int) into an int."""
+    if raw is None:
+        return None
+    if isinstance(raw, int):
+        return raw
+    try:
+        return int(raw.strip(), 16)
+    except (ValueError, AttributeError):
+        return None
+
+
+def decode_vdo(value, fields):
+    """
+    Decode one VDO integer with a field layout.
+    Results are memoized and shared, so callers must copy before mutating.
+    """
+    if value is None:
+        return None
+
+    key = (id(fields), value)
+    decoded = _MEMO.get(key)
+    if decoded is not None:
+        return decoded
+
+    decoded = {}
+    for name, shift, mask, table in _compile(fields):
+        bits = (value >> shift) & mask
+        decoded[name] = bits if table is None else table[bits]
+
+    if len(_MEMO) >= MEMO_LIMIT:
+        _MEMO.clear()
+    _MEMO[key] = decoded
+    return decoded
+
+
+def vendor_name(vendor_id):
+    if vendor_id is None:
+        return None
+    return VENDOR_IDS.get(vendor_id, f"unknown (0x{vendor_id:04x})")
+
+
+def decode_identity_vdos(identity):
+    """
+    Decode an identity dict as returned by cable_identity.decode_identity.
+
+    Returns a flat dict of decoded fields, or None if there is no ID Header.
+    The cable VDOs are interpreted according to the ID Header product type.
+    """
+    if not identity:
+        return None
+
+    header = decode_vdo(parse_vdo(identity.get("id_header")), ID_HEADER_FIELDS)
+    if header is None:
+        return None
+
+    result = dict(header)
+    result["vendor"] = vendor_name(header["vendor_id"])
+
+    cert = decode_vdo(parse_vdo(identity.get("cert_stat")), CERT_STAT_FIELDS)
+    if cert:
+        result.update(cert)
+
+    product = decode_vdo(parse_vdo(identity.get("product")), PRODUCT_FIELDS)
+    if product:
+        result.update(product)
+
+    vdo1 = parse_vdo(identity.get("product_type_vdo1"))
+    vdo2 = parse_vdo(identity.get("product_type_vdo2"))
+
+    # SOP' product type lives in the same bits as the UFP type
+    cable_type = header["product_type"]
+    if cable_type == UFP_PRODUCT_TYPES[PASSIVE_CABLE]:
+        result.update(decode_vdo(vdo1, PASSIVE_CABLE_FIELDS) or {})
+    elif cable_type == UFP_PRODUCT_TYPES[ACTIVE_CABLE]:
+        result.update(decode_vdo(vdo1, ACTIVE_CABLE_VDO1_FIELDS) or {})
+        result.update(decode_vdo(vdo2, ACTIVE_CABLE_VDO2_FIELDS) or {})
+
+    return result
+
+
+def decode_tbt_mode(vdo):
+    """Decode a Thunderbolt 3 cable Discover Mode VDO (SVID 0x8087)."""
+    decoded = decode_vdo(parse_vdo(vdo), TBT_CABLE_FIELDS)
+    return dict(decoded) if decoded else None
+
+
+def cable_summary(decoded):
+    """Pick the fields that describe what a cable can actually do."""
+    if not decoded:
+        return None
+    return {
+        "vendor": decoded.get("vendor"),
+        "type": decoded.get("product_type"),
+        "speed": decoded.get("speed"),
+        "current_a": decoded.get("current_a"),
+        "max_vbus_v": decoded.get("max_vbus_v"),
+        "latency": decoded.get("latency"),
+        "termination": decoded.get("termination"),
+        "epr_capable": decoded.get("epr_capable"),
+    }
+
+
+def decode_batch(identities):
+    """
+    Decode many identity dicts at once.
+
+    Each VDO column is parsed and decoded once per distinct value, then
+    the decoded rows are assembled by lookup. Returns a list aligned with
+    the input (None where an identity could not be decoded); records with
+    identical identities share one decoded dict.
+    """
+    identities = list(identities)
+    columns = ("id_header", "cert_stat", "product",
+               "product_type_vdo1", "product_type_vdo2")
+
+    # Deduplicate whole identity rows first: identical cables decode identically
+    row_keys = [
+        tuple(ident.get(col) for col in columns) if ident else None
+        for ident in identities
+    ]
+
+    decoded_rows = {}
+    for key, ident in zip(row_keys, identities):
+        if key is not None and key not in decoded_rows:
+            decoded_rows[key] = decode_identity_vdos(ident)
+
+    return [decoded_rows.get(key) if key is not None else None for key in row_keys]
@@ -0,0 +1,24 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# The backends read SOFTCABLE_SYSFS_ROOT when they are imported, so the fake
+# tree is built and pointed to before any test module imports them
+_ROOT = tempfile.mkdtemp(prefix="softcable-tests-")
+os.environ["SOFTCABLE_SYSFS_ROOT"] = os.path.join(_ROOT, "sys")
+
+from softcable.bench.fixtures import build_tree  # noqa: E402
+
+build_tree(os.environ["SOFTCABLE_SYSFS_ROOT"], ports=2, usb_devices=10)
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_ROOT, ignore_errors=True)
+
+
+@pytest.fixture
+def sysfs_root():
+    """The synthetic sysfs tree every backend reads in these tests."""
+    return os.environ["SOFTCABLE_SYSFS_ROOT"]
@@ -0,0 +1,43 @@
+import json
+import socket
+import threading
+
+from softcable import agent
+from softcable.agent import call_or_run, encode
+
+
+def _local(**params):
+    return {"local": params}
+
+
+def test_call_or_run_falls_back_without_an_agent(tmp_path, monkeypatch):
+    monkeypatch.setattr(agent, "default_socket_path", lambda: str(tmp_path / "missing.sock"))
+    assert call_or_run("run_sweep", _local, target_path="/media/usb") == {"local": {"target_path": "/media/usb"}}
+
+
+def test_call_or_run_uses_the_agent(tmp_path, monkeypatch):
+    path = str(tmp_path / "agent.sock")
+    monkeypatch.setattr(agent, "default_socket_path", lambda: path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    requests = []
+
+    def serve():
+        conn, _ = server.accept()
+        with conn, conn.makefile("rb") as f:
+            request = json.loads(f.readline())
+            requests.append(request)
+            conn.sendall(encode({"id": request["id"], "event": {"type": "run"}}))
+            conn.sendall(encode({"id": request["id"], "result": {"error": None, "avg_read": 900}}))
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    try:
+        result = call_or_run("run_speed_test", _local, target_path="/media/usb", cpus={3, 2})
+    finally:
+        thread.join()
+        server.close()
+    assert result == {"error": None, "avg_read": 900}
+    assert requests[0]["method"] == "run_speed_test"
+    assert requests[0]["params"] == {"target_path": "/media/usb", "cpus": [2, 3]}
@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+from softcable.cable_cache import get_history, record_result, suggested_runs, sync_attached
+
+CABLE = {"fingerprint": "05ac:1234:abcd", "speed": "USB4 Gen3"}
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cables.json")
+
+
+def test_seen_count_counts_insertions_not_refreshes(cache_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+
+    assert sync_attached({"port0/plug0": CABLE}, cache_path)["port0/plug0"]["history"] is None
+    for _ in range(3):
+        clock[0] += 3600  # refreshes far apart while the cable stays plugged in
+        sync_attached({"port0/plug0": CABLE}, cache_path)
+    assert get_history(CABLE["fingerprint"], cache_path)["seen_count"] == 1
+
+    sync_attached({}, cache_path)  # unplugged
+    known = sync_attached({"port1/plug0": CABLE}, cache_path)["port1/plug0"]
+    assert known["history"]["seen_count"] == 1
+    entry = get_history(CABLE["fingerprint"], cache_path)
+    assert entry["seen_count"] == 2 and entry["port"] == "port1/plug0"
+
+
+def test_suggested_runs_never_exceeds_the_full_count(cache_path):
+    sync_attached({"port0/plug0": CABLE}, cache_path)
+    assert record_result(CABLE["fingerprint"], "data", {"error": None, "avg_read": 900}, cache_path)
+    entry = get_history(CABLE["fingerprint"], cache_path)
+    assert suggested_runs(entry, "data", 4) == 2
+    assert suggested_runs(entry, "data", 10) == 5
+    assert suggested_runs(entry, "data", 1) == 1
+    assert suggested_runs(entry, "stability", 10) == 10
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+import pytest
+
+from softcable.cpu_stats import CpuMeter, parse_cpu_list, summarize_cpu
+
+
+def test_parse_cpu_list():
+    assert parse_cpu_list("2,3") == {2, 3}
+    assert parse_cpu_list("2-3,6") == {2, 3, 6}
+    assert parse_cpu_list(" 0 , 4-5 ") == {0, 4, 5}
+    assert parse_cpu_list("1,") == {1}
+
+
+@pytest.mark.parametrize("text", [None, "", "  "])
+def test_parse_cpu_list_empty(text):
+    assert parse_cpu_list(text) is None
+
+
+def test_parse_cpu_list_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_cpu_list("a-b")
+
+
+def _meter(wall, thread):
+    """A finished CpuMeter whose I/O thread was on the CPU `thread` of `wall` seconds."""
+    cpu = CpuMeter()
+    cpu.start, cpu.end = 0.0, wall
+    cpu.start_self = cpu.start_thread = SimpleNamespace(ru_utime=0.0, ru_stime=0.0)
+    cpu.end_self = cpu.end_thread = SimpleNamespace(ru_utime=0.0, ru_stime=thread)
+    return cpu
+
+
+def test_saturated_phase_needs_the_device_to_be_cpu_bound():
+    cpu = _meter(1.0, 0.98)
+    to_device = cpu.summary({"write_mb": 50.0}, "write", 50)
+    to_cache = cpu.summary({"write_mb": 0.0}, "write", 50)
+    unknown = cpu.summary()
+    assert to_device["cpu_bound"] and not to_device["cache_bound"]
+    assert to_cache["cache_bound"] and not to_cache["cpu_bound"]
+    assert not unknown["cpu_bound"] and not unknown["cache_bound"]
+
+    summary = summarize_cpu([{"cpu_write": to_device, "cpu_read": to_cache}])
+    assert summary["cpu_bound_phases"] == 1
+    assert summary["cache_bound_phases"] == 1
+    assert summary["phases"] == 2
+
+
+def test_idle_phase_is_neither():
+    summary = _meter(1.0, 0.2).summary({"read_mb": 50.0}, "read", 50)
+    assert summary["thread_pct"] == 20.0
+    assert not summary["cpu_bound"] and not summary["cache_bound"]
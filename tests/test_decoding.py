@@ -0,0 +1,73 @@
+from softcable.bench.fixtures import (
+    ACTIVE_CABLE_VDO2, ACTIVE_ID_HEADER, PASSIVE_CABLE_VDO, PASSIVE_ID_HEADER
+)
+from softcable.pd_caps import format_pdo, get_pd_info
+from softcable.vdo_decoder import decode_batch, decode_identity_vdos, parse_vdo
+
+
+def test_parse_vdo():
+    assert parse_vdo("0x18000000") == 0x18000000
+    assert parse_vdo("18000000") == 0x18000000
+    assert parse_vdo(7) == 7
+    assert parse_vdo("not hex") is None
+    assert parse_vdo(None) is None
+
+
+def test_passive_cable_bits():
+    decoded = decode_identity_vdos({"id_header": f"0x{PASSIVE_ID_HEADER:08x}",
+                                    "product_type_vdo1": f"0x{PASSIVE_CABLE_VDO:08x}"})
+    assert decoded["product_type"] == "passive cable"
+    assert decoded["vendor_id"] == 0x05AC
+    assert decoded["vendor"] == "Apple"
+    assert decoded["hw_version"] == 1
+    assert decoded["plug_to"] == "USB Type-C"
+    assert decoded["current_a"] == 5.0
+    assert decoded["max_vbus_v"] == 20
+    assert decoded["speed_gbps"] == 10.0
+    assert "usb4_supported" not in decoded
+
+
+def test_active_cable_reads_vdo2():
+    decoded = decode_identity_vdos({"id_header": f"0x{ACTIVE_ID_HEADER:08x}",
+                                    "product_type_vdo1": f"0x{PASSIVE_CABLE_VDO:08x}",
+                                    "product_type_vdo2": f"0x{ACTIVE_CABLE_VDO2:08x}"})
+    assert decoded["product_type"] == "active cable"
+    assert decoded["physical_connection"] == "optical"
+    assert decoded["active_element"] == "re-timer"
+    assert decoded["usb4_supported"] == "yes"
+
+
+def test_no_id_header():
+    assert decode_identity_vdos({}) is None
+    assert decode_identity_vdos({"product": "0x1"}) is None
+
+
+def test_batch_matches_single_decodes():
+    identities = [
+        {"id_header": f"0x{PASSIVE_ID_HEADER:08x}", "product_type_vdo1": f"0x{PASSIVE_CABLE_VDO:08x}"},
+        {},
+        {"id_header": f"0x{PASSIVE_ID_HEADER:08x}", "product_type_vdo1": f"0x{PASSIVE_CABLE_VDO:08x}"},
+    ]
+    assert decode_batch(identities) == [decode_identity_vdos(i) for i in identities]
+
+
+def test_format_pdo():
+    assert format_pdo({"index": 1, "type": "fixed", "voltage_mv": 9000, "maximum_current_ma": 3000,
+                       "power_mw": 27000}) == "#1 Fixed 9 V @ 3 A (27 W)"
+    assert format_pdo({"index": 2, "type": "pps", "minimum_voltage_mv": 3300, "maximum_voltage_mv": 21000,
+                       "maximum_current_ma": 3000}) == "#2 PPS 3.3-21 V @ 3 A"
+    assert format_pdo({"index": 3, "type": "battery", "minimum_voltage_mv": 5000, "maximum_voltage_mv": 20000,
+                       "maximum_power_mw": 60000}) == "#3 Battery 5-20 V, 60 W"
+
+
+def test_pd_caps_from_fixture_tree(sysfs_root):
+    pd = get_pd_info(refresh=True)
+    assert sorted(pd) == ["port0", "port1"]
+    source = pd["port0"]["partner"]["source"]
+    assert [format_pdo(p) for p in source] == [
+        "#1 Fixed 5 V @ 3 A (15 W)",
+        "#2 Fixed 9 V @ 3 A (27 W)",
+        "#3 Fixed 15 V @ 3 A (45 W)",
+        "#4 Fixed 20 V @ 3 A (60 W)",
+        "#5 PPS 3.3-21 V @ 3 A (63 W)",
+    ]
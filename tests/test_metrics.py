@@ -0,0 +1,18 @@
+import socket
+
+import pytest
+
+from softcable import metrics
+
+
+def test_exporter_on_a_taken_port_leaves_collection_off():
+    taken = socket.socket()
+    taken.bind(("127.0.0.1", 0))
+    taken.listen(1)
+    try:
+        with pytest.raises(OSError):
+            metrics.start_exporter(port=taken.getsockname()[1])
+    finally:
+        taken.close()
+    assert metrics.ENABLED is False
+    assert metrics._server is None
@@ -0,0 +1,131 @@
+import gc
+import os
+import tracemalloc
+
+import pytest
+
+from softcable.bench.fixtures import build_tree
+from softcable.cable_identity import get_cable_info
+from softcable.lanes import get_all_lane_summaries
+from softcable.model import (
+    CablePlug, LaneSummary, RawSnapshot, RecordBatch, SysfsRecord, cables_from_dict, cables_to_dict,
+    parse_value
+)
+from softcable.raw_data import _read_records, get_raw_data, get_raw_snapshot, read_sysfs_folder
+
+
+@pytest.mark.parametrize("text, value", [
+    ("0", 0), ("12", 12), ("-12", -12), ("1.5", 1.5), ("-0.0", -0.0),
+])
+def test_parse_value_numbers(text, value):
+    assert parse_value(text) == value
+    assert type(parse_value(text)) is type(value)
+
+
+@pytest.mark.parametrize("text", ["-0", "007", "1e3", "1.50", "+1", "0x1f", "yes", ""])
+def test_parse_value_keeps_text_that_would_not_round_trip(text):
+    assert parse_value(text) == text
+
+
+def test_record_round_trip():
+    data = {"speed": "10000", "version": " 3.20", "devnum": "-0", "power": None, "ratio": "0.5"}
+    record = SysfsRecord.from_dict("1-1", data)
+    assert record["speed"] == 10000
+    assert record.to_dict() == data
+    assert list(record.to_dict()) == list(data)
+
+
+def test_records_share_schemas():
+    a = SysfsRecord.from_dict("1-1", {"speed": "480", "busnum": "1"})
+    b = SysfsRecord.from_dict("1-2", {"speed": "5000", "busnum": "1"})
+    assert a.schema is b.schema
+
+
+def test_snapshot_round_trip(sysfs_root):
+    raw = get_raw_data()
+    assert raw["usb_devices"]
+    assert RawSnapshot.from_dict(raw).to_dict() == raw
+    assert get_raw_snapshot().to_dict() == raw
+
+
+def test_batch_round_trip(sysfs_root):
+    snapshot = get_raw_snapshot()
+    batch = snapshot.batch("usb_devices")
+    assert len(batch) == len(snapshot.usb_devices)
+    assert batch.to_dicts() == get_raw_data()["usb_devices"]
+    for name, record in snapshot.usb_devices.items():
+        assert list(batch.row(list(batch.names).index(name)).to_dict()) == list(record.to_dict())
+
+
+def test_batch_columns_and_rows():
+    batch = RecordBatch.from_records([
+        SysfsRecord.from_dict("1-1", {"busnum": "1", "speed": "480", "serial": None}),
+        SysfsRecord.from_dict("1-1:1.0", {"bInterfaceClass": "08", "busnum": "2"}),
+    ])
+    busnum = batch.column("busnum")
+    assert isinstance(busnum, memoryview) and busnum.tolist() == [1, 2]
+    # speed is missing on the interface row: 0 in the column, None through the row
+    assert batch.column("speed").tolist() == [480, 0]
+    interface = batch.row(1)
+    assert "speed" not in interface and interface.get("speed") is None
+    assert interface["bInterfaceClass"] == "08"
+    with pytest.raises(KeyError):
+        interface["speed"]
+    assert batch.to_dicts() == {
+        "1-1": {"busnum": "1", "speed": "480", "serial": None},
+        "1-1:1.0": {"bInterfaceClass": "08", "busnum": "2"},
+    }
+
+
+def test_cable_plug_keeps_text_and_none():
+    data = {"active": "yes", "plug_type": "type-c", "speed": None, "identity": None}
+    plug = CablePlug.from_dict("port0/plug0", data)
+    assert plug.active is True
+    assert plug.to_dict() == data
+    assert list(plug.to_dict()) == list(data)
+    assert CablePlug.from_dict("port0/plug0", {"active": "no"}).to_dict() == {"active": "no"}
+    assert CablePlug.from_dict("port0/plug0", {"active": "no"}).active is False
+    note = {"note": "Cable folder present, but no plug/identity entries exposed by firmware."}
+    assert CablePlug.from_dict("port1", note).to_dict() == note
+
+
+def test_cables_round_trip(sysfs_root):
+    info = get_cable_info()
+    cables = cables_from_dict(info)
+    assert cables["port0/plug0"].active is True
+    assert cables["port0/plug0"].identity["id_header"].startswith("0x")
+    assert cables_to_dict(cables) == info
+    assert cables_to_dict(cables_from_dict(None)) is None
+
+
+def test_lane_summaries_round_trip(sysfs_root):
+    summaries = get_all_lane_summaries()
+    assert summaries
+    for summary in summaries:
+        typed = LaneSummary.from_dict(summary)
+        assert typed.to_dict() == summary
+        assert list(typed.to_dict()) == list(summary)
+    no_ports = {"port": "No /sys/class/typec ports found", "mode": "unknown", "power_role": "unknown",
+                "data_role": "unknown", "lanes": ["unknown"] * 4}
+    assert LaneSummary.from_dict(no_ports).to_dict() == no_ports
+
+
+def _allocated(build):
+    """Bytes still held by what build() returns, after one warm-up call (schemas, interned names)."""
+    build()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()  # noqa: F841 (held while measuring)
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_records_take_a_third_of_the_dicts(tmp_path):
+    devices = os.path.join(build_tree(str(tmp_path / "sys"), usb_devices=500), "bus", "usb", "devices")
+    names = os.listdir(devices)
+    dicts = _allocated(lambda: {name: read_sysfs_folder(os.path.join(devices, name)) for name in names})
+    records = _allocated(lambda: _read_records(devices))
+    assert records < dicts * 0.5
@@ -0,0 +1,55 @@
+from softcable.mount_index import MountIndex, parse_mountinfo
+
+MOUNTINFO = """\
+22 1 8:2 / / rw,relatime shared:1 - ext4 /dev/sda2 rw
+30 22 0:26 / /tmp rw,nosuid shared:12 - tmpfs tmpfs rw
+31 22 0:27 / /run/user/1000 rw,nosuid shared:13 - tmpfs tmpfs rw
+40 22 8:17 / /media/usb\\040stick rw,relatime shared:20 - vfat /dev/sdb1 rw
+"""
+
+
+def _entry(mountpoint, device, usb_device=None, typec_port=None):
+    return {"mountpoint": mountpoint, "fstype": "ext4", "source": f"/dev/{device}", "dev": "8:0",
+            "device": device, "disk": device.rstrip("0123456789"), "usb_device": usb_device,
+            "hub_port": None, "typec_port": typec_port}
+
+
+def _index():
+    index = MountIndex()
+    index.mounts = {
+        "/": _entry("/", "sda2"),
+        "/media/usb stick": _entry("/media/usb stick", "sdb1", "1-1.2", "port0"),
+    }
+    index.ignored = {"/tmp": "0:26", "/run/user/1000": "0:27"}
+    return index
+
+
+def test_parse_mountinfo_unescapes():
+    mounts = parse_mountinfo(MOUNTINFO)
+    assert mounts["/media/usb stick"] == {"dev": "8:17", "fstype": "vfat", "source": "/dev/sdb1"}
+    assert mounts["/tmp"]["fstype"] == "tmpfs"
+
+
+def test_entry_for_path_walks_up_to_the_mount():
+    index = _index()
+    assert index.entry_for_path("/media/usb stick/dir/file")["device"] == "sdb1"
+    assert index.entry_for_path("/media/usb stick")["device"] == "sdb1"
+    assert index.entry_for_path("/home/user")["device"] == "sda2"
+    assert index.entry_for_path("/")["device"] == "sda2"
+
+
+def test_entry_for_path_stops_at_non_block_mounts():
+    index = _index()
+    assert index.entry_for_path("/tmp/softcable") is None
+    assert index.entry_for_path("/run/user/1000/x") is None
+    # /run itself is on the root filesystem
+    assert index.entry_for_path("/run/lock")["device"] == "sda2"
+
+
+def test_late_typec_port_is_resolved(sysfs_root):
+    # 1-1 hangs off port0 in the fixture tree; the mount was resolved before it was indexed
+    index = MountIndex()
+    index.mounts = {"/media/late": _entry("/media/late", "sdc1", "1-1")}
+    index._resolve_ports()
+    assert index.mounts["/media/late"]["typec_port"] == "port0"
+    assert [e["mountpoint"] for e in index.drives_on_port("port0")] == ["/media/late"]
@@ -0,0 +1,99 @@
+import os
+import shutil
+import time
+
+import pytest
+
+from softcable import recording
+from softcable.recording import MAGIC, RECORD, Recorder, Recording, materialize, snapshot
+
+
+@pytest.fixture
+def tree(sysfs_root, tmp_path, monkeypatch):
+    """A private copy of the fixture tree that the recorder scans, free to change."""
+    copy = str(tmp_path / "sys")
+    shutil.copytree(sysfs_root, copy, symlinks=True)
+    monkeypatch.setattr(recording, "snapshot", lambda root=None: snapshot(copy))
+    return copy
+
+
+def _wait_for_keyframe(recorder):
+    deadline = time.monotonic() + 5
+    while recorder.last_keyframe is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert recorder.last_keyframe is not None
+
+
+def test_snapshot_materializes_back(sysfs_root, tmp_path):
+    state = snapshot(sysfs_root)
+    assert state["class/typec/port0/cable/plug0/identity/id_header"].startswith("0x")
+    assert state["class/typec/port0/usb_power_delivery"][0] == "link"
+    assert snapshot(materialize(state, str(tmp_path / "copy"))) == state
+
+
+def test_log_format_and_time_order(tree, tmp_path):
+    path = str(tmp_path / "s.screc")
+    recorder = Recorder(path).start()
+    _wait_for_keyframe(recorder)
+    now = time.perf_counter()
+    # Worker records arrive late: queued after a later one, they must still be written first
+    recorder.queue.append((now, "power", [5.0, 1.0]))
+    recorder.queue.append((now - 0.2, "power", [9.0, 2.0]))
+    summary = recorder.stop()
+    assert summary["records"]["power"] == 2
+
+    with open(path, "rb") as f:
+        assert f.read(len(MAGIC)) == MAGIC
+        length, t, code, flags = RECORD.unpack(f.read(RECORD.size))
+    assert (t, recording.KINDS[code]) == (0.0, "session")
+
+    rec = Recording(path)
+    times = [t for t, _, _ in rec.records()]
+    assert times == sorted(times)
+    assert [p for _, _, p in rec.records(kinds=("power",))] == [[9.0, 2.0], [5.0, 1.0]]
+    assert os.path.getsize(path + recording.INDEX_SUFFIX) % recording.INDEX_ENTRY.size == 0
+
+
+def test_state_at_applies_deltas(tree, tmp_path):
+    path = str(tmp_path / "s.screc")
+    before = snapshot(tree)
+    recorder = Recorder(path).start()
+    _wait_for_keyframe(recorder)
+    with open(os.path.join(tree, "class", "typec", "port0", "data_role"), "w") as f:
+        f.write("host [device]\n")
+    shutil.rmtree(os.path.join(tree, "class", "typec", "port1", "cable"))
+    changed_at = time.perf_counter() - recorder.origin
+    recorder.stop()
+
+    rec = Recording(path)
+    assert rec.state_at(changed_at - 1e-3) == before
+    after = rec.state_at()
+    assert after == snapshot(tree)
+    assert after["class/typec/port0/data_role"] == "host [device]\n"
+    assert not any(p.startswith("class/typec/port1/cable/") for p in after)
+    assert [kind for _, kind, _ in rec.records(kinds=("keyframe", "delta"))] == ["keyframe", "delta"]
+
+
+def test_index_is_rebuilt_when_missing(tree, tmp_path):
+    path = str(tmp_path / "s.screc")
+    Recorder(path).start().stop()
+    entries = Recording(path).entries
+    os.remove(path + recording.INDEX_SUFFIX)
+    rebuilt = Recording(path)
+    assert rebuilt.entries == entries
+    assert rebuilt.state_at() == snapshot(tree)
+
+
+def test_results_keep_the_recorded_drive(tree, tmp_path):
+    path = str(tmp_path / "s.screc")
+    recorder = Recorder(path).start()
+    drive = {"mountpoint": "/media/usb", "device": "sdb1", "typec_port": "port0"}
+    now = time.perf_counter()
+    recorder.queue.append((now, "test", {"kind": "data", "path": "/media/usb", "args": {}, "drive": drive}))
+    recorder.queue.append((now + 1e-3, "result", {"kind": "data", "path": "/media/usb",
+                                                  "result": {"error": "Device removed"}}))
+    recorder.stop()
+
+    results = Recording(path).results()
+    assert results["data"]["drive"] == drive
+    assert results["data"]["result"] == {"error": "Device removed"}
@@ -0,0 +1,32 @@
+from softcable.sweep import KNEE_SHARE, find_knee, summarize_cells
+
+
+def _cell(block_kb, queue_depth, mb_s, lat=1.0, error=None):
+    return {"block_kb": block_kb, "queue_depth": queue_depth, "mb_s": mb_s,
+            "avg_lat_ms": lat, "error": error}
+
+
+def test_knee_is_smallest_block_then_lowest_depth_near_the_best():
+    cells = [
+        _cell(4, 1, 40), _cell(4, 8, 200),
+        _cell(64, 1, 300), _cell(64, 8, 960, lat=3.0),
+        _cell(1024, 1, 800), _cell(1024, 8, 1000),
+    ]
+    knee = find_knee(cells)
+    assert knee["block_kb"] == 64 and knee["queue_depth"] == 8
+    assert knee["mb_s"] >= 1000 * KNEE_SHARE
+
+
+def test_knee_ignores_failed_cells():
+    cells = [_cell(4, 1, 900), _cell(64, 1, 0, error="I/O error")]
+    assert find_knee(cells)["block_kb"] == 4
+    assert find_knee([_cell(4, 1, 0, error="I/O error")]) is None
+    assert find_knee([]) is None
+
+
+def test_summary_latency_cost():
+    cells = [_cell(64, 1, 300, lat=0.5), _cell(64, 8, 1000, lat=3.0)]
+    summary = summarize_cells(cells)
+    assert summary["saturation_mb_s"] == 1000
+    assert summary["best_mb_s"] == 1000
+    assert summary["latency_cost_ms"] == 2.5
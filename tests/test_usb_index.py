@@ -0,0 +1,35 @@
+import threading
+import time
+
+from softcable.lanes.usb_speed import UsbTopology
+
+
+def test_topology_from_fixture_tree(sysfs_root):
+    index = UsbTopology().build()
+    assert sorted(index.typec_ports()) == ["port0", "port1"]
+    assert {n.name for n in index.devices_behind("port0")} == {"1-1", "1-1.1", "1-1.2"}
+    assert [n.name for n in index.children("1-1")] == ["1-1.1", "1-1.2"]
+    assert index.link_behind("/sys/class/typec/port1").name == "1-2"
+
+
+def test_queries_survive_concurrent_rebuilds(sysfs_root):
+    index = UsbTopology().build()
+    stop = threading.Event()
+
+    def rebuild():
+        while not stop.is_set():
+            index.build()
+
+    thread = threading.Thread(target=rebuild)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 0.3
+        while time.monotonic() < deadline:
+            index.speeds()
+            index.link_behind("port0")
+            index.children("1-1")
+            for port in index.typec_ports():
+                index.link_speed(port)
+    finally:
+        stop.set()
+        thread.join()